@@ -0,0 +1,137 @@
+"""
+Bounded thread pool for blocking providers (yfinance, sync Anthropic, NewsAPI).
+
+Async handlers must never call these directly: a multi-second yfinance call on
+the event loop stalls every request and WebSocket room on the worker. Use
+
+    info = await run_blocking(get_basic_company_info, ticker, label="yfinance")
+
+Calls run on a dedicated pool of BLOCKING_WORKERS threads. At most
+BLOCKING_QUEUE_SIZE more calls wait for a thread; callers beyond that wait on
+the event loop (backpressure) instead of piling up in the executor. Queue
+depth and per-label wait / run times are reported by stats().
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+from app.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+TIMING_WINDOW = 500   # recent samples kept per label for percentiles
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class _LabelStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wait_ms: Deque[float] = deque(maxlen=TIMING_WINDOW)
+        self.run_ms: Deque[float] = deque(maxlen=TIMING_WINDOW)
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "wait_ms_p50": round(percentile(self.wait_ms, 50), 2),
+            "wait_ms_p95": round(percentile(self.wait_ms, 95), 2),
+            "run_ms_p50": round(percentile(self.run_ms, 50), 2),
+            "run_ms_p95": round(percentile(self.run_ms, 95), 2),
+        }
+
+
+class BlockingExecutor:
+    def __init__(self, max_workers: int = 8, max_queue: int = 64):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._labels: Dict[str, _LabelStats] = {}
+        self._active_lock = threading.Lock()
+        self.active = 0          # calls running on a thread
+        self.in_flight = 0       # calls submitted and not yet finished
+        self.max_queued_seen = 0
+
+    @property
+    def queued(self) -> int:
+        """Calls waiting for a free thread."""
+        return max(0, self.in_flight - self.active)
+
+    def _ensure_started(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="blocking"
+            )
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers + self.max_queue)
+
+    async def run(self, fn: Callable[..., T], *args: Any, label: str = "default", **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) on the pool and await its result."""
+        self._ensure_started()
+        stats = self._labels.setdefault(label, _LabelStats())
+        submitted = time.perf_counter()
+
+        def call():
+            started = time.perf_counter()
+            with self._active_lock:
+                self.active += 1
+            stats.wait_ms.append((started - submitted) * 1000)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._active_lock:
+                    self.active -= 1
+                stats.run_ms.append((time.perf_counter() - started) * 1000)
+
+        async with self._slots:
+            self.in_flight += 1
+            self.max_queued_seen = max(self.max_queued_seen, self.queued)
+            stats.calls += 1
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._pool, call)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._slots = None
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued_seen": self.max_queued_seen,
+            "labels": {name: s.summary() for name, s in self._labels.items()},
+        }
+
+
+blocking_executor = BlockingExecutor(
+    max_workers=settings.blocking_workers,
+    max_queue=settings.blocking_queue_size,
+)
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, label: str = "default", **kwargs: Any) -> T:
+    """Await a blocking call on the shared bounded pool."""
+    return await blocking_executor.run(fn, *args, label=label, **kwargs)
@@ -0,0 +1,291 @@
+"""
+In-memory candidate index for the document selection engine.
+
+Every round has a fixed lookback window and a fixed set of stocks, so the
+candidate documents the engine can pick from only change when the corpus does.
+The index loads them once per round and keeps them in memory:
+
+- per-stock docs keyed by (stock_id, signal_direction_for_ticker)
+- macro docs (any doc with a macro relevance link)
+- mixed-signal docs (red herring pool)
+- every doc linked to one of the round's stocks (fallback pool)
+
+Windowed pools are pre-sorted by publish_date. The index is dropped whenever a
+session commits Document / DocumentStockRelevance / StockReturn / RoundConfig
+rows in this process (seed, scraper, relevance builder), and rebuilt after
+INDEX_MAX_AGE_SECONDS so writes from other processes are picked up too.
+
+corpus_version() fingerprints the corpus a round draws from straight from the
+database, so it changes with writes from any process. Each entry records the
+version it was built from; get() rebuilds an entry that doesn't match the
+version the caller passes.
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select, and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Document, StockReturn, DocumentStockRelevance, RoundConfig
+
+
+LOOKBACK_DAYS = 90
+INDEX_MAX_AGE_SECONDS = 300
+
+# Writes to these tables invalidate the index
+_INDEXED_MODELS = (Document, DocumentStockRelevance, StockReturn, RoundConfig)
+
+
+@dataclass(frozen=True)
+class IndexedDocument:
+    """Read-only snapshot of the Document fields the engine and API need."""
+    id: str
+    source_type: str
+    raw_text: str
+    title: str
+    publish_date: date
+    source_label: str
+    url: str
+    image_url: str
+    signal_direction: str
+    signal_strength: int
+    difficulty: str
+
+    @classmethod
+    def from_model(cls, doc: Document) -> "IndexedDocument":
+        return cls(
+            id=doc.id,
+            source_type=doc.source_type,
+            raw_text=doc.raw_text,
+            title=doc.title or "",
+            publish_date=doc.publish_date,
+            source_label=doc.source_label,
+            url=doc.url or "",
+            image_url=doc.image_url or "",
+            signal_direction=doc.signal_direction or "mixed",
+            signal_strength=doc.signal_strength or 3,
+            difficulty=doc.difficulty or "medium",
+        )
+
+
+def _by_date(doc: IndexedDocument):
+    # id breaks ties so pool order (and seeded selection) never depends on row order
+    return (doc.publish_date, doc.id)
+
+
+@dataclass
+class RoundCandidates:
+    round_id: str
+    lookback_start: date
+    lookback_end: date
+    by_stock: Dict[Tuple[str, str], List[IndexedDocument]] = field(default_factory=dict)
+    macro: List[IndexedDocument] = field(default_factory=list)
+    mixed: List[IndexedDocument] = field(default_factory=list)
+    linked: List[IndexedDocument] = field(default_factory=list)
+    corpus_version: str = ""
+    built_at: float = field(default_factory=time.monotonic)
+
+    def for_stock(self, stock_id: str, direction: Optional[str]) -> List[IndexedDocument]:
+        """Docs linked to a stock, optionally restricted to one signal direction."""
+        if direction is not None:
+            return self.by_stock.get((stock_id, direction), [])
+
+        # Flat stock — accept any direction, keep publish_date order
+        seen: set[str] = set()
+        docs: List[IndexedDocument] = []
+        for (sid, _), bucket in self.by_stock.items():
+            if sid != stock_id:
+                continue
+            for doc in bucket:
+                if doc.id not in seen:
+                    seen.add(doc.id)
+                    docs.append(doc)
+        docs.sort(key=_by_date)
+        return docs
+
+
+class CandidateIndex:
+    def __init__(self, max_age_seconds: float = INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._rounds: Dict[str, RoundCandidates] = {}
+        self._lock = asyncio.Lock()
+        self._dependents: List[Callable[[Optional[str]], None]] = []
+        self.builds = 0
+
+    def on_invalidate(self, callback: Callable[[Optional[str]], None]):
+        """Register a per-round cache that must be dropped together with the index."""
+        self._dependents.append(callback)
+
+    def invalidate(self, round_id: Optional[str] = None):
+        if round_id is None:
+            self._rounds.clear()
+        else:
+            self._rounds.pop(round_id, None)
+        for callback in self._dependents:
+            callback(round_id)
+
+    def _fresh(self, round_id: str, corpus_version: Optional[str] = None) -> Optional[RoundCandidates]:
+        entry = self._rounds.get(round_id)
+        if not entry or (time.monotonic() - entry.built_at) >= self.max_age_seconds:
+            return None
+        if corpus_version is not None and entry.corpus_version != corpus_version:
+            return None
+        return entry
+
+    def version(self, round_id: str) -> Optional[float]:
+        """Build stamp of a round's current entry (None if not indexed or stale)."""
+        entry = self._fresh(round_id)
+        return entry.built_at if entry else None
+
+    async def get(
+        self,
+        db: AsyncSession,
+        round_config: RoundConfig,
+        corpus_version: Optional[str] = None,
+    ) -> RoundCandidates:
+        """
+        Return the candidates for a round, building them on first use. With
+        `corpus_version`, an entry built from any other version is rebuilt.
+        """
+        entry = self._fresh(round_config.id, corpus_version)
+        if entry:
+            return entry
+
+        async with self._lock:
+            # Another request may have built it while we waited
+            entry = self._fresh(round_config.id, corpus_version)
+            if entry:
+                return entry
+            entry = await build_round_candidates(db, round_config)
+            self._rounds[round_config.id] = entry
+            self.builds += 1
+            return entry
+
+    async def warm(self, db: AsyncSession) -> int:
+        """Build the index for every round. Returns the number of rounds indexed."""
+        result = await db.execute(select(RoundConfig))
+        rounds = list(result.scalars().all())
+        for round_config in rounds:
+            # A rebuild, not a corpus change: dependents stay valid
+            self._rounds.pop(round_config.id, None)
+            await self.get(db, round_config)
+        return len(rounds)
+
+
+async def corpus_version(db: AsyncSession, round_id: str) -> str:
+    """
+    Fingerprint of the rows a round's candidates are built from. The corpus is
+    append-mostly (scrapers and the relevance builder only insert), so counts,
+    the newest document id and the round's returns and window are enough.
+    """
+    in_round = StockReturn.round_id == round_id
+    row = (await db.execute(select(
+        select(func.count(Document.id)).scalar_subquery(),
+        select(func.max(Document.id)).scalar_subquery(),
+        select(func.count(DocumentStockRelevance.id)).scalar_subquery(),
+        select(func.count(StockReturn.id)).where(in_round).scalar_subquery(),
+        select(func.sum(StockReturn.return_pct)).where(in_round).scalar_subquery(),
+        select(RoundConfig.period_start).where(RoundConfig.id == round_id).scalar_subquery(),
+    ))).one()
+    return hashlib.sha1(repr(tuple(row)).encode()).hexdigest()[:16]
+
+
+async def build_round_candidates(db: AsyncSession, round_config: RoundConfig) -> RoundCandidates:
+    """Load every candidate document for one round."""
+    # Read first: a write landing during the build leaves the entry on the older version
+    version = await corpus_version(db, round_config.id)
+    lookback_start = round_config.period_start - timedelta(days=LOOKBACK_DAYS)
+    lookback_end = round_config.period_start
+    in_window = and_(
+        Document.publish_date >= lookback_start,
+        Document.publish_date <= lookback_end,
+    )
+    entry = RoundCandidates(
+        round_id=round_config.id,
+        lookback_start=lookback_start,
+        lookback_end=lookback_end,
+        corpus_version=version,
+    )
+    snapshots: Dict[str, IndexedDocument] = {}
+
+    def snapshot(doc: Document) -> IndexedDocument:
+        if doc.id not in snapshots:
+            snapshots[doc.id] = IndexedDocument.from_model(doc)
+        return snapshots[doc.id]
+
+    # ── Docs linked to this round's stocks ─────────────────────────────────
+    result = await db.execute(
+        select(
+            Document,
+            DocumentStockRelevance.stock_id,
+            DocumentStockRelevance.signal_direction_for_ticker,
+        )
+        .join(DocumentStockRelevance, DocumentStockRelevance.doc_id == Document.id)
+        .join(StockReturn, StockReturn.id == DocumentStockRelevance.stock_id)
+        .where(StockReturn.round_id == round_config.id)
+    )
+    linked_seen: set[str] = set()
+    for doc, stock_id, direction in result.all():
+        snap = snapshot(doc)
+        if snap.id not in linked_seen:
+            linked_seen.add(snap.id)
+            entry.linked.append(snap)
+        if lookback_start <= snap.publish_date <= lookback_end:
+            # (doc_id, stock_id) is unique, so each doc lands in a bucket once
+            entry.by_stock.setdefault((stock_id, direction), []).append(snap)
+
+    # ── Macro docs in the window (any round) ───────────────────────────────
+    result = await db.execute(
+        select(Document)
+        .join(DocumentStockRelevance, DocumentStockRelevance.doc_id == Document.id)
+        .where(and_(DocumentStockRelevance.relevance_type == "macro", in_window))
+    )
+    macro_seen: set[str] = set()
+    for doc in result.scalars().all():
+        if doc.id not in macro_seen:
+            macro_seen.add(doc.id)
+            entry.macro.append(snapshot(doc))
+
+    # ── Mixed-signal docs in the window (red herrings) ─────────────────────
+    result = await db.execute(
+        select(Document).where(and_(Document.signal_direction == "mixed", in_window))
+    )
+    entry.mixed = [snapshot(doc) for doc in result.scalars().all()]
+
+    for bucket in entry.by_stock.values():
+        bucket.sort(key=_by_date)
+    entry.macro.sort(key=_by_date)
+    entry.mixed.sort(key=_by_date)
+    entry.linked.sort(key=lambda d: d.id)
+
+    return entry
+
+
+candidate_index = CandidateIndex()
+
+
+# ── Invalidation on corpus writes ─────────────────────────────────────────────
+
+@event.listens_for(Session, "after_flush")
+def _mark_corpus_dirty(session: Session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _INDEXED_MODELS):
+            session.info["candidate_index_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session):
+    if session.info.pop("candidate_index_dirty", False):
+        candidate_index.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_dirty_flag(session: Session):
+    session.info.pop("candidate_index_dirty", None)
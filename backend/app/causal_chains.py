@@ -0,0 +1,115 @@
+"""
+Per-round causal chain map for /api/game/submit.
+
+Each round serves documents from a fixed corpus, so the CausalChainMapping rows
+for a document never change until the corpus does. Submit looks the served
+docs up in a {doc_id: [CausalChainMapping]} map per round; docs not yet in the
+map are loaded with one joined query (relevance + document + stock) and cached.
+Docs with no relevant link to the round's stocks are cached as empty lists.
+
+The map is dropped together with the candidate index (corpus writes in this
+process) and expires after INDEX_MAX_AGE_SECONDS like the index does.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.candidate_index import candidate_index, INDEX_MAX_AGE_SECONDS
+from app.models import Document, DocumentStockRelevance, StockReturn
+from app.schemas import CausalChainMapping
+
+
+@dataclass
+class RoundChains:
+    by_doc: Dict[str, List[CausalChainMapping]] = field(default_factory=dict)
+    built_at: float = field(default_factory=time.monotonic)
+
+
+class CausalChainCache:
+    def __init__(self, max_age_seconds: float = INDEX_MAX_AGE_SECONDS):
+        self.max_age_seconds = max_age_seconds
+        self._rounds: Dict[str, RoundChains] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, round_id: str | None = None):
+        if round_id is None:
+            self._rounds.clear()
+        else:
+            self._rounds.pop(round_id, None)
+
+    def _entry(self, round_id: str) -> RoundChains:
+        entry = self._rounds.get(round_id)
+        if entry is None or (time.monotonic() - entry.built_at) >= self.max_age_seconds:
+            entry = self._rounds[round_id] = RoundChains()
+        return entry
+
+    async def for_documents(
+        self,
+        db: AsyncSession,
+        round_id: str,
+        doc_ids: List[str],
+    ) -> List[CausalChainMapping]:
+        """Causal chains for the served docs, in served order."""
+        entry = self._entry(round_id)
+        missing = [d for d in dict.fromkeys(doc_ids) if d not in entry.by_doc]
+        self.hits += len(doc_ids) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            entry.by_doc.update(await load_causal_chains(db, round_id, missing))
+
+        chains: List[CausalChainMapping] = []
+        for doc_id in doc_ids:
+            chains.extend(entry.by_doc.get(doc_id, ()))
+        return chains
+
+
+async def load_causal_chains(
+    db: AsyncSession,
+    round_id: str,
+    doc_ids: List[str],
+) -> Dict[str, List[CausalChainMapping]]:
+    """Load chains for `doc_ids` against the round's stocks in a single query."""
+    by_doc: Dict[str, List[CausalChainMapping]] = {doc_id: [] for doc_id in doc_ids}
+    if not doc_ids:
+        return by_doc
+
+    result = await db.execute(
+        select(
+            DocumentStockRelevance.doc_id,
+            DocumentStockRelevance.relevance_type,
+            DocumentStockRelevance.signal_direction_for_ticker,
+            DocumentStockRelevance.causal_chain_for_ticker,
+            Document.title,
+            Document.source_type,
+            Document.source_label,
+            StockReturn.ticker,
+        )
+        .join(Document, Document.id == DocumentStockRelevance.doc_id)
+        .join(StockReturn, StockReturn.id == DocumentStockRelevance.stock_id)
+        .where(
+            DocumentStockRelevance.doc_id.in_(doc_ids),
+            StockReturn.round_id == round_id,
+        )
+        .order_by(DocumentStockRelevance.doc_id, DocumentStockRelevance.id)
+    )
+    for row in result.all():
+        by_doc[row.doc_id].append(CausalChainMapping(
+            doc_id=row.doc_id,
+            doc_title=row.title or row.source_label,
+            source_type=row.source_type,
+            source_label=row.source_label,
+            ticker=row.ticker,
+            relevance_type=row.relevance_type,
+            signal_direction=row.signal_direction_for_ticker,
+            causal_chain=row.causal_chain_for_ticker or "",
+        ))
+    return by_doc
+
+
+causal_chain_cache = CausalChainCache()
+candidate_index.on_invalidate(causal_chain_cache.invalidate)
@@ -0,0 +1,235 @@
+"""
+Persistent company metadata (name, sector, industry, description, emoji).
+
+Metadata comes from yfinance .info plus a Gemini sector / description pass.
+Both are slow and rate limited, and the answers barely change, so each ticker
+is fetched once and stored in the company_metadata table:
+
+- missing ticker: fetched inline (single-flight per ticker) and stored
+- stored but older than COMPANY_METADATA_TTL_DAYS: the stored row is returned
+  right away and a background refresh is started (stale-while-revalidate)
+
+Only validated lookups are stored, and only for tickers in the corpus
+(STOCK_POOL or a round's stocks). Fallbacks (no API key, yfinance or Gemini
+down or rate limited, an unknown sector) are served from memory for
+FALLBACK_TTL_SECONDS and then fetched again.
+
+build_company_metadata.py prefills the table for the whole STOCK_POOL.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.blocking import run_blocking
+from app.config import get_settings
+from app.database import async_session
+from app.gemini_stock_service import (
+    FALLBACK_TTL_SECONDS, SECTOR_EMOJIS, STOCK_POOL, get_basic_company_info,
+    get_stock_metadata_from_gemini, get_stocks_metadata_from_gemini,
+)
+from app.models import CompanyMetadata, StockReturn
+from app.single_flight import SingleFlightCache
+
+settings = get_settings()
+
+FALLBACKS_KEPT = 1024
+
+# Coalesces concurrent upstream fetches; the table itself is the cache
+_fetches: SingleFlightCache[dict] = SingleFlightCache(ttl_seconds=0)
+_refreshes: Dict[str, asyncio.Task] = {}
+# Unvalidated results, kept out of the table: ticker -> (expires, info)
+_fallbacks: Dict[str, Tuple[float, dict]] = {}
+
+
+def _as_dict(row: CompanyMetadata) -> dict:
+    return {
+        "ticker": row.ticker,
+        "company_name": row.company_name,
+        "sector": row.sector,
+        "industry": row.industry or "",
+        "description": row.description or "",
+        "emoji": row.emoji,
+    }
+
+
+def is_stale(row: CompanyMetadata) -> bool:
+    if row.fetched_at is None:
+        return True
+    return datetime.utcnow() - row.fetched_at > timedelta(days=settings.company_metadata_ttl_days)
+
+
+def _combine(ticker: str, basic_info: dict, metadata: dict) -> dict:
+    return {
+        "ticker": ticker,
+        "company_name": basic_info["company_name"],
+        "sector": metadata["sector"],
+        "industry": basic_info.get("industry", ""),
+        "description": metadata["description"],
+        "emoji": SECTOR_EMOJIS.get(metadata["sector"], "📊"),
+        "validated": not basic_info.get("fallback") and not metadata.get("fallback"),
+    }
+
+
+def _fallback(ticker: str) -> Optional[dict]:
+    entry = _fallbacks.get(ticker)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    _fallbacks.pop(ticker, None)
+    return None
+
+
+async def _corpus_tickers(tickers: Iterable[str]) -> set:
+    """The subset of `tickers` that are in STOCK_POOL or a round's stocks."""
+    tickers = set(tickers)
+    known = tickers & set(STOCK_POOL)
+    if tickers - known:
+        async with async_session() as db:
+            result = await db.execute(
+                select(StockReturn.ticker).where(StockReturn.ticker.in_(tickers - known)).distinct()
+            )
+            known.update(result.scalars().all())
+    return known
+
+
+async def fetch_company_metadata(ticker: str) -> dict:
+    """Build metadata from yfinance + Gemini (no DB access)."""
+    basic_info = await run_blocking(get_basic_company_info, ticker, label="yfinance")
+    metadata = await get_stock_metadata_from_gemini(ticker, basic_info["company_name"])
+    return _combine(ticker, basic_info, metadata)
+
+
+async def fetch_many_company_metadata(tickers: Iterable[str]) -> Dict[str, dict]:
+    """fetch_company_metadata for several tickers with batched Gemini prompts."""
+    tickers = list(dict.fromkeys(tickers))
+    basics = await asyncio.gather(
+        *(run_blocking(get_basic_company_info, t, label="yfinance") for t in tickers)
+    )
+    metadata = await get_stocks_metadata_from_gemini(
+        [(t, b["company_name"]) for t, b in zip(tickers, basics)]
+    )
+    return {t: _combine(t, b, metadata[t]) for t, b in zip(tickers, basics)}
+
+
+async def store_company_metadata(*infos: dict, corpus: Iterable[str] = ()) -> int:
+    """
+    Store validated lookups for corpus tickers; anything else is kept in
+    memory only. `corpus` names tickers to treat as corpus tickers even if no
+    StockReturn row has them yet (a round being populated). Returns the number
+    of rows written.
+    """
+    fetched_at = datetime.utcnow()
+    corpus = set(corpus) | await _corpus_tickers(info["ticker"] for info in infos)
+    storable = []
+    for info in infos:
+        if info.get("validated") and info["ticker"] in corpus:
+            storable.append(info)
+            _fallbacks.pop(info["ticker"], None)
+        else:
+            _fallbacks.pop(info["ticker"], None)
+            _fallbacks[info["ticker"]] = (time.monotonic() + FALLBACK_TTL_SECONDS, info)
+            while len(_fallbacks) > FALLBACKS_KEPT:
+                del _fallbacks[next(iter(_fallbacks))]
+    if not storable:
+        return 0
+    async with async_session() as db:
+        for info in storable:
+            await db.merge(CompanyMetadata(
+                ticker=info["ticker"],
+                company_name=info["company_name"],
+                sector=info["sector"],
+                industry=info["industry"],
+                description=info["description"],
+                emoji=info["emoji"],
+                fetched_at=fetched_at,
+            ))
+        await db.commit()
+    return len(storable)
+
+
+async def refresh_company_metadata(ticker: str, in_corpus: bool = False) -> dict:
+    """Fetch fresh metadata for a ticker and store it (see store_company_metadata)."""
+    async def fetch_and_store():
+        info = await fetch_company_metadata(ticker)
+        await store_company_metadata(info, corpus=[ticker] if in_corpus else ())
+        return info
+    return await _fetches.get(ticker, fetch_and_store)
+
+
+async def refresh_many_company_metadata(tickers: Iterable[str]) -> Dict[str, dict]:
+    """Fetch fresh metadata for several tickers and store it."""
+    infos = await fetch_many_company_metadata(tickers)
+    if infos:
+        await store_company_metadata(*infos.values())
+    return infos
+
+
+async def load_company_metadata(tickers: Iterable[str]) -> Dict[str, CompanyMetadata]:
+    """Stored rows for `tickers` in one query (missing tickers are absent)."""
+    tickers = list(tickers)
+    if not tickers:
+        return {}
+    async with async_session() as db:
+        result = await db.execute(
+            select(CompanyMetadata).where(CompanyMetadata.ticker.in_(tickers))
+        )
+        return {row.ticker: row for row in result.scalars().all()}
+
+
+def _schedule_refresh(ticker: str):
+    if ticker in _refreshes:
+        return
+
+    async def run():
+        try:
+            await refresh_company_metadata(ticker)
+        except Exception as e:
+            print(f"⚠️ Metadata refresh for {ticker} failed: {e}")
+        finally:
+            _refreshes.pop(ticker, None)
+
+    _refreshes[ticker] = asyncio.create_task(run())
+
+
+async def get_company_metadata(
+    ticker: str,
+    row: Optional[CompanyMetadata] = None,
+    in_corpus: bool = False,
+) -> dict:
+    """
+    Metadata for one ticker: stored row if present (refreshed in the
+    background when stale), otherwise fetched and stored now. Pass `row` when
+    it was already loaded with load_company_metadata, and `in_corpus` when the
+    ticker is being added to a round (its StockReturn row isn't written yet).
+    """
+    if row is None:
+        row = (await load_company_metadata([ticker])).get(ticker)
+    if row is None:
+        return _fallback(ticker) or await refresh_company_metadata(ticker, in_corpus)
+    if is_stale(row):
+        _schedule_refresh(ticker)
+    return _as_dict(row)
+
+
+async def get_many_company_metadata(tickers: Iterable[str]) -> Dict[str, dict]:
+    """
+    get_company_metadata for several tickers with one DB read; missing
+    tickers are fetched together (batched Gemini prompts).
+    """
+    tickers = list(dict.fromkeys(tickers))
+    stored = await load_company_metadata(tickers)
+    fetched = {t: info for t in tickers if t not in stored and (info := _fallback(t))}
+    fetched.update(await refresh_many_company_metadata(
+        t for t in tickers if t not in stored and t not in fetched
+    ))
+    return {
+        t: fetched[t] if t in fetched else await get_company_metadata(t, stored[t])
+        for t in tickers
+    }
+
+
+def stats() -> dict:
+    return {**_fetches.stats(), "refreshing": len(_refreshes), "fallbacks": len(_fallbacks)}
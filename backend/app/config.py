@@ -10,6 +10,38 @@ class Settings(BaseSettings):
     gemini_api_key: str = ""
     k2_api_url: str = "https://api.mbzuai.ae/v1/chat/completions"
     cors_origins: str = "*"
+    candidate_index_enabled: bool = True
+    round_packs_enabled: bool = True
+    round_pack_pool_size: int = 20
+    round_pack_low_watermark: int = 5
+    selection_seed_variants: int = 64
+    start_cache_size: int = 512
+    retrospective_workers: int = 4
+    retrospective_queue_size: int = 256
+    retrospective_cache_enabled: bool = True
+    retrospective_cache_size: int = 1024
+    retrospective_bucket_pct: float = 5.0
+    retrospective_score_band: int = 10
+    price_store_path: str = "data/prices"
+    price_backfill_enabled: bool = True
+    blocking_workers: int = 8
+    blocking_queue_size: int = 64
+    stock_info_ttl_seconds: int = 3600
+    company_metadata_ttl_days: int = 30
+    gemini_batch_size: int = 10
+    gemini_concurrency: int = 4
+    http_max_connections: int = 20
+    http_max_keepalive: int = 10
+    http_keepalive_expiry: float = 30.0
+    http2_enabled: bool = False
+    ws_send_queue_size: int = 64
+    ws_send_timeout_seconds: float = 5.0
+    ws_json_encoder: str = "auto"
+    timer_tick_seconds: float = 0.1
+    timer_wheel_slots: int = 512
+    room_store: str = "memory"
+    room_store_path: str = "data/rooms.db"
+    room_bus_path: str = ""
 
     @property
     def cors_origin_list(self) -> list[str]:
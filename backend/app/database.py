@@ -1,3 +1,8 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 from app.config import get_settings
@@ -16,6 +21,36 @@ engine = create_async_engine(
     echo=False,
 )
 
+
+# ── Query instrumentation ──────────────────────────────────────────────────────
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+
+_query_counter: ContextVar[Optional[QueryCounter]] = ContextVar("query_counter", default=None)
+
+
+# Listens on every Engine so ad-hoc engines (benchmarks, CLIs) are counted too
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements executed in the current context (e.g. one request)."""
+    counter = QueryCounter()
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -23,6 +58,27 @@ class Base(DeclarativeBase):
     pass
 
 
+def add_missing_columns(sync_conn):
+    """
+    Additive schema sync for existing databases: create_all() never alters
+    tables, so ADD COLUMN any nullable model column the table doesn't have yet.
+    Run with `await conn.run_sync(add_missing_columns)` after create_all.
+    """
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(
+                f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {col_type}'
+            )
+
+
 async def get_db() -> AsyncSession:
     async with async_session() as session:
         try:
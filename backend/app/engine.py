@@ -7,18 +7,40 @@ Selects documents for a round by working backward from known stock returns:
 3. Filter to docs where signal_direction ALIGNS with actual return direction
 4. Score by signal_strength × difficulty_weight
 5. Select top 2 per stock + 1-2 macro docs + 0-1 red herrings
+   (macro docs and herrings are weighted-random picks by the same score)
 6. Shuffle — never reveal which stock a doc maps to
 """
 
 import random
 from datetime import timedelta
-from sqlalchemy import select, and_, or_, case
+from typing import Iterable, Optional
+from sqlalchemy import select, and_, or_, case, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, raiseload
+from app.config import get_settings
 from app.models import (
     Document, StockReturn, DocumentStockRelevance, RoundConfig,
     SignalDirection, RelevanceType, Difficulty,
 )
+from app.candidate_index import candidate_index, RoundCandidates, IndexedDocument
+from app.sampling import WeightedReservoir, VarietyTopK
 
+settings = get_settings()
+
+
+# Lean loading for ranking: only the columns the engine scores on, no
+# relationships. Full bodies are loaded for the winners only.
+LEAN_DOCUMENT_LOAD = (
+    load_only(
+        Document.id, Document.difficulty, Document.signal_strength,
+        Document.source_type, Document.publish_date, Document.signal_direction,
+    ),
+    raiseload("*"),
+)
+
+# Extra ranked candidates fetched per stock so variety picks and docs already
+# taken by earlier stocks don't starve a stock of its quota
+CANDIDATE_DEPTH_SLACK = 4
 
 DIFFICULTY_WEIGHTS = {
     "easy": {"easy": 3, "medium": 2, "hard": 1},
@@ -35,155 +57,309 @@ async def select_documents_for_round(
     docs_per_stock: int = 2,
     macro_docs: int = 2,
     red_herrings: int = 1,
-) -> list[Document]:
+    seed: Optional[int] = None,
+) -> list[Document | IndexedDocument]:
     """
     Select 8-12 documents for a game round using the backward-linkage algorithm.
+
+    Picks from the in-memory candidate index (no DB round-trips once the round
+    is indexed). With the index disabled, queries the database directly.
+    All randomness comes from `seed`, so the same (round, difficulty, seed)
+    over the same corpus always yields the same documents in the same order.
     """
+    rng = random.Random(seed)
+    if settings.candidate_index_enabled:
+        candidates = await candidate_index.get(db, round_config)
+        return select_from_index(
+            candidates, stocks, difficulty=difficulty,
+            docs_per_stock=docs_per_stock, macro_docs=macro_docs,
+            red_herrings=red_herrings, rng=rng,
+        )
+
+    return await _select_from_db(
+        db, round_config, stocks, difficulty=difficulty,
+        docs_per_stock=docs_per_stock, macro_docs=macro_docs,
+        red_herrings=red_herrings, rng=rng,
+    )
+
+
+def _expected_direction(stock: StockReturn) -> Optional[str]:
+    """Signal direction a doc must carry for this stock (None = flat, accept any)."""
+    if stock.return_pct > 5:
+        return "bullish"
+    if stock.return_pct < -5:
+        return "bearish"
+    return None
+
+
+def select_from_index(
+    candidates: RoundCandidates,
+    stocks: list[StockReturn],
+    difficulty: str = "medium",
+    docs_per_stock: int = 2,
+    macro_docs: int = 2,
+    red_herrings: int = 1,
+    rng: Optional[random.Random] = None,
+) -> list[IndexedDocument]:
+    """Run the selection steps against a round's in-memory candidate pools."""
+    rng = rng or random.Random()
     weights = DIFFICULTY_WEIGHTS.get(difficulty, DIFFICULTY_WEIGHTS["medium"])
     selected_doc_ids: set[str] = set()
-    selected_docs: list[Document] = []
-
-    # Lookback window: docs published up to 90 days before the period start
-    lookback_start = round_config.period_start - timedelta(days=90)
-    lookback_end = round_config.period_start
+    selected_docs: list[IndexedDocument] = []
 
-    # ── Step 1: Select docs per stock (direct + sector relevance) ──────────
+    # ── Step 1: Top docs per stock, aligned with the actual return ─────────
     for stock in stocks:
-        # Determine the expected signal direction based on actual return
-        if stock.return_pct > 5:
-            expected_direction = "bullish"
-        elif stock.return_pct < -5:
-            expected_direction = "bearish"
-        else:
-            expected_direction = None  # flat — accept any direction
+        top = VarietyTopK(docs_per_stock)
+        for doc in candidates.for_stock(stock.id, _expected_direction(stock)):
+            if doc.id not in selected_doc_ids:
+                top.offer(doc, _doc_weight(doc, weights), doc.source_type or "article")
+        picked = _pick_with_variety(top.ranked(), docs_per_stock, selected_doc_ids)
+        selected_docs.extend(picked)
+        selected_doc_ids.update(d.id for d in picked)
 
-        # Query docs linked to this stock via the relevance table
-        query = (
-            select(Document)
-            .join(DocumentStockRelevance, DocumentStockRelevance.doc_id == Document.id)
-            .where(
-                and_(
-                    DocumentStockRelevance.stock_id == stock.id,
-                    Document.publish_date >= lookback_start,
-                    Document.publish_date <= lookback_end,
-                    Document.id.notin_(selected_doc_ids) if selected_doc_ids else True,
-                )
-            )
-        )
+    # ── Step 2: Macro docs (weighted random) ───────────────────────────────
+    _extend_weighted(selected_docs, selected_doc_ids, candidates.macro, macro_docs, weights, rng)
 
-        # Filter by signal direction alignment
-        if expected_direction is not None:
-            query = query.where(
-                DocumentStockRelevance.signal_direction_for_ticker == expected_direction
-            )
+    # ── Step 3: Red herrings (weighted random) ─────────────────────────────
+    _extend_weighted(selected_docs, selected_doc_ids, candidates.mixed, red_herrings, weights, rng)
 
-        result = await db.execute(query)
-        # Deduplicate (JOIN can produce duplicate rows)
-        seen_ids = set()
-        candidates = []
-        for doc in result.scalars().all():
-            if doc.id not in seen_ids:
-                seen_ids.add(doc.id)
-                candidates.append(doc)
+    # ── Step 4: Fallback to any doc linked to the round ────────────────────
+    if len(selected_docs) < 8:
+        for doc in candidates.linked:
+            if len(selected_docs) >= 12:
+                break
+            if doc.id not in selected_doc_ids:
+                selected_docs.append(doc)
+                selected_doc_ids.add(doc.id)
+
+    # ── Step 5: Shuffle to hide stock mapping ──────────────────────────────
+    rng.shuffle(selected_docs)
+    return selected_docs
+
+
+def _doc_weight(doc, weights: dict[str, int]) -> float:
+    """signal_strength × difficulty weight — the engine's ranking score."""
+    return (doc.signal_strength or 3) * weights.get(doc.difficulty or "medium", 2)
+
+
+def _extend_weighted(
+    selected_docs: list,
+    selected_doc_ids: set[str],
+    pool: Iterable,
+    n: int,
+    weights: dict[str, int],
+    rng: random.Random,
+):
+    """Append up to n unselected docs from pool, sampled by ranking weight."""
+    reservoir = WeightedReservoir(n, rng)
+    for doc in pool:
+        if doc.id not in selected_doc_ids:
+            reservoir.offer(doc, _doc_weight(doc, weights))
+    for doc in reservoir.items():
+        selected_docs.append(doc)
+        selected_doc_ids.add(doc.id)
+
+
+async def _select_from_db(
+    db: AsyncSession,
+    round_config: RoundConfig,
+    stocks: list[StockReturn],
+    difficulty: str = "medium",
+    docs_per_stock: int = 2,
+    macro_docs: int = 2,
+    red_herrings: int = 1,
+    rng: Optional[random.Random] = None,
+) -> list[Document]:
+    """
+    Selection straight from the database.
 
-        # Score candidates: signal_strength × difficulty_weight
-        def score_doc(doc: Document) -> float:
-            diff_key = doc.difficulty if doc.difficulty else "medium"
-            return (doc.signal_strength or 3) * weights.get(diff_key, 2)
+    One ranked query covers every stock of the round, one more streams the
+    macro and red-herring pools; the fallback query only runs for thin rounds.
+    """
+    rng = rng or random.Random()
+    weights = DIFFICULTY_WEIGHTS.get(difficulty, DIFFICULTY_WEIGHTS["medium"])
+    selected_doc_ids: set[str] = set()
+    selected_docs: list[Document] = []
 
-        candidates.sort(key=score_doc, reverse=True)
+    # Lookback window: docs published up to 90 days before the period start
+    lookback_start = round_config.period_start - timedelta(days=90)
+    lookback_end = round_config.period_start
+    in_window = and_(
+        Document.publish_date >= lookback_start,
+        Document.publish_date <= lookback_end,
+    )
 
+    # ── Step 1: Top-ranked docs per stock, all stocks in one query ─────────
+    ranked = await _ranked_candidates_by_stock(
+        db, stocks, in_window, difficulty,
+        depth=docs_per_stock + CANDIDATE_DEPTH_SLACK,
+    )
+    for stock in stocks:
+        top = VarietyTopK(docs_per_stock)
+        for doc in ranked.get(stock.id, []):
+            if doc.id not in selected_doc_ids:
+                top.offer(doc, _doc_weight(doc, weights), doc.source_type or "article")
         # Pick top N, but prefer source_type variety
-        picked = _pick_with_variety(candidates, docs_per_stock, selected_doc_ids)
+        picked = _pick_with_variety(top.ranked(), docs_per_stock, selected_doc_ids)
         selected_docs.extend(picked)
         selected_doc_ids.update(d.id for d in picked)
 
-    # ── Step 2: Add macro-level documents ──────────────────────────────────
-    macro_query = (
-        select(Document)
-        .join(DocumentStockRelevance, DocumentStockRelevance.doc_id == Document.id)
+    # ── Steps 2-3: Macro docs + red herrings (mixed signal) in one query ───
+    is_macro = (
+        select(DocumentStockRelevance.id)
         .where(
             and_(
+                DocumentStockRelevance.doc_id == Document.id,
                 DocumentStockRelevance.relevance_type == "macro",
-                Document.publish_date >= lookback_start,
-                Document.publish_date <= lookback_end,
-                Document.id.notin_(selected_doc_ids) if selected_doc_ids else True,
             )
         )
+        .exists()
     )
-    result = await db.execute(macro_query)
-    # Deduplicate in Python (DISTINCT fails on JSON columns in Postgres)
-    seen = set()
-    macro_candidates = []
-    for doc in result.scalars().all():
-        if doc.id not in seen:
-            seen.add(doc.id)
-            macro_candidates.append(doc)
-    random.shuffle(macro_candidates)
-
-    for doc in macro_candidates[:macro_docs]:
-        if doc.id not in selected_doc_ids:
-            selected_docs.append(doc)
-            selected_doc_ids.add(doc.id)
-
-    # ── Step 3: Add red herrings (mixed signal docs) ───────────────────────
-    herring_query = (
-        select(Document)
-        .where(
-            and_(
-                Document.signal_direction == "mixed",
-                Document.publish_date >= lookback_start,
-                Document.publish_date <= lookback_end,
-                Document.id.notin_(selected_doc_ids) if selected_doc_ids else True,
-            )
-        )
+    # Streamed into weighted reservoirs: O(k) memory however large the pools.
+    # Herrings keep macro_docs spare slots in case a macro pick is also mixed.
+    macro_pool = WeightedReservoir(macro_docs, rng)
+    herring_pool = WeightedReservoir(red_herrings + macro_docs, rng)
+    result = await db.stream(
+        select(Document, is_macro.label("is_macro"))
+        .where(and_(in_window, or_(is_macro, Document.signal_direction == "mixed")))
+        .order_by(Document.id)  # stable stream order keeps seeded picks reproducible
+        .options(*LEAN_DOCUMENT_LOAD)
     )
-    result = await db.execute(herring_query)
-    herring_candidates = list(result.scalars().all())
-    random.shuffle(herring_candidates)
+    async for doc, macro in result:
+        if doc.id in selected_doc_ids:
+            continue
+        weight = _doc_weight(doc, weights)
+        if macro:
+            macro_pool.offer(doc, weight)
+        if doc.signal_direction == "mixed":
+            herring_pool.offer(doc, weight)
 
-    for doc in herring_candidates[:red_herrings]:
-        if doc.id not in selected_doc_ids:
-            selected_docs.append(doc)
-            selected_doc_ids.add(doc.id)
+    picks = macro_pool.items()
+    picked_ids = {d.id for d in picks}
+    picks += [d for d in herring_pool.items() if d.id not in picked_ids][:red_herrings]
+    for doc in picks:
+        selected_docs.append(doc)
+        selected_doc_ids.add(doc.id)
 
     # ── Step 4: If we don't have enough docs, pull any remaining linked docs
     if len(selected_docs) < 8:
+        linked = (
+            select(DocumentStockRelevance.doc_id)
+            .join(StockReturn, StockReturn.id == DocumentStockRelevance.stock_id)
+            .where(StockReturn.round_id == round_config.id)
+        )
         fallback_query = (
             select(Document)
-            .join(DocumentStockRelevance, DocumentStockRelevance.doc_id == Document.id)
-            .join(StockReturn, StockReturn.id == DocumentStockRelevance.stock_id)
             .where(
                 and_(
-                    StockReturn.round_id == round_config.id,
+                    Document.id.in_(linked),
                     Document.id.notin_(selected_doc_ids) if selected_doc_ids else True,
                 )
             )
+            .order_by(Document.id)
             .limit(12 - len(selected_docs))
+            .options(*LEAN_DOCUMENT_LOAD)
         )
         result = await db.execute(fallback_query)
-        seen_fallback = set()
         for doc in result.scalars().all():
-            if doc.id not in selected_doc_ids:
-                selected_docs.append(doc)
-                selected_doc_ids.add(doc.id)
+            selected_docs.append(doc)
+            selected_doc_ids.add(doc.id)
 
-    # ── Step 5: Shuffle to hide stock mapping ──────────────────────────────
-    random.shuffle(selected_docs)
+    # ── Step 5: Load full bodies for the winners only ──────────────────────
+    selected_docs = await load_full_documents(db, [d.id for d in selected_docs])
+
+    # ── Step 6: Shuffle to hide stock mapping ──────────────────────────────
+    rng.shuffle(selected_docs)
 
     return selected_docs
 
 
+async def load_full_documents(db: AsyncSession, doc_ids: list[str]) -> list[Document]:
+    """Load complete Document rows (raw_text etc.) for the given IDs, in order."""
+    if not doc_ids:
+        return []
+    result = await db.execute(
+        select(Document)
+        .where(Document.id.in_(doc_ids))
+        .options(raiseload("*"))
+        # The lean instances are already in the identity map — refresh them
+        .execution_options(populate_existing=True)
+    )
+    by_id = {doc.id: doc for doc in result.scalars().all()}
+    return [by_id[doc_id] for doc_id in doc_ids if doc_id in by_id]
+
+
+async def _ranked_candidates_by_stock(
+    db: AsyncSession,
+    stocks: list[StockReturn],
+    in_window,
+    difficulty: str,
+    depth: int,
+) -> dict[str, list[Document]]:
+    """
+    Top `depth` docs per stock, ranked by signal_strength × difficulty weight
+    with ROW_NUMBER() OVER (PARTITION BY stock_id). Works on SQLite (3.25+)
+    and Postgres.
+    """
+    if not stocks:
+        return {}
+
+    weights = DIFFICULTY_WEIGHTS.get(difficulty, DIFFICULTY_WEIGHTS["medium"])
+    doc_weight = case(
+        *[(Document.difficulty == key, value) for key, value in weights.items()],
+        else_=2,
+    )
+    score = func.coalesce(Document.signal_strength, 3) * doc_weight
+
+    # Per-stock signal alignment: flat stocks accept any direction
+    stock_filters = []
+    for stock in stocks:
+        expected_direction = _expected_direction(stock)
+        if expected_direction is None:
+            stock_filters.append(DocumentStockRelevance.stock_id == stock.id)
+        else:
+            stock_filters.append(and_(
+                DocumentStockRelevance.stock_id == stock.id,
+                DocumentStockRelevance.signal_direction_for_ticker == expected_direction,
+            ))
+
+    ranked = (
+        select(
+            DocumentStockRelevance.doc_id.label("doc_id"),
+            DocumentStockRelevance.stock_id.label("stock_id"),
+            func.row_number().over(
+                partition_by=DocumentStockRelevance.stock_id,
+                order_by=(score.desc(), Document.publish_date, Document.id),
+            ).label("rank"),
+        )
+        .join(Document, Document.id == DocumentStockRelevance.doc_id)
+        .where(and_(in_window, or_(*stock_filters)))
+        .subquery()
+    )
+    result = await db.stream(
+        select(Document, ranked.c.stock_id)
+        .join(ranked, ranked.c.doc_id == Document.id)
+        .where(ranked.c.rank <= depth)
+        .order_by(ranked.c.stock_id, ranked.c.rank)
+        .options(*LEAN_DOCUMENT_LOAD)
+    )
+
+    by_stock: dict[str, list[Document]] = {}
+    async for doc, stock_id in result:
+        by_stock.setdefault(stock_id, []).append(doc)
+    return by_stock
+
+
 def _pick_with_variety(
-    candidates: list[Document],
+    candidates: list,
     n: int,
     already_selected: set[str],
-) -> list[Document]:
+) -> list:
     """Pick n docs from candidates, preferring source_type variety."""
     if not candidates:
         return []
 
-    picked: list[Document] = []
+    picked: list = []
     seen_types: set[str] = set()
 
     # First pass: pick one of each source type
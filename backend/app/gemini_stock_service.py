@@ -3,19 +3,25 @@ Gemini Stock Service - Dynamic stock generation using Gemini 2.5 Flash.
 
 This service:
 1. Selects stocks dynamically from a pool
-2. Fetches real returns via yfinance
+2. Screens the pool's real returns in one pass over the local price store
 3. Ensures ~50% gains and ~50% losses
-4. Uses Gemini to generate sector/description metadata
+4. Uses Gemini to generate sector/description metadata (stored per ticker
+   in the company_metadata table, see app/company_metadata.py)
 """
 
+import asyncio
 import json
 import random
-import httpx
 from datetime import date, timedelta
-from typing import Optional
-import yfinance as yf
+from typing import Dict, List, Optional, Tuple
+
+import httpx
 
 from app.config import get_settings
+from app.price_store import price_provider, price_store
+from app.blocking import run_blocking
+from app.single_flight import SingleFlightCache
+from app.http_clients import http_clients
 
 settings = get_settings()
 
@@ -90,27 +96,27 @@ SECTOR_EMOJIS = {
 
 
 def fetch_stock_return(ticker: str, start_date: date, end_date: date) -> Optional[float]:
-    """Fetch actual stock return percentage using yfinance."""
-    try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)
-        
-        if hist.empty or len(hist) < 2:
-            return None
-        
-        start_price = hist.iloc[0]['Close']
-        end_price = hist.iloc[-1]['Close']
-        return_pct = ((end_price - start_price) / start_price) * 100
-        
-        return round(return_pct, 2)
-    except Exception as e:
-        print(f"Error fetching {ticker}: {e}")
-        return None
+    """Actual stock return percentage from the local price store."""
+    return price_provider.return_pct(ticker, start_date, end_date)
+
+
+def screen_period_returns(tickers: List[str], start_date: date, end_date: date) -> Dict[str, float]:
+    """
+    Returns for a whole ticker list from one close matrix. Tickers the store
+    doesn't hold are skipped; stored tickers whose ingest doesn't reach the
+    period (e.g. it ends after the last build) are backfilled together in one
+    batched download, never one by one.
+    """
+    stored = [t for t in tickers if price_store.has(t)]
+    if stored:
+        tickers = stored
+    return price_provider.period_returns(tickers, start_date, end_date)
 
 
 def get_basic_company_info(ticker: str) -> dict:
     """Get basic company info from yfinance."""
     try:
+        import yfinance as yf
         stock = yf.Ticker(ticker)
         info = stock.info
         return {
@@ -120,7 +126,68 @@ def get_basic_company_info(ticker: str) -> dict:
             "description": info.get("longBusinessSummary", "")[:200] if info.get("longBusinessSummary") else "",
         }
     except Exception:
-        return {"company_name": ticker, "sector": "", "industry": "", "description": ""}
+        return {"company_name": ticker, "sector": "", "industry": "", "description": "", "fallback": True}
+
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+
+# Shared by every Gemini call in this process
+_gemini_slots = asyncio.Semaphore(settings.gemini_concurrency)
+
+GEMINI_BATCH_RETRIES = 2   # extra attempts for a batch rate limited or failed in transport
+
+# How long a fallback answer (upstream down, no API key) is served before retrying
+FALLBACK_TTL_SECONDS = 300
+
+# A reply that arrived but isn't the JSON we asked for
+_REPLY_ERRORS = (ValueError, KeyError, IndexError, TypeError, AttributeError)
+
+
+def _retryable(e: httpx.HTTPError) -> bool:
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return True
+
+
+def _default_metadata(company_name: str) -> dict:
+    # "fallback": a placeholder, not a lookup; never persisted
+    return {
+        "sector": "Technology",
+        "description": f"{company_name} is a publicly traded company.",
+        "fallback": True,
+    }
+
+
+async def _gemini_json(prompt: str, max_output_tokens: int):
+    """Send one prompt to Gemini 2.5 Flash and parse its JSON reply."""
+    async with _gemini_slots:
+        response = await http_clients.get("gemini").post(
+            GEMINI_URL,
+            params={"key": settings.gemini_api_key},
+            json={
+                "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+                "generationConfig": {
+                    "maxOutputTokens": max_output_tokens,
+                    "temperature": 0.3,
+                },
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+    
+    # Extract text from response
+    parts = data.get("candidates", [{}])[0].get("content", {}).get("parts", [])
+    raw_text = ""
+    for part in parts:
+        if part.get("text"):
+            raw_text += part["text"]
+    
+    # Parse JSON from response
+    raw_text = raw_text.strip()
+    if raw_text.startswith("```"):
+        raw_text = raw_text.replace("```json", "").replace("```", "").strip()
+    
+    return json.loads(raw_text)
 
 
 async def get_stock_metadata_from_gemini(ticker: str, company_name: str) -> dict:
@@ -129,10 +196,7 @@ async def get_stock_metadata_from_gemini(ticker: str, company_name: str) -> dict
     """
     if not settings.gemini_api_key:
         # Fallback to default
-        return {
-            "sector": "Technology",
-            "description": f"{company_name} is a publicly traded company.",
-        }
+        return _default_metadata(company_name)
     
     prompt = f"""You are a financial analyst. For the stock ticker {ticker} ({company_name}), provide:
 
@@ -143,48 +207,98 @@ Respond with ONLY valid JSON in this exact format:
 {{"sector": "one of the valid sectors", "description": "investment-focused description"}}"""
 
     try:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={settings.gemini_api_key}"
+        result = await _gemini_json(prompt, max_output_tokens=256)
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                url,
-                json={
-                    "contents": [{"role": "user", "parts": [{"text": prompt}]}],
-                    "generationConfig": {
-                        "maxOutputTokens": 256,
-                        "temperature": 0.3,
-                    },
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Extract text from response
-            parts = data.get("candidates", [{}])[0].get("content", {}).get("parts", [])
-            raw_text = ""
-            for part in parts:
-                if part.get("text"):
-                    raw_text += part["text"]
-            
-            # Parse JSON from response
-            raw_text = raw_text.strip()
-            if raw_text.startswith("```"):
-                raw_text = raw_text.replace("```json", "").replace("```", "").strip()
-            
-            result = json.loads(raw_text)
-            
-            # Validate sector
-            if result.get("sector") not in VALID_SECTORS:
-                result["sector"] = "Technology"  # Default fallback
-            
-            return result
+        # Validate sector
+        if result.get("sector") not in VALID_SECTORS:
+            result["sector"] = "Technology"  # Default fallback
+            result["fallback"] = True
+        
+        return result
             
     except Exception as e:
         print(f"Gemini API error for {ticker}: {e}")
-        return {
-            "sector": "Technology",
-            "description": f"{company_name} is a publicly traded company.",
-        }
+        return _default_metadata(company_name)
+
+
+async def _classify_batch(stocks: List[Tuple[str, str]]) -> Dict[str, dict]:
+    listing = "\n".join(f"- {ticker} ({company_name})" for ticker, company_name in stocks)
+    prompt = f"""You are a financial analyst. For EACH of these stock tickers, provide:
+
+1. sector: Categorize into EXACTLY ONE of these sectors: {', '.join(VALID_SECTORS)}
+2. description: A concise 1-2 sentence investment-focused description explaining what the company does and why investors care about it. Include key business drivers and market position.
+
+Tickers:
+{listing}
+
+Respond with ONLY a valid JSON array with one object per ticker, in this exact format:
+[{{"ticker": "TICKER", "sector": "one of the valid sectors", "description": "investment-focused description"}}]"""
+
+    results: Dict[str, dict] = {}
+    items = []
+    for attempt in range(GEMINI_BATCH_RETRIES + 1):
+        try:
+            items = await _gemini_json(prompt, max_output_tokens=256 * len(stocks))
+            break
+        except _REPLY_ERRORS as e:
+            # Unparseable reply: the per-ticker fallback below covers it
+            print(f"Gemini batch reply unparseable for {', '.join(t for t, _ in stocks)}: {e}")
+            break
+        except httpx.HTTPError as e:
+            # Rate limited / transport failure: retry, then fail the batch
+            if attempt == GEMINI_BATCH_RETRIES or not _retryable(e):
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+    try:
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict) or not item.get("description"):
+                continue
+            sector = item.get("sector")
+            results[str(item.get("ticker", "")).upper()] = {
+                "sector": sector if sector in VALID_SECTORS else "Technology",
+                "description": item["description"],
+                "fallback": sector not in VALID_SECTORS,
+            }
+    except _REPLY_ERRORS as e:
+        print(f"Gemini batch reply malformed for {', '.join(t for t, _ in stocks)}: {e}")
+
+    # Per-ticker fallback for anything the batch reply didn't cover
+    missing = [(t, name) for t, name in stocks if t not in results]
+    if missing:
+        fallbacks = await asyncio.gather(
+            *(get_stock_metadata_from_gemini(t, name) for t, name in missing)
+        )
+        results.update({t: meta for (t, _), meta in zip(missing, fallbacks)})
+    return {t: results[t] for t, _ in stocks}
+
+
+async def get_stocks_metadata_from_gemini(stocks: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """
+    Sector and description for many (ticker, company_name) pairs.
+
+    Tickers are classified GEMINI_BATCH_SIZE per prompt (one JSON array
+    reply), batches run concurrently under the shared Gemini semaphore, and a
+    ticker missing from or malformed in its batch reply is retried alone. A
+    batch that still fails in transport (rate limit, timeout) after retries
+    gets default metadata marked "fallback", which is never stored.
+    """
+    stocks = list(dict(stocks).items())
+    if not settings.gemini_api_key:
+        return {t: _default_metadata(name) for t, name in stocks}
+
+    size = max(1, settings.gemini_batch_size)
+    chunks = [stocks[i:i + size] for i in range(0, len(stocks), size)]
+    batches = await asyncio.gather(
+        *(_classify_batch(chunk) for chunk in chunks), return_exceptions=True
+    )
+    results: Dict[str, dict] = {}
+    for chunk, batch in zip(chunks, batches):
+        if isinstance(batch, Exception):
+            print(f"Gemini batch failed for {', '.join(t for t, _ in chunk)}: {batch}")
+            batch = {t: _default_metadata(name) for t, name in chunk}
+        results.update(batch)
+    return results
 
 
 async def generate_stocks_for_round(
@@ -207,24 +321,23 @@ async def generate_stocks_for_round(
     Returns:
         List of stock dictionaries with ticker, company_name, sector, emoji, return_pct, description
     """
-    # Shuffle pool and fetch returns
+    # Shuffle pool and screen every candidate's return in one pass
     shuffled_pool = random.sample(STOCK_POOL, min(len(STOCK_POOL), 50))
+    returns = await run_blocking(
+        screen_period_returns, shuffled_pool, period_start, period_end, label="prices"
+    )
     
     gainers = []
     losers = []
     
     for ticker in shuffled_pool:
-        return_pct = fetch_stock_return(ticker, period_start, period_end)
+        return_pct = returns.get(ticker)
         if return_pct is None:
             continue
         
-        basic_info = get_basic_company_info(ticker)
-        
         stock_data = {
             "ticker": ticker,
-            "company_name": basic_info["company_name"],
             "return_pct": return_pct,
-            "_basic_sector": basic_info["sector"],
         }
         
         if return_pct > 0:
@@ -255,20 +368,20 @@ async def generate_stocks_for_round(
     # Shuffle to randomize order
     random.shuffle(selected)
     
-    # Enrich with Gemini metadata
+    # Enrich with stored company metadata (fetched only for unseen tickers)
+    from app.company_metadata import get_many_company_metadata
+    metadata_by_ticker = await get_many_company_metadata(s["ticker"] for s in selected)
+
     enriched_stocks = []
     for stock in selected:
-        metadata = await get_stock_metadata_from_gemini(
-            stock["ticker"], 
-            stock["company_name"]
-        )
+        metadata = metadata_by_ticker[stock["ticker"]]
         
         enriched_stocks.append({
             "id": f"{round_id}_{stock['ticker'].lower()}",
             "ticker": stock["ticker"],
-            "company_name": stock["company_name"],
+            "company_name": metadata["company_name"],
             "sector": metadata["sector"],
-            "emoji": SECTOR_EMOJIS.get(metadata["sector"], "📊"),
+            "emoji": metadata["emoji"],
             "return_pct": stock["return_pct"],
             "description": metadata["description"],
             "round_id": round_id,
@@ -279,15 +392,30 @@ async def generate_stocks_for_round(
 
 async def get_stock_info(ticker: str) -> dict:
     """
-    Get stock info for a single ticker, using Gemini for metadata.
+    Get stock info for a single ticker from the company_metadata table.
+    Concurrent requests for a ticker share one lookup, cached for
+    STOCK_INFO_TTL_SECONDS (FALLBACK_TTL_SECONDS for fallback answers, so
+    they are retried once Gemini / yfinance recover).
     """
-    basic_info = get_basic_company_info(ticker)
-    metadata = await get_stock_metadata_from_gemini(ticker, basic_info["company_name"])
+    info, _ = await stock_info_cache.get(ticker, lambda: _fetch_stock_info(ticker))
+    return info
+
+
+async def _fetch_stock_info(ticker: str) -> Tuple[dict, bool]:
+    """(info, validated)"""
+    from app.company_metadata import get_company_metadata
+    metadata = await get_company_metadata(ticker)
     
     return {
         "ticker": ticker,
-        "company_name": basic_info["company_name"],
+        "company_name": metadata["company_name"],
         "sector": metadata["sector"],
         "description": metadata["description"],
-        "emoji": SECTOR_EMOJIS.get(metadata["sector"], "📊"),
-    }
+        "emoji": metadata["emoji"],
+    }, metadata.get("validated", True)     # stored rows are always validated
+
+
+stock_info_cache = SingleFlightCache(
+    ttl_seconds=settings.stock_info_ttl_seconds,
+    ttl_for=lambda entry: None if entry[1] else FALLBACK_TTL_SECONDS,
+)
@@ -4,13 +4,15 @@ Historical price data service for portfolio performance graphs.
 
 from datetime import date, timedelta
 from typing import Dict, List
-import yfinance as yf
-import pandas as pd
+import numpy as np
+
+from app.price_store import price_provider
+from app.scoring import optimal_allocations
 
 
 def get_daily_prices(ticker: str, start_date: date, end_date: date) -> List[Dict]:
     """
-    Fetch daily closing prices for a stock.
+    Daily closing prices for a stock from the local price store.
 
     Args:
         ticker: Stock ticker symbol
@@ -20,25 +22,39 @@ def get_daily_prices(ticker: str, start_date: date, end_date: date) -> List[Dict
     Returns:
         List of {date: "YYYY-MM-DD", close: float}
     """
-    try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date, interval='1d')
+    return price_provider.daily_closes(ticker, start_date, end_date)
 
-        if hist.empty:
-            return []
 
-        result = []
-        for date_idx, row in hist.iterrows():
-            result.append({
-                'date': date_idx.strftime('%Y-%m-%d'),
-                'close': float(row['Close'])
-            })
+def forward_fill(closes: np.ndarray) -> np.ndarray:
+    """Carry each column's last close forward over NaN gaps (leading NaNs stay)."""
+    rows = np.arange(closes.shape[0])[:, None]
+    last = np.where(np.isnan(closes), 0, rows)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = closes[last, np.arange(closes.shape[1])]
+    # Leading gaps pick up row 0, which is NaN for those columns anyway
+    return filled
 
-        return result
 
-    except Exception as e:
-        print(f"Error fetching daily prices for {ticker}: {e}")
-        return []
+def portfolio_values(
+    closes: np.ndarray,
+    weights: np.ndarray,
+    initial_balance: float = 1000000.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Portfolio value per row of an aligned (dates × tickers) close matrix.
+
+    Each ticker is forward-filled, normalized by its own first close, and the
+    rows are combined with one matrix-vector product against `weights`
+    (allocation percentages). Rows before every ticker has a first close are
+    dropped. Returns (row mask of kept dates, values).
+    """
+    filled = forward_fill(closes)
+    first_idx = np.argmax(~np.isnan(closes), axis=0)
+    first = closes[first_idx, np.arange(closes.shape[1])]
+    valid = ~np.isnan(filled).any(axis=1)
+    growth = filled[valid] / first
+    values = growth @ (weights / 100.0) * initial_balance
+    return valid, values
 
 
 def get_portfolio_time_series(
@@ -51,7 +67,7 @@ def get_portfolio_time_series(
     Calculate weighted portfolio value over time.
 
     Args:
-        allocations: Dict of {ticker: allocation_percentage} (e.g., {"NVDA": 0.30, "MSFT": 0.25})
+        allocations: Dict of {ticker: allocation_percentage} (e.g., {"NVDA": 30.0, "MSFT": 25.0})
         start_date: Start date
         end_date: End date
         initial_balance: Starting portfolio value (default: $1M)
@@ -62,76 +78,20 @@ def get_portfolio_time_series(
     if not allocations:
         return []
 
-    # Fetch historical data for all tickers
-    ticker_data = {}
-    for ticker in allocations.keys():
-        prices = get_daily_prices(ticker, start_date, end_date)
-        if prices:
-            ticker_data[ticker] = prices
+    tickers = list(allocations)
+    dates, closes = price_provider.close_matrix(tickers, start_date, end_date)
 
-    if not ticker_data:
+    # Every allocated ticker needs price data
+    if not len(dates) or np.isnan(closes).all(axis=0).any():
         return []
 
-    # Build a unified date index from all tickers
-    all_dates = set()
-    for prices in ticker_data.values():
-        for price_point in prices:
-            all_dates.add(price_point['date'])
-
-    dates_sorted = sorted(list(all_dates))
+    weights = np.array([allocations[t] for t in tickers], dtype=float)
+    valid, values = portfolio_values(closes, weights, initial_balance)
 
-    # Convert to DataFrames for easier manipulation
-    dfs = {}
-    for ticker, prices in ticker_data.items():
-        df = pd.DataFrame(prices)
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.set_index('date')
-        dfs[ticker] = df
-
-    # Calculate portfolio value for each date
-    result = []
-    for date_str in dates_sorted:
-        date_dt = pd.to_datetime(date_str)
-        portfolio_value = 0.0
-        valid_data = True
-
-        for ticker, allocation_pct in allocations.items():
-            if ticker not in dfs:
-                valid_data = False
-                break
-
-            df = dfs[ticker]
-
-            # Get price on this date (or forward-fill if missing)
-            if date_dt in df.index:
-                price = df.loc[date_dt, 'close']
-            else:
-                # Forward fill - use last known price
-                earlier_prices = df[df.index <= date_dt]
-                if earlier_prices.empty:
-                    valid_data = False
-                    break
-                price = earlier_prices.iloc[-1]['close']
-
-            # Get initial price (first date)
-            first_date = df.index[0]
-            initial_price = df.loc[first_date, 'close']
-
-            # Calculate return for this stock
-            stock_return = (price - initial_price) / initial_price
-
-            # Calculate contribution to portfolio
-            allocation_amount = initial_balance * (allocation_pct / 100.0)
-            current_value = allocation_amount * (1 + stock_return)
-            portfolio_value += current_value
-
-        if valid_data:
-            result.append({
-                'date': date_str,
-                'portfolio_value': round(portfolio_value, 2)
-            })
-
-    return result
+    return [
+        {'date': str(d), 'portfolio_value': round(float(v), 2)}
+        for d, v in zip(dates[valid], values)
+    ]
 
 
 def get_optimal_portfolio_time_series(
@@ -159,21 +119,10 @@ def get_optimal_portfolio_time_series(
         List of {date: "YYYY-MM-DD", portfolio_value: float}
     """
     # Calculate optimal allocation (greedy with constraint)
-    sorted_stocks = sorted(returns.items(), key=lambda x: x[1], reverse=True)
-
-    optimal_allocations = {}
-    remaining_pct = 100.0
-
-    for ticker, return_pct in sorted_stocks:
-        if remaining_pct <= 0:
-            break
-
-        allocation = min(max_allocation_pct, remaining_pct)
-        optimal_allocations[ticker] = allocation
-        remaining_pct -= allocation
+    allocations = optimal_allocations(returns, max_per_stock=max_allocation_pct)
 
     # Get time series using optimal allocations
-    return get_portfolio_time_series(optimal_allocations, start_date, end_date, initial_balance)
+    return get_portfolio_time_series(allocations, start_date, end_date, initial_balance)
 
 
 def get_stock_time_series(
@@ -0,0 +1,154 @@
+"""
+Shared outbound HTTP clients (Gemini, K2, Anthropic).
+
+Each upstream gets one long-lived httpx client with a keep-alive pool, so
+calls reuse warm connections instead of paying DNS + TCP + TLS every time:
+
+    client = http_clients.get("gemini")
+    response = await client.post(url, json=...)
+
+Every named client talks to a single host, so its pool limits
+(HTTP_MAX_CONNECTIONS / HTTP_MAX_KEEPALIVE) act as per-host limits. HTTP/2 is
+used when HTTP2_ENABLED is set and the `h2` package is installed. Clients are
+created on first use and closed by main.py's lifespan (or aclose() in
+scripts); stats() reports pool utilization per client.
+"""
+
+import threading
+from typing import Dict
+
+import httpx
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Read timeouts per upstream; connect stays short so a dead host fails fast
+TIMEOUTS = {
+    "gemini": 30.0,
+    "k2": 60.0,
+    "anthropic": 600.0,
+}
+CONNECT_TIMEOUT = 10.0
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _pool_stats(pool) -> dict:
+    """Connection counts from an httpcore connection pool."""
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if c.is_idle())
+    return {
+        "connections": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        "queued": len(getattr(pool, "_requests", []) or []),
+    }
+
+
+class HttpClientRegistry:
+    def __init__(self, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0, http2: bool = False):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and _http2_available()
+        if http2 and not self.http2:
+            print("⚠️ HTTP2_ENABLED is set but `h2` is not installed, using HTTP/1.1")
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        self._sync_lock = threading.Lock()
+        self._anthropic = None
+        self.requests: Dict[str, int] = {}
+
+    def _timeout(self, name: str) -> httpx.Timeout:
+        return httpx.Timeout(TIMEOUTS.get(name, 30.0), connect=CONNECT_TIMEOUT)
+
+    def _count(self, key: str):
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """The shared async client for an upstream, created on first use."""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            async def count(request):
+                self._count(name)
+
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self._timeout(name),
+                http2=self.http2,
+                event_hooks={"request": [count]},
+            )
+            self._clients[name] = client
+        return client
+
+    def get_sync(self, name: str) -> httpx.Client:
+        """Shared sync client, for SDK calls made on the blocking pool."""
+        with self._sync_lock:
+            client = self._sync_clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.Client(
+                    limits=self.limits,
+                    timeout=self._timeout(name),
+                    http2=self.http2,
+                    event_hooks={"request": [lambda request: self._count(f"{name}_sync")]},
+                )
+                self._sync_clients[name] = client
+            return client
+
+    def anthropic(self):
+        """AsyncAnthropic bound to the shared "anthropic" pool."""
+        client = self.get("anthropic")
+        if self._anthropic is None or self._anthropic[0] is not client:
+            from anthropic import AsyncAnthropic
+            self._anthropic = (
+                client, AsyncAnthropic(api_key=settings.anthropic_api_key, http_client=client)
+            )
+        return self._anthropic[1]
+
+    def anthropic_sync(self):
+        """Sync Anthropic client bound to the shared pool (thread-safe)."""
+        from anthropic import Anthropic
+        return Anthropic(api_key=settings.anthropic_api_key, http_client=self.get_sync("anthropic"))
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+        with self._sync_lock:
+            sync_clients, self._sync_clients = self._sync_clients, {}
+        for client in sync_clients.values():
+            client.close()
+        self._anthropic = None
+
+    def stats(self) -> dict:
+        clients = {}
+        for key, client in [*self._clients.items(),
+                            *((f"{n}_sync", c) for n, c in self._sync_clients.items())]:
+            clients[key] = {
+                **_pool_stats(getattr(client._transport, "_pool", None)),
+                "requests": self.requests.get(key, 0),
+            }
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "clients": clients,
+        }
+
+
+http_clients = HttpClientRegistry(
+    max_connections=settings.http_max_connections,
+    max_keepalive=settings.http_max_keepalive,
+    keepalive_expiry=settings.http_keepalive_expiry,
+    http2=settings.http2_enabled,
+)
@@ -0,0 +1,139 @@
+"""
+In-process async job queue with a bounded worker pool.
+
+Used for work the client shouldn't wait on (LLM retrospectives). Jobs are
+keyed by a caller-chosen id so a second submit for the same key returns the
+existing job, and waiters (polling or SSE) can await completion on the job's
+event. Finished jobs are kept for a while so late pollers still see the
+outcome; the caller is responsible for persisting results.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+FINISHED_JOBS_KEPT = 1000
+
+
+@dataclass
+class Job:
+    key: str
+    run: Callable[[], Awaitable[Any]]
+    status: str = PENDING
+    result: Any = None
+    error: str = ""
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the job finishes. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class JobQueue:
+    def __init__(self, workers: int = 4, maxsize: int = 256):
+        self.workers = workers
+        self.maxsize = maxsize
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def get(self, key: str) -> Optional[Job]:
+        return self._jobs.get(key)
+
+    async def submit(self, key: str, run: Callable[[], Awaitable[Any]]) -> Job:
+        """
+        Enqueue `run` under `key`, or return the unfinished job already queued
+        for it. Raises asyncio.QueueFull when the queue is at capacity.
+        """
+        existing = self._jobs.get(key)
+        if existing and existing.status in (PENDING, RUNNING):
+            return existing
+
+        if not self.running:
+            await self.start()
+
+        job = Job(key=key, run=run)
+        self._queue.put_nowait(job)
+        self._jobs[key] = job
+        self._jobs.move_to_end(key)
+        return job
+
+    async def _worker(self, n: int):
+        while True:
+            job = await self._queue.get()
+            job.status = RUNNING
+            try:
+                job.result = await job.run()
+                job.status = DONE
+                self.completed += 1
+            except Exception as e:
+                job.status = FAILED
+                job.error = str(e)
+                self.failed += 1
+                print(f"⚠️ Job {job.key} failed: {e}")
+            finally:
+                job.finished_at = time.monotonic()
+                job.done.set()
+                self._queue.task_done()
+                self._prune()
+
+    def _prune(self):
+        finished = [k for k, j in self._jobs.items() if j.finished_at is not None]
+        for key in finished[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[key]
+
+    def stats(self) -> dict:
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": statuses,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+job_queue = JobQueue(
+    workers=settings.retrospective_workers,
+    maxsize=settings.retrospective_queue_size,
+)
@@ -4,8 +4,8 @@ Uses K2 Think API from MBZUAI. Falls back to mock if no API key.
 """
 
 import json
-import httpx
 from app.config import get_settings
+from app.http_clients import http_clients
 
 settings = get_settings()
 
@@ -30,38 +30,38 @@ async def generate_game_analysis(
     try:
         prompt = _build_analysis_prompt(round_history, game_data)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                settings.k2_api_url,
-                headers={
-                    "Authorization": f"Bearer {settings.k2_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": "k2-think",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": (
-                                "You are an expert financial educator analyzing a player's investment decisions "
-                                "in a stock market simulation game. Provide insightful, encouraging feedback that "
-                                "helps them understand how to read financial signals from news articles. "
-                                "Respond in JSON format."
-                            ),
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    "max_tokens": 2000,
-                    "temperature": 0.7,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            
-            # Parse the response content as JSON
-            content = data["choices"][0]["message"]["content"]
-            result = json.loads(content)
-            return result
+        client = http_clients.get("k2")
+        response = await client.post(
+            settings.k2_api_url,
+            headers={
+                "Authorization": f"Bearer {settings.k2_api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": "k2-think",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": (
+                            "You are an expert financial educator analyzing a player's investment decisions "
+                            "in a stock market simulation game. Provide insightful, encouraging feedback that "
+                            "helps them understand how to read financial signals from news articles. "
+                            "Respond in JSON format."
+                        ),
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                "max_tokens": 2000,
+                "temperature": 0.7,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        
+        # Parse the response content as JSON
+        content = data["choices"][0]["message"]["content"]
+        result = json.loads(content)
+        return result
 
     except Exception as e:
         print(f"K2 Think API call failed, using mock: {e}")
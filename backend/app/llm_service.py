@@ -4,6 +4,8 @@ Uses Claude (Anthropic) API. Falls back to mock if no API key.
 """
 
 from app.config import get_settings
+from app.http_clients import http_clients
+from app.retrospective_cache import retrospective_cache, retrospective_key
 
 settings = get_settings()
 
@@ -17,10 +19,14 @@ async def generate_retrospective(
     causal_chains: list[dict],
     round_title: str,
     round_description: str,
+    round_id: str = "",
 ) -> dict:
     """
     Generate an educational retrospective using LLM.
     Returns a structured dict matching RetrospectiveOut schema.
+    LLM outputs are reused for submissions in the same round that were served
+    the same documents and whose allocations and score fall in the same
+    buckets (see retrospective_cache).
     """
     if not settings.anthropic_api_key or settings.anthropic_api_key.startswith("sk-ant-your"):
         return _mock_retrospective(
@@ -28,9 +34,18 @@ async def generate_retrospective(
             documents_served, causal_chains, round_title
         )
 
+    cache_key = None
+    if settings.retrospective_cache_enabled and round_id:
+        cache_key = retrospective_key(
+            round_id, allocations, player_return, optimal_return,
+            document_ids=(d["id"] for d in documents_served),
+        )
+        cached = await retrospective_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        from anthropic import AsyncAnthropic
-        client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        client = http_clients.anthropic()
 
         prompt = _build_retrospective_prompt(
             stocks, allocations, player_return, optimal_return,
@@ -59,6 +74,8 @@ async def generate_retrospective(
 
         import json
         result = json.loads(response.content[0].text)
+        if cache_key:
+            await retrospective_cache.put(cache_key, round_id, result)
         return result
 
     except Exception as e:
@@ -4,11 +4,25 @@ Backend API Server
 """
 
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, Base, async_session, count_queries, add_missing_columns
+from app.candidate_index import candidate_index
+from app.jobs import job_queue
+from app.price_store import price_store
+from app.round_series import round_series_cache
+from app.blocking import blocking_executor
+from app.start_cache import start_cache
+from app.retrospective_cache import retrospective_cache
+from app.gemini_stock_service import stock_info_cache
+from app import company_metadata
+from app.http_clients import http_clients
+from app.websocket import manager as ws_manager
+from app.timers import room_timers
+from app.room_actor import room_actors
+from app.room_bus import room_bus
 from app.routes import router
 from app.multiplayer_routes import router as multiplayer_router
 
@@ -22,11 +36,38 @@ async def lifespan(app: FastAPI):
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(add_missing_columns)
         print("✅ Database tables created/verified")
     except Exception as e:
         print(f"⚠️ Database init failed (non-fatal): {e}")
+    # Pre-build the document candidate index so the first game start is warm
+    if settings.candidate_index_enabled:
+        try:
+            async with async_session() as db:
+                indexed = await candidate_index.warm(db)
+            print(f"✅ Candidate index built for {indexed} rounds")
+        except Exception as e:
+            print(f"⚠️ Candidate index warm-up failed (non-fatal): {e}")
+    # Pre-compute normalized round price series when the local store is populated
+    if price_store.tickers:
+        try:
+            async with async_session() as db:
+                built = await round_series_cache.warm(db)
+            print(f"✅ Round price series built for {built} rounds")
+        except Exception as e:
+            print(f"⚠️ Round price series warm-up failed (non-fatal): {e}")
+    # Background workers for LLM retrospectives
+    await job_queue.start()
+    print(f"✅ Job queue started ({job_queue.workers} workers)")
+    # Cross-worker WebSocket broadcasts (no-op with a single worker)
+    await room_bus.start()
     yield
     # Cleanup
+    await job_queue.stop()
+    room_timers.stop()
+    await room_bus.stop()
+    await http_clients.aclose()
+    blocking_executor.shutdown()
     try:
         await engine.dispose()
     except Exception:
@@ -49,6 +90,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+
+# Report SQL statements per request so query-count regressions are visible
+@app.middleware("http")
+async def db_query_count_header(request: Request, call_next):
+    with count_queries() as counter:
+        response = await call_next(request)
+    response.headers["X-DB-Queries"] = str(counter.count)
+    return response
+
+
 # Routes
 app.include_router(router)
 app.include_router(multiplayer_router)
@@ -57,3 +109,21 @@ app.include_router(multiplayer_router)
 @app.get("/health")
 async def health():
     return {"status": "ok", "service": "finsight-api"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """In-process pool / cache / queue counters for this worker."""
+    return {
+        "blocking": blocking_executor.stats(),
+        "jobs": job_queue.stats(),
+        "start_cache": start_cache.stats(),
+        "retrospective_cache": retrospective_cache.stats(),
+        "stock_info": stock_info_cache.stats(),
+        "company_metadata": company_metadata.stats(),
+        "http": http_clients.stats(),
+        "websocket": ws_manager.stats(),
+        "timers": room_timers.stats(),
+        "room_actors": room_actors.stats(),
+        "room_bus": room_bus.stats(),
+    }
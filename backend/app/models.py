@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, date
 from sqlalchemy import (
     Column, String, Text, Float, Integer, Date, DateTime,
-    ForeignKey, JSON, Index
+    ForeignKey, JSON, Index, LargeBinary, Boolean
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -50,8 +50,9 @@ class RoundConfig(Base):
     display_order = Column(Integer, default=0)                  # for ordering rounds
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # Relationships
-    stocks = relationship("StockReturn", back_populates="round_config", lazy="selectin")
+    # Relationships — lazy by default; queries that need them use explicit
+    # loader options (selectinload etc.) instead of a global selectin cascade
+    stocks = relationship("StockReturn", back_populates="round_config", lazy="select")
 
 
 # ── Stock Returns ──────────────────────────────────────────────────────────────
@@ -70,7 +71,7 @@ class StockReturn(Base):
 
     # Relationships
     round_config = relationship("RoundConfig", back_populates="stocks")
-    relevance_links = relationship("DocumentStockRelevance", back_populates="stock_return", lazy="selectin")
+    relevance_links = relationship("DocumentStockRelevance", back_populates="stock_return", lazy="select")
 
     __table_args__ = (
         Index("ix_stock_returns_round_ticker", "round_id", "ticker", unique=True),
@@ -102,7 +103,7 @@ class Document(Base):
     difficulty = Column(String, default=Difficulty.medium)
 
     # Relationships
-    relevance_links = relationship("DocumentStockRelevance", back_populates="document", lazy="selectin")
+    relevance_links = relationship("DocumentStockRelevance", back_populates="document", lazy="select")
 
     __table_args__ = (
         Index("ix_documents_source_type", "source_type"),
@@ -145,5 +146,63 @@ class GameSession(Base):
     score = Column(Integer, nullable=True)
     documents_served = Column(JSON, default=list)               # list of doc IDs
     retrospective = Column(JSON, nullable=True)                 # LLM-generated retrospective
+    difficulty = Column(String, nullable=True)
+    selection_seed = Column(Integer, nullable=True)             # replays the exact document set
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+
+
+class ResultSnapshot(Base):
+    """Serialized GameResultsResponse, written on submit and served as-is."""
+    __tablename__ = "result_snapshots"
+
+    session_id = Column(String, ForeignKey("game_sessions.id"), primary_key=True)
+    body = Column(LargeBinary, nullable=False)                  # GameResultsResponse JSON
+    complete = Column(Boolean, default=False)                   # retrospective included
+    version = Column(Integer, nullable=True)                    # bumped on every submit
+    retrospective_claimed_at = Column(DateTime, nullable=True)  # a worker is generating the retrospective
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ── Round Packs (pre-materialized document sets) ──────────────────────────────
+
+class RoundPack(Base):
+    __tablename__ = "round_packs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    round_id = Column(String, ForeignKey("round_configs.id"), nullable=False)
+    difficulty = Column(String, nullable=False)
+    seed = Column(Integer, nullable=True)                       # engine seed that produced this pack
+    document_ids = Column(JSON, default=list)                   # ordered doc IDs, already shuffled
+    corpus_version = Column(String, nullable=True)              # candidate_index.corpus_version it was built from
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_round_packs_round_difficulty", "round_id", "difficulty"),
+    )
+
+
+# ── Retrospective cache (LLM outputs reused across similar portfolios) ────────
+
+class RetrospectiveCacheEntry(Base):
+    __tablename__ = "retrospective_cache"
+
+    key = Column(String, primary_key=True)                      # round | documents digest | quantized allocations | score band
+    round_id = Column(String, nullable=False, index=True)
+    retrospective = Column(JSON, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# ── Company metadata (yfinance + Gemini, refreshed after a TTL) ───────────────
+
+class CompanyMetadata(Base):
+    __tablename__ = "company_metadata"
+
+    ticker = Column(String, primary_key=True)
+    company_name = Column(String, nullable=False)
+    sector = Column(String, nullable=False)                     # one of VALID_SECTORS
+    industry = Column(String, nullable=True)
+    description = Column(Text, nullable=True)
+    emoji = Column(String, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
@@ -5,11 +5,12 @@ from typing import List, Dict, Optional
 import uuid
 
 from newsapi import NewsApiClient
-from anthropic import Anthropic
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.config import get_settings
+from app.blocking import run_blocking
+from app.http_clients import http_clients
 from app.models import Document, StockReturn, DocumentStockRelevance, SourceType, SignalDirection, Difficulty, RelevanceType
 
 settings = get_settings()
@@ -96,7 +97,7 @@ def analyze_article_with_claude(
     if not settings.anthropic_api_key:
         raise ValueError("ANTHROPIC_API_KEY not configured in settings")
 
-    client = Anthropic(api_key=settings.anthropic_api_key)
+    client = http_clients.anthropic_sync()
 
     prompt = f"""Analyze this financial article published on {publish_date.isoformat()}:
 
@@ -176,7 +177,9 @@ async def scrape_and_store_articles(
         Number of articles stored
     """
     # Fetch articles from newsapi
-    raw_articles = fetch_news_for_keywords(keywords, from_date, to_date)
+    raw_articles = await run_blocking(
+        fetch_news_for_keywords, keywords, from_date, to_date, label="newsapi"
+    )
 
     if not raw_articles:
         print("No articles fetched")
@@ -207,7 +210,9 @@ async def scrape_and_store_articles(
             continue
 
         # Analyze with Claude
-        analysis = analyze_article_with_claude(content, title, pub_date)
+        analysis = await run_blocking(
+            analyze_article_with_claude, content, title, pub_date, label="anthropic"
+        )
         if not analysis:
             print("  Skipping: analysis failed")
             continue
@@ -270,7 +275,7 @@ async def build_relevance_mappings(
     if not settings.anthropic_api_key:
         raise ValueError("ANTHROPIC_API_KEY not configured")
 
-    client = Anthropic(api_key=settings.anthropic_api_key)
+    client = http_clients.anthropic_sync()
 
     # Load all documents
     result = await db.execute(select(Document))
@@ -327,10 +332,12 @@ Guidelines:
 - Only return is_relevant=true if there's a meaningful connection"""
 
             try:
-                message = client.messages.create(
+                message = await run_blocking(
+                    client.messages.create,
                     model="claude-3-haiku-20240307",  # Cheaper model for this task
                     max_tokens=512,
-                    messages=[{"role": "user", "content": prompt}]
+                    messages=[{"role": "user", "content": prompt}],
+                    label="anthropic",
                 )
 
                 response_text = message.content[0].text.strip()
@@ -0,0 +1,392 @@
+"""
+Local daily-close price store and the PriceProvider used by every price lookup.
+
+Closes live in a dense float64 matrix (trading dates × tickers, NaN where a
+ticker has no print) saved as .npy and opened memory-mapped, with a JSON
+sidecar holding the date index and ticker columns. Each build is written to
+its own directory and published by replacing the CURRENT pointer file, so a
+reader always sees a matching index and matrix:
+
+    data/prices/CURRENT                      "v20240101T120000123456"
+    data/prices/v20240101T120000123456/closes.npy
+    data/prices/v20240101T120000123456/closes.json
+        {"dates": [...], "tickers": [...], "ranges": {ticker: [start, end]},
+         "start": ..., "end": ..., "updated_at": ...}
+
+"ranges" records the range each ticker was ingested over (end exclusive), so
+a range ending on a weekend or holiday still counts as covered, and a ticker
+added later with a narrower --start isn't reported as covering dates it has
+no data for. "start"/"end" span all tickers; stores written before "ranges"
+existed use them for every ticker.
+
+The store is written by build_price_store.py. Request paths read it through
+`price_provider`; yfinance is only used as a backfill for tickers or dates the
+store doesn't cover (PRICE_BACKFILL_ENABLED), and only if it is installed.
+
+Ranges follow yfinance's history(start, end): start inclusive, end exclusive.
+"""
+
+import json
+import os
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+MATRIX_FILE = "closes.npy"
+INDEX_FILE = "closes.json"
+POINTER_FILE = "CURRENT"
+VERSIONS_KEPT = 2   # the live build and the one before it (readers may still map it)
+
+
+def _store_dir(path: Optional[str] = None) -> Path:
+    p = Path(path or settings.price_store_path)
+    return p if p.is_absolute() else BACKEND_DIR / p
+
+
+def _day(d) -> np.datetime64:
+    return np.datetime64(d, "D")
+
+
+class PriceStore:
+    """Read-only view of the on-disk close matrix. Reloads when the file changes."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.dir = _store_dir(path)
+        self._lock = threading.Lock()
+        self._loaded: Optional[tuple] = None        # stat identity of what's loaded
+        self.dates = np.array([], dtype="datetime64[D]")
+        self.closes = np.empty((0, 0))
+        self.columns: Dict[str, int] = {}
+        self.ranges: Dict[str, Tuple[np.datetime64, np.datetime64]] = {}
+        self.start: Optional[np.datetime64] = None
+        self.end: Optional[np.datetime64] = None
+        self.updated_at = ""
+
+    def _current(self) -> Optional[Tuple[tuple, Path]]:
+        """(stat identity, build directory) of the published build, if any."""
+        try:
+            st = (self.dir / POINTER_FILE).stat()
+        except FileNotFoundError:
+            # Stores written before versioned builds: files directly in dir
+            try:
+                st = (self.dir / MATRIX_FILE).stat()
+            except FileNotFoundError:
+                return None
+            return ("legacy", st.st_ino, st.st_mtime_ns), self.dir
+        return (st.st_ino, st.st_mtime_ns), None
+
+    def _load(self):
+        current = self._current()
+        if current is None or current[0] == self._loaded:
+            return
+        with self._lock:
+            current = self._current()
+            if current is None or current[0] == self._loaded:
+                return
+            identity, build_dir = current
+            if build_dir is None:
+                build_dir = self.dir / (self.dir / POINTER_FILE).read_text().strip()
+            index = json.loads((build_dir / INDEX_FILE).read_text())
+            self.closes = np.load(build_dir / MATRIX_FILE, mmap_mode="r")
+            self.dates = np.array(index["dates"], dtype="datetime64[D]")
+            self.columns = {t: i for i, t in enumerate(index["tickers"])}
+            self.start = _day(index["start"]) if index.get("start") else (self.dates[0] if len(self.dates) else None)
+            self.end = _day(index["end"]) if index.get("end") else (self.dates[-1] + 1 if len(self.dates) else None)
+            if "ranges" in index:
+                self.ranges = {t: (_day(lo), _day(hi)) for t, (lo, hi) in index["ranges"].items()}
+            elif self.start is not None:
+                self.ranges = {t: (self.start, self.end) for t in self.columns}
+            else:
+                self.ranges = {}
+            self.updated_at = index.get("updated_at", "")
+            self._loaded = identity
+
+    @property
+    def version(self) -> str:
+        """Changes whenever the store is re-ingested."""
+        self._load()
+        return self.updated_at
+
+    @property
+    def tickers(self) -> List[str]:
+        self._load()
+        return list(self.columns)
+
+    def has(self, ticker: str) -> bool:
+        self._load()
+        return ticker in self.columns
+
+    def span(self, ticker: str) -> Optional[Tuple[np.datetime64, np.datetime64]]:
+        """[start, end) the ticker was ingested over, or None if it isn't stored."""
+        self._load()
+        return self.ranges.get(ticker)
+
+    def covers(self, tickers: Iterable[str], start: date, end: date) -> bool:
+        """True if every ticker is stored and was ingested over all of [start, end)."""
+        self._load()
+        lo, hi = _day(start), _day(end)
+        for ticker in tickers:
+            span = self.ranges.get(ticker)
+            if span is None or not (span[0] <= lo and hi <= span[1]):
+                return False
+        return True
+
+    def series(self, ticker: str, start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """(dates, closes) for one ticker in [start, end), missing prints dropped."""
+        self._load()
+        col = self.columns.get(ticker)
+        if col is None:
+            return self.dates[:0], np.empty(0)
+        lo = np.searchsorted(self.dates, _day(start), side="left")
+        hi = np.searchsorted(self.dates, _day(end), side="left")
+        values = np.asarray(self.closes[lo:hi, col])
+        mask = ~np.isnan(values)
+        return self.dates[lo:hi][mask], values[mask]
+
+    def window(self, tickers: Iterable[str], start: date, end: date) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+        """(dates, closes[dates × found tickers], found tickers) for [start, end)."""
+        self._load()
+        found = [t for t in tickers if t in self.columns]
+        lo = np.searchsorted(self.dates, _day(start), side="left")
+        hi = np.searchsorted(self.dates, _day(end), side="left")
+        cols = [self.columns[t] for t in found]
+        return self.dates[lo:hi], np.asarray(self.closes[lo:hi][:, cols]), found
+
+
+def write_store(
+    dates: np.ndarray,
+    tickers: List[str],
+    closes: np.ndarray,
+    ranges: Dict[str, Tuple[date, date]],
+    path: Optional[str] = None,
+):
+    """
+    Atomically replace the store with a (dates × tickers) close matrix;
+    `ranges` maps each ticker to the [start, end) it was ingested over.
+    """
+    out = _store_dir(path)
+    now = datetime.utcnow()
+    build = out / now.strftime("v%Y%m%dT%H%M%S%f")
+    build.mkdir(parents=True)
+    with open(build / MATRIX_FILE, "wb") as f:
+        np.save(f, np.ascontiguousarray(closes, dtype=np.float64))
+    (build / INDEX_FILE).write_text(json.dumps({
+        "dates": [str(d) for d in dates.astype("datetime64[D]")],
+        "tickers": list(tickers),
+        "ranges": {t: [str(ranges[t][0]), str(ranges[t][1])] for t in tickers},
+        "start": str(min(ranges[t][0] for t in tickers)) if tickers else None,
+        "end": str(max(ranges[t][1] for t in tickers)) if tickers else None,
+        "updated_at": now.isoformat() + "Z",
+    }))
+    # Publish both files at once: readers follow CURRENT
+    tmp_pointer = out / (POINTER_FILE + ".tmp")
+    tmp_pointer.write_text(build.name)
+    os.replace(tmp_pointer, out / POINTER_FILE)
+
+    builds = sorted(p for p in out.glob("v*") if p.is_dir())
+    for old in builds[:-VERSIONS_KEPT]:
+        shutil.rmtree(old, ignore_errors=True)
+    for legacy in (MATRIX_FILE, INDEX_FILE):
+        (out / legacy).unlink(missing_ok=True)
+
+
+# ── Price providers ───────────────────────────────────────────────────────────
+
+class PriceProvider(ABC):
+    """Daily closes for a ticker over [start, end)."""
+
+    @abstractmethod
+    def daily_closes(self, ticker: str, start: date, end: date) -> List[Dict]:
+        """List of {date: "YYYY-MM-DD", close: float}."""
+
+    def close_matrix(self, tickers: List[str], start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (dates, closes[dates × tickers]) over the union of the tickers' trading
+        dates, NaN where a ticker has no close. Columns follow `tickers`.
+        """
+        series = {t: self.daily_closes(t, start, end) for t in dict.fromkeys(tickers)}
+        all_dates = sorted({p["date"] for closes in series.values() for p in closes})
+        row = {d: i for i, d in enumerate(all_dates)}
+        matrix = np.full((len(all_dates), len(tickers)), np.nan)
+        for j, ticker in enumerate(tickers):
+            for p in series[ticker]:
+                matrix[row[p["date"]], j] = p["close"]
+        return np.array(all_dates, dtype="datetime64[D]"), matrix
+
+    def return_pct(self, ticker: str, start: date, end: date) -> Optional[float]:
+        """First-to-last close return in percent (2 dp), or None without two closes."""
+        closes = self.daily_closes(ticker, start, end)
+        if len(closes) < 2:
+            return None
+        first, last = closes[0]["close"], closes[-1]["close"]
+        return round(((last - first) / first) * 100, 2)
+
+    def period_returns(self, tickers: Iterable[str], start: date, end: date) -> Dict[str, float]:
+        """
+        return_pct for many tickers from one close matrix. Tickers without
+        two closes in the range are left out.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        dates, closes = self.close_matrix(tickers, start, end)
+        if not len(dates):
+            return {}
+        traded = ~np.isnan(closes)
+        cols = np.arange(len(tickers))
+        first = closes[np.argmax(traded, axis=0), cols]
+        last = closes[len(dates) - 1 - np.argmax(traded[::-1], axis=0), cols]
+        pct = (last - first) / first * 100
+        return {
+            t: round(float(p), 2)
+            for t, p, n in zip(tickers, pct, traded.sum(axis=0)) if n >= 2
+        }
+
+
+class LocalPriceProvider(PriceProvider):
+    def __init__(self, store: PriceStore):
+        self.store = store
+
+    def daily_closes(self, ticker: str, start: date, end: date) -> List[Dict]:
+        dates, values = self.store.series(ticker, start, end)
+        return [
+            {"date": str(d), "close": float(v)}
+            for d, v in zip(dates, values)
+        ]
+
+    def close_matrix(self, tickers: List[str], start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        dates, window, found = self.store.window(tickers, start, end)
+        matrix = np.full((len(dates), len(tickers)), np.nan)
+        col = {t: i for i, t in enumerate(found)}
+        for j, ticker in enumerate(tickers):
+            if ticker in col:
+                matrix[:, j] = window[:, col[ticker]]
+        # Keep only dates on which at least one of these tickers traded
+        keep = ~np.isnan(matrix).all(axis=1)
+        return dates[keep], matrix[keep]
+
+
+class YFinancePriceProvider(PriceProvider):
+    """Live Yahoo Finance lookups. Used for backfill and ingestion only."""
+
+    def daily_closes(self, ticker: str, start: date, end: date) -> List[Dict]:
+        try:
+            import yfinance as yf
+        except ImportError:
+            return []
+        try:
+            hist = yf.Ticker(ticker).history(start=start, end=end, interval="1d")
+        except Exception as e:
+            print(f"Error fetching daily prices for {ticker}: {e}")
+            return []
+        if hist.empty:
+            return []
+        return [
+            {"date": idx.strftime("%Y-%m-%d"), "close": float(row["Close"])}
+            for idx, row in hist.iterrows()
+        ]
+
+    def close_matrix(self, tickers: List[str], start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """All tickers in one batched yf.download instead of a history() call each."""
+        empty = (np.array([], dtype="datetime64[D]"), np.empty((0, len(tickers))))
+        if not tickers:
+            return empty
+        try:
+            import yfinance as yf
+        except ImportError:
+            return empty
+        try:
+            data = yf.download(
+                list(dict.fromkeys(tickers)), start=start, end=end, interval="1d",
+                auto_adjust=True, actions=False, progress=False, group_by="column",
+            )
+        except Exception as e:
+            print(f"Error fetching daily prices for {len(tickers)} tickers: {e}")
+            return empty
+        if data.empty:
+            return empty
+        closes = data["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(tickers[0])    # single ticker: flat columns
+        closes = closes.reindex(columns=tickers).dropna(how="all")
+        dates = np.array([idx.strftime("%Y-%m-%d") for idx in closes.index], dtype="datetime64[D]")
+        return dates, closes.to_numpy(dtype=np.float64)
+
+
+def _join_columns(
+    tickers: List[str],
+    parts: List[Tuple[List[str], np.ndarray, np.ndarray]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge (tickers, dates, closes) blocks into one matrix over the union of their dates."""
+    dates = np.unique(np.concatenate([d for _, d, _ in parts])).astype("datetime64[D]")
+    matrix = np.full((len(dates), len(tickers)), np.nan)
+    col = {t: j for j, t in enumerate(tickers)}
+    for part_tickers, part_dates, part_closes in parts:
+        rows = np.searchsorted(dates, part_dates)
+        for i, ticker in enumerate(part_tickers):
+            matrix[rows, col[ticker]] = part_closes[:, i]
+    return dates, matrix
+
+
+class StoreWithBackfillProvider(PriceProvider):
+    """Read from the local store; fall back to yfinance for gaps it doesn't cover."""
+
+    def __init__(self, store: PriceStore, backfill: Optional[PriceProvider] = None):
+        self.local = LocalPriceProvider(store)
+        self.store = store
+        self.backfill = backfill
+        self._warned: set[str] = set()
+
+    def daily_closes(self, ticker: str, start: date, end: date) -> List[Dict]:
+        if self.store.covers([ticker], start, end):
+            return self.local.daily_closes(ticker, start, end)
+        if self.backfill is None:
+            return self.local.daily_closes(ticker, start, end)
+
+        if ticker not in self._warned:
+            self._warned.add(ticker)
+            print(f"⚠️ {ticker} {start}..{end} not in price store, backfilling from yfinance "
+                  f"(run build_price_store.py to add it)")
+        return self.backfill.daily_closes(ticker, start, end)
+
+    def close_matrix(self, tickers: List[str], start: date, end: date) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Stored tickers from the store; the ones it doesn't cover for [start, end)
+        are fetched together with one backfill.close_matrix call (one batched
+        download), never one by one.
+        """
+        if self.backfill is None or self.store.covers(tickers, start, end):
+            return self.local.close_matrix(tickers, start, end)
+
+        tickers = list(tickers)
+        unique = list(dict.fromkeys(tickers))
+        stored = [t for t in unique if self.store.covers([t], start, end)]
+        missing = [t for t in unique if t not in stored]
+        new = [t for t in missing if t not in self._warned]
+        if new:
+            self._warned.update(new)
+            print(f"⚠️ {', '.join(new)} {start}..{end} not in price store, backfilling from yfinance "
+                  f"(run build_price_store.py to add them)")
+
+        parts = [(missing, *self.backfill.close_matrix(missing, start, end))]
+        if stored:
+            parts.append((stored, *self.local.close_matrix(stored, start, end)))
+        dates, matrix = _join_columns(unique, parts)
+        # Columns follow `tickers`, duplicates included
+        col = {t: j for j, t in enumerate(unique)}
+        return dates, matrix[:, [col[t] for t in tickers]]
+
+
+price_store = PriceStore()
+price_provider: PriceProvider = StoreWithBackfillProvider(
+    price_store,
+    backfill=YFinancePriceProvider() if settings.price_backfill_enabled else None,
+)
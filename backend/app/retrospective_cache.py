@@ -0,0 +1,120 @@
+"""
+Cache of LLM retrospectives keyed by round, documents served, quantized
+allocations and score band.
+
+Players in the same round often submit near-identical portfolios, and the
+retrospective for one is a fine retrospective for the others. Allocations are
+rounded to RETROSPECTIVE_BUCKET_PCT buckets and the score to
+RETROSPECTIVE_SCORE_BAND points, so every submission in a bucket shares one
+LLM output. The prompt cites the documents the player was served, which vary
+with difficulty and seed, so the key carries a digest of their ids. Entries live in an in-memory LRU backed by the
+retrospective_cache table, so they survive restarts and are shared between
+workers.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.config import get_settings
+from app.database import async_session
+from app.models import RetrospectiveCacheEntry
+from app.scoring import calculate_score
+
+settings = get_settings()
+
+
+def retrospective_key(
+    round_id: str,
+    allocations: dict[str, float],
+    player_return: float,
+    optimal_return: float,
+    document_ids: Iterable[str] = (),
+) -> str:
+    """Cache key: round | documents digest | ticker:bucketed_pct,... | score band."""
+    step = settings.retrospective_bucket_pct
+    buckets = []
+    for ticker in sorted(allocations):
+        bucket = int(round((allocations[ticker] or 0) / step) * step)
+        if bucket:
+            buckets.append(f"{ticker}:{bucket}")
+    band = calculate_score(player_return, optimal_return) // settings.retrospective_score_band
+    docs = hashlib.sha1(",".join(sorted(document_ids)).encode()).hexdigest()[:12]
+    return f"{round_id}|{docs}|{','.join(buckets)}|{band}"
+
+
+class RetrospectiveCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, retrospective: dict):
+        self._entries[key] = retrospective
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        try:
+            async with async_session() as db:
+                result = await db.execute(
+                    select(RetrospectiveCacheEntry.retrospective)
+                    .where(RetrospectiveCacheEntry.key == key)
+                )
+                stored = result.scalar_one_or_none()
+                if stored is not None:
+                    await db.execute(
+                        update(RetrospectiveCacheEntry)
+                        .where(RetrospectiveCacheEntry.key == key)
+                        .values(hits=RetrospectiveCacheEntry.hits + 1)
+                    )
+                    await db.commit()
+        except Exception as e:
+            print(f"⚠️ Retrospective cache lookup failed: {e}")
+            stored = None
+
+        if stored is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self._remember(key, stored)
+        return stored
+
+    async def put(self, key: str, round_id: str, retrospective: dict):
+        self._remember(key, retrospective)
+        try:
+            async with async_session() as db:
+                db.add(RetrospectiveCacheEntry(
+                    key=key, round_id=round_id, retrospective=retrospective,
+                ))
+                await db.commit()
+        except IntegrityError:
+            pass  # another worker stored this bucket first
+        except Exception as e:
+            print(f"⚠️ Retrospective cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.db_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+retrospective_cache = RetrospectiveCache(maxsize=settings.retrospective_cache_size)
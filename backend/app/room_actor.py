@@ -0,0 +1,302 @@
+"""
+Per-room actors for multiplayer state changes.
+
+Every MultiplayerRoom is owned by one actor: a task draining an asyncio.Queue
+inbox. REST and WebSocket handlers only post commands (join, start, submit,
+leave) and timers post round_timeout / advance, so a room's state is only
+ever mutated by its own task, one command at a time. That removes the races
+between the round timer and the last /submit (double scoring, double
+advance) and keeps each room's command latency independent of the others.
+
+    room = await room_actors.call(room_code, "join", player_id=..., display_name=...)
+    await room_actors.tell(room_code, "round_timeout", round_number=3)   # no reply
+
+Handlers raise HTTPException for invalid commands; call() re-raises it in the
+caller. An actor stops once its room is deleted.
+
+With a shared room store (ROOM_STORE=sqlite, several workers) each worker
+runs its own actor for a room; saves are compare-and-swap, and a command that
+loses the race is re-run against the fresh room. Timers fire in the worker
+that scheduled them and carry the round number, so a late or duplicate
+round_timeout / advance is ignored.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from app.blocking import percentile
+from app.room_manager import room_manager, MultiplayerRoom
+from app.room_store import RoomConflict
+from app.timers import room_timers
+from app.websocket import manager as ws_manager
+
+SCOREBOARD_SECONDS = 8
+TIMING_WINDOW = 500   # recent command latencies kept per command
+CONFLICT_RETRIES = 5  # re-runs of a command that lost a save race to another worker
+
+
+class RoomActor:
+    def __init__(self, registry: "RoomActors", room_code: str):
+        self.registry = registry
+        self.room_code = room_code
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.stopped = False
+        self.task = asyncio.create_task(self._run())
+
+    async def _load(self) -> MultiplayerRoom:
+        room = await room_manager.get_room(self.room_code)
+        if room is None:
+            self.stop()
+            raise HTTPException(status_code=404, detail="Room not found")
+        return room
+
+    def post(self, command: str, kwargs: dict, reply: Optional[asyncio.Future]):
+        self.inbox.put_nowait((command, kwargs, reply, time.perf_counter()))
+        self.registry.max_inbox_seen = max(self.registry.max_inbox_seen, self.inbox.qsize())
+
+    async def _handle(self, command: str, kwargs: dict) -> Any:
+        handler = getattr(self, f"_on_{command}")
+        for attempt in range(CONFLICT_RETRIES):
+            try:
+                return await handler(**kwargs)
+            except RoomConflict:
+                # Another worker saved the room first: re-run against its copy
+                self.registry.conflicts += 1
+        raise HTTPException(status_code=409, detail="Room is busy, try again")
+
+    async def _run(self):
+        while not self.stopped:
+            command, kwargs, reply, posted_at = await self.inbox.get()
+            try:
+                result = await self._handle(command, kwargs)
+            except Exception as e:
+                if reply is not None and not reply.done():
+                    reply.set_exception(e)
+                elif not isinstance(e, HTTPException):
+                    print(f"⚠️ Room {self.room_code} {command} failed: {e}")
+            else:
+                if reply is not None and not reply.done():
+                    reply.set_result(result)
+            self.registry.record(command, (time.perf_counter() - posted_at) * 1000)
+        self._drain()
+
+    def _drain(self):
+        """Fail commands still queued when the room went away."""
+        while not self.inbox.empty():
+            _, _, reply, _ = self.inbox.get_nowait()
+            if reply is not None and not reply.done():
+                reply.set_exception(HTTPException(status_code=404, detail="Room not found"))
+
+    # ── Commands ──────────────────────────────────────────────────
+    # Each handler loads the room, changes it, saves it, and only then
+    # broadcasts / schedules timers, so a save conflict can re-run it safely.
+
+    async def _on_join(self, player_id: str, display_name: str) -> MultiplayerRoom:
+        room = await room_manager.get_room(self.room_code)
+        if not room or not room_manager.join_room(room, player_id, display_name):
+            raise HTTPException(status_code=404, detail="Room not found or game already started")
+        await room_manager.save_room(room)
+
+        # Broadcast player joined
+        await ws_manager.broadcast_to_room(room.room_code, {
+            "type": "player_joined",
+            "payload": {
+                "player_id": player_id,
+                "display_name": display_name,
+                "players": room_manager.get_players_list(room),
+            },
+        })
+        return room
+
+    async def _on_start(self, player_id: str):
+        room = await self._load()
+        if player_id != room.host_id:
+            raise HTTPException(status_code=403, detail="Only host can start game")
+        if len(room.players) < 2:
+            raise HTTPException(status_code=400, detail="Need at least 2 players")
+        if room.game_started:
+            raise HTTPException(status_code=400, detail="Game already started")
+
+        room.game_started = True
+        room_manager.start_round(room)
+        await room_manager.save_room(room)
+        await self._round_started(room)
+
+    async def _on_submit(self, player_id: str, allocations: Dict[str, float]):
+        room = await self._load()
+        if not room.round_active:
+            raise HTTPException(status_code=400, detail="Round not active")
+
+        room_manager.submit_allocation(room, player_id, allocations)
+        # If all submitted, end round early
+        round_over = room_manager.all_submitted(room)
+        if round_over:
+            room_manager.end_round(room)
+        await room_manager.save_room(room)
+
+        # Broadcast submission count
+        submitted_count = sum(1 for p in room.players.values() if p.submitted)
+        await ws_manager.broadcast_to_room(self.room_code, {
+            "type": "player_submitted",
+            "payload": {
+                "player_id": player_id,
+                "submitted_count": submitted_count,
+                "total_players": len(room.players),
+            },
+        })
+        if round_over:
+            await self._round_ended(room)
+
+    async def _on_leave(self, player_id: str):
+        room = await room_manager.get_room(self.room_code)
+        if room is None or not await room_manager.leave_room(room, player_id):
+            room_timers.cancel_group(self.room_code)
+            self.stop()
+            return
+        await room_manager.save_room(room)
+
+        await ws_manager.broadcast_to_room(self.room_code, {
+            "type": "player_left",
+            "payload": {
+                "player_id": player_id,
+                "players": room_manager.get_players_list(room),
+                "host_id": room.host_id,
+            },
+        })
+
+    async def _on_round_timeout(self, round_number: int):
+        room = await self._load()
+        # Ignore a timer from a round that already ended
+        if not (room.round_active and room.current_round == round_number):
+            return
+        room_manager.end_round(room)
+        await room_manager.save_room(room)
+        await self._round_ended(room)
+
+    async def _on_advance(self, round_number: int, leaderboard: list):
+        """Start the next round, or complete the game after the last one."""
+        room = await self._load()
+        # Only once per round, whichever worker's timer gets here first
+        if room.round_active or room.current_round != round_number:
+            return
+        has_more = room_manager.advance_round(room)
+        if has_more:
+            room_manager.start_round(room)
+        await room_manager.save_room(room)
+
+        if has_more:
+            await self._round_started(room)
+        else:
+            await ws_manager.broadcast_to_room(self.room_code, {
+                "type": "game_complete",
+                "payload": {
+                    "final_leaderboard": leaderboard,
+                },
+            })
+
+    # ── Round flow (after the room is saved) ──────────────────────
+
+    async def _round_started(self, room: MultiplayerRoom):
+        await ws_manager.broadcast_to_room(self.room_code, {
+            "type": "round_start",
+            "payload": {
+                "current_round": room.current_round,
+                "timer_duration": room.timer_duration,
+            },
+        })
+        # Server-side timer: ends the round when time expires
+        round_number = room.current_round
+        room_timers.schedule(
+            (self.room_code, "round"),
+            room.timer_duration,
+            lambda: self.registry.tell(self.room_code, "round_timeout", round_number=round_number),
+        )
+
+    async def _round_ended(self, room: MultiplayerRoom):
+        """Show the scoreboard, then advance or complete."""
+        room_timers.cancel((self.room_code, "round"))
+        leaderboard = room_manager.get_leaderboard(room)
+
+        # Broadcast round end with scoreboard
+        await ws_manager.broadcast_to_room(self.room_code, {
+            "type": "round_end",
+            "payload": {
+                "round": room.current_round,
+                "leaderboard": leaderboard,
+            },
+        })
+
+        # Advance once the scoreboard has been shown
+        round_number = room.current_round
+        room_timers.schedule(
+            (self.room_code, "advance"),
+            SCOREBOARD_SECONDS,
+            lambda: self.registry.tell(
+                self.room_code, "advance", round_number=round_number, leaderboard=leaderboard
+            ),
+        )
+
+    def stop(self):
+        self.stopped = True
+        if self.registry.actors.get(self.room_code) is self:
+            del self.registry.actors[self.room_code]
+
+
+class RoomActors:
+    def __init__(self):
+        self.actors: Dict[str, RoomActor] = {}
+        self.max_inbox_seen = 0
+        self.latency_ms: Dict[str, Deque[float]] = {}
+        self.commands: Dict[str, int] = {}
+        self.conflicts = 0
+
+    async def _actor(self, room_code: str) -> RoomActor:
+        actor = self.actors.get(room_code)
+        if actor is None:
+            if await room_manager.get_room(room_code) is None:
+                raise HTTPException(status_code=404, detail="Room not found")
+            # Another caller may have started one while the store was read
+            actor = self.actors.get(room_code)
+            if actor is None:
+                actor = self.actors[room_code] = RoomActor(self, room_code)
+        return actor
+
+    async def call(self, room_code: str, command: str, **kwargs) -> Any:
+        """Post a command to the room's actor and wait for its result."""
+        reply = asyncio.get_running_loop().create_future()
+        (await self._actor(room_code)).post(command, kwargs, reply)
+        return await reply
+
+    async def tell(self, room_code: str, command: str, **kwargs):
+        """Post a command without waiting; dropped if the room is gone."""
+        try:
+            (await self._actor(room_code)).post(command, kwargs, None)
+        except HTTPException:
+            pass
+
+    def record(self, command: str, ms: float):
+        self.commands[command] = self.commands.get(command, 0) + 1
+        self.latency_ms.setdefault(command, deque(maxlen=TIMING_WINDOW)).append(ms)
+
+    def stats(self) -> dict:
+        return {
+            "actors": len(self.actors),
+            "queued": sum(a.inbox.qsize() for a in self.actors.values()),
+            "max_inbox_seen": self.max_inbox_seen,
+            "save_conflicts": self.conflicts,
+            "commands": {
+                name: {
+                    "count": self.commands[name],
+                    "latency_ms_p50": round(percentile(samples, 50), 2),
+                    "latency_ms_p95": round(percentile(samples, 95), 2),
+                }
+                for name, samples in self.latency_ms.items()
+            },
+        }
+
+
+room_actors = RoomActors()
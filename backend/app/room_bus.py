@@ -0,0 +1,225 @@
+"""
+Cross-worker pub/sub for multiplayer WebSocket broadcasts (ROOM_BUS_PATH).
+
+A room's sockets can be spread over several uvicorn workers, so each
+broadcast is delivered to this worker's sockets and also published on the
+bus; every other worker delivers it to its own sockets for that room.
+
+With ROOM_BUS_PATH unset the bus is local-only (single worker). Otherwise it
+is a Unix socket on the host: the first worker to take the `<path>.lock`
+file lock runs the broker, which relays newline-delimited JSON
+{"room", "frame"} from each worker to all the others. Every worker, the
+broker's included, connects as a client and reconnects (re-electing a broker)
+if the broker goes away. A broker can also run on its own:
+
+    python -m app.room_bus --path /tmp/devfest-rooms.sock
+
+publish() never waits: while disconnected, or when the broker isn't keeping
+up, frames are dropped and counted in stats().
+"""
+
+import argparse
+import asyncio
+import fcntl
+import json
+import os
+from typing import Callable, Optional, Set
+
+from app.config import get_settings
+
+settings = get_settings()
+
+RECONNECT_SECONDS = 0.5
+MAX_LINE_BYTES = 4 * 1024 * 1024
+MAX_BUFFER_BYTES = 1024 * 1024   # unsent bytes before a peer counts as stalled
+
+Handler = Callable[[str, str], None]
+
+
+class RoomBus:
+    """Local-only bus: broadcasts stay in this worker."""
+
+    def __init__(self):
+        self._handlers: list[Handler] = []
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+
+    def on_message(self, handler: Handler):
+        """Call `handler(room_code, frame)` for frames published by other workers."""
+        self._handlers.append(handler)
+
+    def _dispatch(self, room_code: str, frame: str):
+        self.received += 1
+        for handler in self._handlers:
+            try:
+                handler(room_code, frame)
+            except Exception as e:
+                print(f"⚠️ Room bus handler failed: {e}")
+
+    def publish(self, room_code: str, frame: str):
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": "local",
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+        }
+
+
+class UnixSocketRoomBus(RoomBus):
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock_file = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self.connects = 0
+        self.relayed = 0
+
+    # ── Broker ────────────────────────────────────────────────────
+
+    def _try_become_broker(self) -> bool:
+        if self._lock_file is None:
+            self._lock_file = open(self.path + ".lock", "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    async def serve(self):
+        """Run the broker; the caller must hold the lock."""
+        if os.path.exists(self.path):
+            os.unlink(self.path)     # left behind by a broker that died
+        self._server = await asyncio.start_unix_server(
+            self._relay, path=self.path, limit=MAX_LINE_BYTES
+        )
+        print(f"✅ Room bus broker listening on {self.path}")
+
+    async def _relay(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._peers.add(writer)
+        try:
+            while line := await reader.readline():
+                for peer in list(self._peers):
+                    if peer is writer:
+                        continue
+                    if peer.transport.get_write_buffer_size() > MAX_BUFFER_BYTES:
+                        # A stalled worker: drop it, it reconnects
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(line)
+                    self.relayed += 1
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    # ── Client ────────────────────────────────────────────────────
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                if self._server is None and self._try_become_broker():
+                    await self.serve()
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE_BYTES)
+            except OSError:
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+
+            self._writer = writer
+            self.connects += 1
+            try:
+                while line := await reader.readline():
+                    message = json.loads(line)
+                    self._dispatch(message["room"], message["frame"])
+            except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+                print(f"⚠️ Room bus connection lost: {e}")
+            finally:
+                self._writer = None
+                writer.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    def publish(self, room_code: str, frame: str):
+        writer = self._writer
+        if writer is None or writer.transport.get_write_buffer_size() > MAX_BUFFER_BYTES:
+            self.dropped += 1
+            return
+        writer.write(json.dumps({"room": room_code, "frame": frame}).encode() + b"\n")
+        self.published += 1
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._server is not None:
+            self._server.close()
+            for peer in list(self._peers):
+                peer.close()
+            self._server = None
+        if self._lock_file is not None:
+            self._lock_file.close()     # releases the lock for the next broker
+            self._lock_file = None
+
+    def stats(self) -> dict:
+        return {
+            "backend": "unix",
+            "path": self.path,
+            "connected": self._writer is not None,
+            "broker": self._server is not None,
+            "peers": len(self._peers),
+            "connects": self.connects,
+            "published": self.published,
+            "received": self.received,
+            "relayed": self.relayed,
+            "dropped": self.dropped,
+        }
+
+
+def create_room_bus() -> RoomBus:
+    if settings.room_bus_path:
+        return UnixSocketRoomBus(settings.room_bus_path)
+    return RoomBus()
+
+
+room_bus = create_room_bus()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a standalone room bus broker")
+    parser.add_argument("--path", type=str, default=settings.room_bus_path, help="Unix socket path")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("--path (or ROOM_BUS_PATH) is required")
+
+    async def run():
+        broker = UnixSocketRoomBus(args.path)
+        if not broker._try_become_broker():
+            raise SystemExit(f"⚠️ Another broker holds {args.path}.lock")
+        await broker.serve()
+        await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """
-In-memory room management for multiplayer games.
-Rooms are ephemeral — no DB persistence needed.
+Room management for multiplayer games.
+Rooms are ephemeral: kept in memory, or in a store shared by all workers
+(see app/room_store.py). Changes are applied by the room's actor
+(app/room_actor.py), which saves the room afterwards.
 """
 
 import random
@@ -9,6 +11,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+from app.room_store import RoomConflict, create_room_store
+
 # Stock returns per round (mirrors frontend gameData.js)
 # Used for server-side score calculation so players can't cheat
 ROUND_STOCK_RETURNS: Dict[int, Dict[str, float]] = {
@@ -67,44 +71,50 @@ class MultiplayerRoom:
     round_active: bool = False
     timer_duration: int = 30
     created_at: datetime = field(default_factory=datetime.utcnow)
+    version: int = 0                                # bumped on every shared-store save
 
 
 class RoomManager:
-    def __init__(self):
-        self.rooms: Dict[str, MultiplayerRoom] = {}
+    def __init__(self, store=None):
+        self.store = store if store is not None else create_room_store()
+
+    async def get_room(self, room_code: str) -> Optional[MultiplayerRoom]:
+        return await self.store.get(room_code)
+
+    async def save_room(self, room: MultiplayerRoom):
+        await self.store.save(room)
 
     def generate_room_code(self) -> str:
+        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+
+    async def create_room(self, host_id: str, host_name: str) -> MultiplayerRoom:
+        # The store rejects a code that's already taken (by any worker)
         while True:
-            code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            if code not in self.rooms:
-                return code
-
-    def create_room(self, host_id: str, host_name: str) -> MultiplayerRoom:
-        code = self.generate_room_code()
-        room = MultiplayerRoom(room_code=code, host_id=host_id)
-        room.players[host_id] = Player(player_id=host_id, display_name=host_name)
-        self.rooms[code] = room
-        return room
-
-    def join_room(self, room_code: str, player_id: str, display_name: str) -> Optional[MultiplayerRoom]:
-        room = self.rooms.get(room_code)
-        if not room or room.game_started:
-            return None
+            room = MultiplayerRoom(room_code=self.generate_room_code(), host_id=host_id)
+            room.players[host_id] = Player(player_id=host_id, display_name=host_name)
+            if await self.store.create(room):
+                return room
+
+    def join_room(self, room: MultiplayerRoom, player_id: str, display_name: str) -> bool:
+        if room.game_started:
+            return False
         if len(room.players) >= 8:
-            return None
+            return False
         room.players[player_id] = Player(player_id=player_id, display_name=display_name)
-        return room
+        return True
 
-    def leave_room(self, room_code: str, player_id: str):
-        room = self.rooms.get(room_code)
-        if not room:
-            return
+    async def leave_room(self, room: MultiplayerRoom, player_id: str) -> bool:
+        """
+        Remove a player. Returns False if that emptied (and deleted) the room;
+        RoomConflict if the room changed since it was loaded.
+        """
         room.players.pop(player_id, None)
+        if not room.players:
+            await self.store.delete(room)
+            return False
         if player_id == room.host_id:
-            if room.players:
-                room.host_id = next(iter(room.players))
-            else:
-                del self.rooms[room_code]
+            room.host_id = next(iter(room.players))
+        return True
 
     def start_round(self, room: MultiplayerRoom):
         room.round_active = True
@@ -195,14 +205,14 @@ class RoomManager:
             for p in room.players.values()
         ]
 
-    def cleanup_old_rooms(self, max_age_hours: int = 24):
+    async def cleanup_old_rooms(self, max_age_hours: int = 24):
         now = datetime.utcnow()
-        to_delete = [
-            code for code, room in self.rooms.items()
-            if (now - room.created_at) > timedelta(hours=max_age_hours)
-        ]
-        for code in to_delete:
-            del self.rooms[code]
+        for room in await self.store.all():
+            if (now - room.created_at) > timedelta(hours=max_age_hours):
+                try:
+                    await self.store.delete(room)
+                except RoomConflict:
+                    pass   # still in use; picked up by a later cleanup
 
 
 room_manager = RoomManager()
@@ -0,0 +1,199 @@
+"""
+Room storage for multiplayer (ROOM_STORE).
+
+- "memory": rooms live in this process (single worker, the default)
+- "sqlite": rooms are JSON rows in a SQLite file (ROOM_STORE_PATH) shared by
+  every worker on the host, so any worker can serve any room
+
+Room codes are claimed with create(), which fails if the code exists in the
+store, so codes stay unique across workers. Writes are compare-and-swap on
+MultiplayerRoom.version: save() and delete() raise RoomConflict when another
+worker changed the room since it was loaded, and the room actor re-runs the
+command against the fresh copy.
+
+To run several workers: ROOM_STORE=sqlite, ROOM_BUS_PATH=<unix socket> (see
+app/room_bus.py for cross-worker WebSocket broadcasts), then
+`uvicorn app.main:app --workers N`.
+"""
+
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.blocking import run_blocking
+from app.config import get_settings
+
+if TYPE_CHECKING:
+    from app.room_manager import MultiplayerRoom
+
+settings = get_settings()
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+class RoomConflict(Exception):
+    """The room changed in the store since it was loaded."""
+
+
+class RoomStore(ABC):
+    @abstractmethod
+    async def get(self, room_code: str) -> Optional["MultiplayerRoom"]:
+        ...
+
+    @abstractmethod
+    async def create(self, room: "MultiplayerRoom") -> bool:
+        """Insert a new room; False if its code is already taken."""
+
+    @abstractmethod
+    async def save(self, room: "MultiplayerRoom"):
+        """Write back a loaded room; RoomConflict if it changed since."""
+
+    @abstractmethod
+    async def delete(self, room: "MultiplayerRoom"):
+        """Delete a loaded room; RoomConflict if it changed since."""
+
+    @abstractmethod
+    async def all(self) -> List["MultiplayerRoom"]:
+        ...
+
+
+class MemoryRoomStore(RoomStore):
+    """Rooms held in this process; get() returns the live object."""
+
+    def __init__(self):
+        self.rooms: Dict[str, "MultiplayerRoom"] = {}
+
+    async def get(self, room_code: str) -> Optional["MultiplayerRoom"]:
+        return self.rooms.get(room_code)
+
+    async def create(self, room: "MultiplayerRoom") -> bool:
+        if room.room_code in self.rooms:
+            return False
+        self.rooms[room.room_code] = room
+        return True
+
+    async def save(self, room: "MultiplayerRoom"):
+        # The actor serializes every change to a room in this process
+        self.rooms[room.room_code] = room
+
+    async def delete(self, room: "MultiplayerRoom"):
+        self.rooms.pop(room.room_code, None)
+
+    async def all(self) -> List["MultiplayerRoom"]:
+        return list(self.rooms.values())
+
+
+def _dump(room: "MultiplayerRoom") -> str:
+    data = asdict(room)
+    data["created_at"] = room.created_at.isoformat()
+    return json.dumps(data)
+
+
+def _load(raw: str, version: int) -> "MultiplayerRoom":
+    # room_manager builds its store from this module at import time
+    from app.room_manager import MultiplayerRoom, Player
+
+    data = json.loads(raw)
+    data["players"] = {pid: Player(**p) for pid, p in data["players"].items()}
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    data["version"] = version
+    return MultiplayerRoom(**data)
+
+
+class SQLiteRoomStore(RoomStore):
+    """
+    Rooms shared by every worker on the host through one SQLite file. Queries
+    run on the blocking executor (a busy database waits up to BUSY_TIMEOUT
+    there, not on the event loop), each executor thread with its own connection.
+    """
+
+    BUSY_TIMEOUT = 5.0
+
+    def __init__(self, path: str):
+        path = Path(path)
+        if not path.is_absolute():
+            path = BACKEND_DIR / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS rooms ("
+            " code TEXT PRIMARY KEY, data TEXT NOT NULL,"
+            " version INTEGER NOT NULL, updated_at TEXT NOT NULL)"
+        )
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.BUSY_TIMEOUT, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _get(self, room_code: str) -> Optional["MultiplayerRoom"]:
+        row = self._db().execute(
+            "SELECT data, version FROM rooms WHERE code = ?", (room_code,)
+        ).fetchone()
+        return _load(*row) if row else None
+
+    def _create(self, room: "MultiplayerRoom") -> bool:
+        try:
+            self._db().execute(
+                "INSERT INTO rooms (code, data, version, updated_at) VALUES (?, ?, ?, ?)",
+                (room.room_code, _dump(room), 1, datetime.utcnow().isoformat()),
+            )
+        except sqlite3.IntegrityError:
+            return False
+        room.version = 1
+        return True
+
+    def _save(self, room: "MultiplayerRoom"):
+        cursor = self._db().execute(
+            "UPDATE rooms SET data = ?, version = version + 1, updated_at = ?"
+            " WHERE code = ? AND version = ?",
+            (_dump(room), datetime.utcnow().isoformat(), room.room_code, room.version),
+        )
+        if cursor.rowcount != 1:
+            raise RoomConflict(room.room_code)
+        room.version += 1
+
+    def _delete(self, room: "MultiplayerRoom"):
+        cursor = self._db().execute(
+            "DELETE FROM rooms WHERE code = ? AND version = ?", (room.room_code, room.version)
+        )
+        if cursor.rowcount != 1:
+            raise RoomConflict(room.room_code)
+
+    def _all(self) -> List["MultiplayerRoom"]:
+        rows = self._db().execute("SELECT data, version FROM rooms").fetchall()
+        return [_load(*row) for row in rows]
+
+    async def get(self, room_code: str) -> Optional["MultiplayerRoom"]:
+        return await run_blocking(self._get, room_code, label="rooms")
+
+    async def create(self, room: "MultiplayerRoom") -> bool:
+        return await run_blocking(self._create, room, label="rooms")
+
+    async def save(self, room: "MultiplayerRoom"):
+        await run_blocking(self._save, room, label="rooms")
+
+    async def delete(self, room: "MultiplayerRoom"):
+        await run_blocking(self._delete, room, label="rooms")
+
+    async def all(self) -> List["MultiplayerRoom"]:
+        return await run_blocking(self._all, label="rooms")
+
+
+def create_room_store() -> RoomStore:
+    if settings.room_store == "sqlite":
+        return SQLiteRoomStore(settings.room_store_path)
+    if settings.room_store != "memory":
+        print(f"⚠️ Unknown ROOM_STORE={settings.room_store!r}, using memory")
+    return MemoryRoomStore()
@@ -0,0 +1,196 @@
+"""
+Round packs — document sets pre-materialized by the selection engine.
+
+The backward-linkage engine runs offline (build_round_packs.py) and stores N
+varied document sets per RoundConfig × difficulty. /api/game/start samples
+one pack from the pool instead of running the engine; packs are reused, not
+consumed, so a burst of starts can't drain a pool. A pool is topped up in the
+background once it drops below the low watermark.
+
+Each pack records the corpus version (candidate_index.corpus_version) it was
+built from, and only packs of the current version are served. The version is
+read from the database, so writes from any process (scrapers, relevance
+builder, seeders) retire existing packs; the next refill purges them.
+"""
+
+import asyncio
+import random
+from typing import Optional
+
+from sqlalchemy import select, delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.database import async_session
+from app.models import RoundConfig, StockReturn, Document, RoundPack, Difficulty
+from app.engine import select_documents_for_round, load_full_documents
+from app.candidate_index import candidate_index, corpus_version
+
+settings = get_settings()
+
+PACK_DIFFICULTIES = [d.value for d in Difficulty]
+
+# Background refills in flight, keyed by (round_id, difficulty)
+_refills: dict[tuple[str, str], asyncio.Task] = {}
+
+
+def _pool(round_id: str, difficulty: str, version: str) -> list:
+    """WHERE clauses selecting the packs of a pool built from `version`."""
+    return [
+        RoundPack.round_id == round_id,
+        RoundPack.difficulty == difficulty,
+        RoundPack.corpus_version == version,
+    ]
+
+
+async def pool_size(
+    db: AsyncSession,
+    round_id: str,
+    difficulty: str,
+    version: Optional[str] = None,
+) -> int:
+    if version is None:
+        version = await corpus_version(db, round_id)
+    result = await db.execute(
+        select(func.count(RoundPack.id)).where(*_pool(round_id, difficulty, version))
+    )
+    return result.scalar() or 0
+
+
+async def purge_stale_packs(db: AsyncSession, round_id: str, difficulty: str, version: str) -> int:
+    """Delete a pool's packs built from any other corpus version. Returns the number deleted."""
+    result = await db.execute(
+        delete(RoundPack).where(
+            RoundPack.round_id == round_id,
+            RoundPack.difficulty == difficulty,
+            or_(RoundPack.corpus_version.is_(None), RoundPack.corpus_version != version),
+        )
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def build_packs(
+    db: AsyncSession,
+    round_config: RoundConfig,
+    difficulty: str,
+    count: int,
+    version: Optional[str] = None,
+) -> int:
+    """
+    Run the engine for up to `count` unused seeds and store each document set
+    as a pack tagged with `version` (default: the current corpus version).
+    Returns the number of packs created.
+    """
+    if count <= 0:
+        return 0
+    if version is None:
+        version = await corpus_version(db, round_config.id)
+    if settings.candidate_index_enabled:
+        # Select from an index built from this version, not a stale entry
+        version = (await candidate_index.get(db, round_config, version)).corpus_version
+
+    result = await db.execute(
+        select(StockReturn).where(StockReturn.round_id == round_config.id)
+    )
+    stocks = list(result.scalars().all())
+    if not stocks:
+        return 0
+
+    # Each pack is the engine's output for one seed; skip seeds already pooled
+    result = await db.execute(
+        select(RoundPack.seed).where(*_pool(round_config.id, difficulty, version))
+    )
+    pooled = set(result.scalars().all())
+    free_seeds = [s for s in range(settings.selection_seed_variants) if s not in pooled]
+
+    created = 0
+    for seed in random.sample(free_seeds, min(count, len(free_seeds))):
+        docs = await select_documents_for_round(
+            db, round_config, stocks, difficulty=difficulty, seed=seed
+        )
+        if not docs:
+            continue
+        db.add(RoundPack(
+            round_id=round_config.id,
+            difficulty=difficulty,
+            seed=seed,
+            document_ids=[d.id for d in docs],
+            corpus_version=version,
+        ))
+        created += 1
+
+    await db.commit()
+    return created
+
+
+async def refill_pool(
+    db: AsyncSession,
+    round_config: RoundConfig,
+    difficulty: str,
+    target: Optional[int] = None,
+) -> int:
+    """
+    Drop the pool's packs from older corpus versions and top it up to `target`
+    packs. Returns the number of packs created.
+    """
+    target = settings.round_pack_pool_size if target is None else target
+    version = await corpus_version(db, round_config.id)
+    await purge_stale_packs(db, round_config.id, difficulty, version)
+    missing = target - await pool_size(db, round_config.id, difficulty, version)
+    return await build_packs(db, round_config, difficulty, missing, version)
+
+
+async def take_pack(
+    db: AsyncSession,
+    round_id: str,
+    difficulty: str,
+) -> Optional[tuple[Optional[int], list[Document]]]:
+    """
+    Sample a random pack from the pool and return (seed, documents in served
+    order). Returns None when the pool is empty. Read-only: the pack stays in
+    the pool, so concurrent starts never contend for it. A background refill
+    starts if the pool is below the low watermark.
+    """
+    if difficulty not in PACK_DIFFICULTIES:
+        return None
+
+    version = await corpus_version(db, round_id)
+    result = await db.execute(
+        select(RoundPack.seed, RoundPack.document_ids).where(*_pool(round_id, difficulty, version))
+    )
+    pool = result.all()
+
+    if len(pool) < settings.round_pack_low_watermark:
+        schedule_refill(round_id, difficulty)
+    if not pool:
+        return None
+
+    seed, doc_ids = random.choice(pool)
+    docs = await load_full_documents(db, doc_ids or [])
+    return (seed, docs) if docs else None
+
+
+def schedule_refill(round_id: str, difficulty: str):
+    """Refill a pool in the background (at most one refill per pool at a time)."""
+    key = (round_id, difficulty)
+    task = _refills.get(key)
+    if task and not task.done():
+        return
+    _refills[key] = asyncio.create_task(_refill_in_background(round_id, difficulty))
+
+
+async def _refill_in_background(round_id: str, difficulty: str):
+    try:
+        async with async_session() as db:
+            result = await db.execute(
+                select(RoundConfig).where(RoundConfig.id == round_id)
+            )
+            round_config = result.scalar_one_or_none()
+            if round_config:
+                await refill_pool(db, round_config, difficulty)
+    except Exception as e:
+        print(f"Round pack refill failed for {round_id}/{difficulty}: {e}")
+    finally:
+        _refills.pop((round_id, difficulty), None)
+
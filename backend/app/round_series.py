@@ -0,0 +1,166 @@
+"""
+Per-round normalized price series for the graph-data endpoint.
+
+A round has a fixed ticker set and period, so its aligned close matrix never
+changes once the prices are stored. Each round's matrix is forward-filled and
+normalized (close / first close) once; a player's series is then the
+allocation-weighted sum of cached columns, and the optimal series is computed
+once per round. Results are identical to historical_data.get_portfolio_time_series.
+
+Entries are dropped with the candidate index (round / stock writes) and
+rebuilt when the price store is re-ingested. A series missing a ticker (an
+empty or failed yfinance backfill) is never cached, and one built from
+backfill rather than the local store expires after BACKFILL_MAX_AGE_SECONDS.
+"""
+
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.blocking import run_blocking
+from app.candidate_index import candidate_index
+from app.historical_data import forward_fill, get_portfolio_time_series
+from app.models import RoundConfig, StockReturn
+from app.price_store import price_provider, price_store
+from app.scoring import optimal_allocations
+
+BACKFILL_MAX_AGE_SECONDS = 300
+
+
+@dataclass
+class RoundSeries:
+    round_id: str
+    period_start: date
+    period_end: date
+    tickers: List[str]
+    dates: List[str]
+    traded: np.ndarray                  # dates × tickers: ticker has a close that day
+    growth: np.ndarray                  # dates × tickers: forward-filled close / first close
+    store_version: str
+    from_store: bool = True             # every ticker and date came from the local store
+    built_at: float = field(default_factory=time.monotonic)
+    optimal: List[Dict] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.columns = {t: i for i, t in enumerate(self.tickers)}
+
+    @property
+    def complete(self) -> bool:
+        """Every ticker has at least one close in the period."""
+        return bool(len(self.dates)) and bool(self.traded.any(axis=0).all())
+
+    def fresh(self) -> bool:
+        if self.store_version != price_store.version:
+            return False
+        return self.from_store or (time.monotonic() - self.built_at) < BACKFILL_MAX_AGE_SECONDS
+
+    def portfolio(self, allocations: Dict[str, float], initial_balance: float = 1000000.0) -> Optional[List[Dict]]:
+        """
+        Portfolio value series for `allocations`, or None if they name a
+        ticker outside this round (the caller falls back to a full fetch).
+        """
+        if not allocations:
+            return []
+        if any(t not in self.columns for t in allocations):
+            return None
+
+        cols = [self.columns[t] for t in allocations]
+        if not self.traded[:, cols].any(axis=0).all():
+            return []   # an allocated ticker has no price data
+
+        growth = self.growth[:, cols]
+        # Dates any allocated ticker traded, once every one of them has a first close
+        rows = self.traded[:, cols].any(axis=1) & ~np.isnan(growth).any(axis=1)
+        weights = np.array(list(allocations.values()), dtype=float) / 100.0
+        values = growth[rows] @ weights * initial_balance
+        dates = [d for d, keep in zip(self.dates, rows) if keep]
+        return [
+            {'date': d, 'portfolio_value': round(float(v), 2)}
+            for d, v in zip(dates, values)
+        ]
+
+
+def build_round_series(round_config: RoundConfig, stocks: List[StockReturn]) -> RoundSeries:
+    tickers = list(dict.fromkeys(s.ticker for s in stocks))
+    dates, closes = price_provider.close_matrix(
+        tickers, round_config.period_start, round_config.period_end
+    )
+    traded = ~np.isnan(closes)
+    if len(dates):
+        first = closes[np.argmax(traded, axis=0), np.arange(closes.shape[1])]
+        growth = forward_fill(closes) / first
+    else:
+        growth = closes
+
+    entry = RoundSeries(
+        round_id=round_config.id,
+        period_start=round_config.period_start,
+        period_end=round_config.period_end,
+        tickers=tickers,
+        dates=[str(d) for d in dates],
+        traded=traded,
+        growth=growth,
+        store_version=price_store.version,
+        from_store=price_store.covers(tickers, round_config.period_start, round_config.period_end),
+    )
+    returns = {s.ticker: s.return_pct for s in stocks}
+    entry.optimal = entry.portfolio(optimal_allocations(returns, max_per_stock=50.0)) or []
+    return entry
+
+
+class RoundSeriesCache:
+    def __init__(self):
+        self._rounds: Dict[str, RoundSeries] = {}
+        self.builds = 0
+
+    def invalidate(self, round_id: Optional[str] = None):
+        if round_id is None:
+            self._rounds.clear()
+        else:
+            self._rounds.pop(round_id, None)
+
+    def peek(self, round_id: str) -> Optional[RoundSeries]:
+        """Cached series for a round, if built against the current price store."""
+        entry = self._rounds.get(round_id)
+        if entry and entry.fresh():
+            return entry
+        return None
+
+    def get(self, round_config: RoundConfig, stocks: List[StockReturn]) -> RoundSeries:
+        entry = self.peek(round_config.id)
+        if entry is None:
+            entry = build_round_series(round_config, stocks)
+            self.builds += 1
+            # Missing prices may be a transient backfill failure: retry next call
+            if entry.complete:
+                self._rounds[round_config.id] = entry
+            else:
+                self._rounds.pop(round_config.id, None)
+        return entry
+
+    async def warm(self, db: AsyncSession) -> int:
+        """Build series for every round. Returns the number of rounds built."""
+        result = await db.execute(select(RoundConfig))
+        rounds = list(result.scalars().all())
+        for round_config in rounds:
+            result = await db.execute(
+                select(StockReturn).where(StockReturn.round_id == round_config.id)
+            )
+            self.invalidate(round_config.id)
+            await run_blocking(self.get, round_config, list(result.scalars().all()), label="prices")
+        return len(rounds)
+
+    def player_series(self, entry: RoundSeries, allocations: Dict[str, float]) -> List[Dict]:
+        series = entry.portfolio(allocations)
+        if series is None:
+            series = get_portfolio_time_series(allocations, entry.period_start, entry.period_end)
+        return series
+
+
+round_series_cache = RoundSeriesCache()
+candidate_index.on_invalidate(round_series_cache.invalidate)
@@ -2,23 +2,36 @@
 API Routes for the FinSight game.
 """
 
+import asyncio
+import random
 import uuid
-from datetime import datetime
-from sqlalchemy import select
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
-from app.database import get_db
+from app.config import get_settings
+from app.database import get_db, async_session
 from app.models import (
-    RoundConfig, StockReturn, Document, DocumentStockRelevance, GameSession,
+    RoundConfig, StockReturn, Document, GameSession, ResultSnapshot,
 )
 from app.schemas import (
     RoundListItem, GameStartRequest, GameStartResponse,
     GameSubmitRequest, GameSubmitResponse,
     StockOut, DocumentOut, StockResult, CausalChainMapping,
-    RetrospectiveOut, GameResultsResponse,
+    RetrospectiveOut, GameResultsResponse, RetrospectiveStatusResponse,
 )
 from app.engine import select_documents_for_round
+from app.round_packs import take_pack
+from app.candidate_index import candidate_index
+from app.start_cache import start_cache, CachedStart
+from app.causal_chains import causal_chain_cache
+from app.jobs import job_queue, DONE, FAILED
+from app.round_series import round_series_cache
+from app.blocking import run_blocking
 from app.scoring import (
     calculate_player_return, calculate_optimal_return,
     calculate_score, compute_stock_results,
@@ -26,6 +39,8 @@ from app.scoring import (
 from app.llm_service import generate_retrospective
 from app.k2_service import generate_game_analysis
 
+settings = get_settings()
+
 router = APIRouter(prefix="/api")
 
 
@@ -47,55 +62,83 @@ async def list_rounds(db: AsyncSession = Depends(get_db)):
 async def start_game(req: GameStartRequest, db: AsyncSession = Depends(get_db)):
     """Start a new game session. Returns round config + selected documents + stocks (no returns)."""
 
-    # Load round config
-    result = await db.execute(
-        select(RoundConfig).where(RoundConfig.id == req.round_id)
-    )
-    round_config = result.scalar_one_or_none()
-    if not round_config:
-        raise HTTPException(status_code=404, detail=f"Round '{req.round_id}' not found")
+    # Selection is deterministic per seed, so a bounded seed space lets the
+    # serialized payload be reused across sessions
+    seed = random.randrange(settings.selection_seed_variants)
+    cached = None
+    if not settings.round_packs_enabled:
+        # With packs on, the pool is the selection cache (see start_cache)
+        version = candidate_index.version(req.round_id)
+        if version is not None:
+            cached = start_cache.get((req.round_id, req.difficulty, seed, version))
+
+    if cached is None:
+        # Load round config
+        result = await db.execute(
+            select(RoundConfig).where(RoundConfig.id == req.round_id)
+        )
+        round_config = result.scalar_one_or_none()
+        if not round_config:
+            raise HTTPException(status_code=404, detail=f"Round '{req.round_id}' not found")
 
-    # Load stocks for this round
-    result = await db.execute(
-        select(StockReturn).where(StockReturn.round_id == req.round_id)
-    )
-    stocks = list(result.scalars().all())
-    if not stocks:
-        raise HTTPException(status_code=500, detail="No stocks configured for this round")
+        # Load stocks for this round
+        result = await db.execute(
+            select(StockReturn).where(StockReturn.round_id == req.round_id)
+        )
+        stocks = list(result.scalars().all())
+        if not stocks:
+            raise HTTPException(status_code=500, detail="No stocks configured for this round")
+
+        # Take a pre-materialized pack; run the selection engine if the pool is empty
+        pack = None
+        if settings.round_packs_enabled:
+            pack = await take_pack(db, req.round_id, req.difficulty)
+        if pack:
+            pack_seed, selected_docs = pack
+            if pack_seed is not None:
+                seed = pack_seed
+        else:
+            selected_docs = await select_documents_for_round(
+                db, round_config, stocks, difficulty=req.difficulty, seed=seed
+            )
 
-    # Run document selection engine
-    selected_docs = await select_documents_for_round(
-        db, round_config, stocks, difficulty=req.difficulty
-    )
+        cached = CachedStart.from_response(GameStartResponse(
+            session_id="",
+            round_id=round_config.id,
+            title=round_config.title,
+            description=round_config.description,
+            period_start=round_config.period_start,
+            period_end=round_config.period_end,
+            stocks=[StockOut.model_validate(s) for s in stocks],
+            documents=[DocumentOut.model_validate(d) for d in selected_docs],
+        ))
+        # The engine may have (re)built the index; key on the version it used
+        if not settings.round_packs_enabled:
+            version = candidate_index.version(req.round_id)
+            if version is not None:
+                start_cache.put((req.round_id, req.difficulty, seed, version), cached)
 
     # Create game session
     session_id = str(uuid.uuid4())
     session = GameSession(
         id=session_id,
         round_id=req.round_id,
-        documents_served=[doc.id for doc in selected_docs],
+        difficulty=req.difficulty,
+        selection_seed=seed,
+        documents_served=list(cached.document_ids),
         created_at=datetime.utcnow(),
     )
     db.add(session)
     await db.commit()
 
-    return GameStartResponse(
-        session_id=session_id,
-        round_id=round_config.id,
-        title=round_config.title,
-        description=round_config.description,
-        period_start=round_config.period_start,
-        period_end=round_config.period_end,
-        stocks=[StockOut.model_validate(s) for s in stocks],
-        documents=[DocumentOut.model_validate(d) for d in selected_docs],
-    )
+    return Response(content=cached.render(session_id), media_type="application/json")
 
 
 # ── POST /api/game/submit ────────────────────────────────────────────────────
 
 @router.post("/game/submit", response_model=GameSubmitResponse)
 async def submit_portfolio(req: GameSubmitRequest, db: AsyncSession = Depends(get_db)):
-    """Submit player allocations. Returns actual returns, score, retrospective."""
+    """Submit player allocations. Returns actual returns and score; the retrospective is generated in the background."""
 
     # Load session
     result = await db.execute(
@@ -118,16 +161,7 @@ async def submit_portfolio(req: GameSubmitRequest, db: AsyncSession = Depends(ge
 
     # Build return map
     return_map = {s.ticker: s.return_pct for s in stocks}
-    stock_dicts = [
-        {
-            "ticker": s.ticker,
-            "company_name": s.company_name,
-            "sector": s.sector,
-            "emoji": s.emoji,
-            "return_pct": s.return_pct,
-        }
-        for s in stocks
-    ]
+    stock_dicts = [_stock_dict(s) for s in stocks]
 
     # Calculate returns
     player_return = calculate_player_return(req.allocations, return_map)
@@ -136,78 +170,240 @@ async def submit_portfolio(req: GameSubmitRequest, db: AsyncSession = Depends(ge
     stock_results = compute_stock_results(req.allocations, stock_dicts)
 
     # Build causal chain mappings for documents served
-    causal_chains = []
-    if session.documents_served:
-        for doc_id in session.documents_served:
-            result = await db.execute(
-                select(DocumentStockRelevance)
-                .where(DocumentStockRelevance.doc_id == doc_id)
-            )
-            rels = result.scalars().all()
-
-            # Get doc details
-            doc_result = await db.execute(
-                select(Document).where(Document.id == doc_id)
-            )
-            doc = doc_result.scalar_one_or_none()
-
-            for rel in rels:
-                # Find the stock
-                stock_match = next(
-                    (s for s in stocks if s.id == rel.stock_id), None
-                )
-                if stock_match and doc:
-                    causal_chains.append(CausalChainMapping(
-                        doc_id=doc_id,
-                        doc_title=doc.title or doc.source_label,
-                        source_type=doc.source_type,
-                        source_label=doc.source_label,
-                        ticker=stock_match.ticker,
-                        relevance_type=rel.relevance_type,
-                        signal_direction=rel.signal_direction_for_ticker,
-                        causal_chain=rel.causal_chain_for_ticker or "",
-                    ))
-
-    # Generate retrospective (LLM or mock)
-    retro_data = await generate_retrospective(
-        stocks=stock_dicts,
-        allocations=req.allocations,
-        player_return=player_return,
-        optimal_return=optimal_return,
-        documents_served=[{"id": d} for d in (session.documents_served or [])],
-        causal_chains=[c.model_dump() for c in causal_chains],
-        round_title=round_config.title,
-        round_description=round_config.description,
+    causal_chains = await causal_chain_cache.for_documents(
+        db, session.round_id, session.documents_served or []
     )
 
-    retrospective = RetrospectiveOut(
-        summary=retro_data.get("summary", ""),
-        key_signals=retro_data.get("key_signals", []),
-        what_player_got_right=retro_data.get("what_player_got_right", []),
-        what_player_missed=retro_data.get("what_player_missed", []),
-        lessons=retro_data.get("lessons", []),
-        overall_grade=retro_data.get("overall_grade", "C"),
-        encouragement=retro_data.get("encouragement", ""),
+    results = GameResultsResponse(
+        session_id=session.id,
+        round_id=session.round_id,
+        round_title=round_config.title if round_config else "",
+        stock_results=[StockResult(**sr) for sr in stock_results],
+        player_return_pct=player_return,
+        optimal_return_pct=optimal_return,
+        score=score,
+        causal_chains=causal_chains,
+        retrospective_status="pending",
     )
 
-    # Save to session
+    # Save to session, with the results snapshot served by GET /results.
+    # A resubmit bumps the snapshot version, so a retrospective still being
+    # generated for the earlier allocations won't overwrite this one.
+    result = await db.execute(
+        select(ResultSnapshot.version).where(ResultSnapshot.session_id == session.id)
+    )
+    version = (result.scalar() or 0) + 1
     session.player_allocations = req.allocations
     session.player_return_pct = player_return
     session.optimal_return_pct = optimal_return
     session.score = score
-    session.retrospective = retro_data
+    session.retrospective = None
     session.completed_at = datetime.utcnow()
+    await db.merge(ResultSnapshot(
+        session_id=session.id,
+        version=version,
+        retrospective_claimed_at=datetime.utcnow(),   # queued below, in this worker
+        **_snapshot_values(results),
+    ))
     await db.commit()
 
+    # Generate retrospective (LLM or mock) in the background; the client
+    # fetches it from /api/game/{session_id}/retrospective
+    retro_status, retro_data = await _start_retrospective(
+        session, round_config, stock_dicts, causal_chains, results, version
+    )
+
     return GameSubmitResponse(
         session_id=session.id,
-        stock_results=[StockResult(**sr) for sr in stock_results],
+        stock_results=results.stock_results,
         player_return_pct=player_return,
         optimal_return_pct=optimal_return,
         score=score,
         causal_chains=causal_chains,
-        retrospective=retrospective,
+        retrospective=_retrospective_out(retro_data),
+        retrospective_status=retro_status,
+    )
+
+
+# A claim older than this is from a worker that died mid-job; it can be retaken
+RETROSPECTIVE_CLAIM_SECONDS = 300
+
+
+def _retrospective_key(session_id: str, version: Optional[int]) -> str:
+    return f"retrospective:{session_id}:{version or 0}"
+
+
+async def _snapshot_version(db: AsyncSession, session_id: str) -> Optional[int]:
+    result = await db.execute(
+        select(ResultSnapshot.version).where(ResultSnapshot.session_id == session_id)
+    )
+    return result.scalar()
+
+
+async def _claim_retrospective(db: AsyncSession, session_id: str, version: Optional[int]) -> bool:
+    """
+    Mark the session's retrospective as being generated, in the snapshot row,
+    so only one worker queues it. False if another worker holds a live claim.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(ResultSnapshot)
+        .where(
+            ResultSnapshot.session_id == session_id,
+            ResultSnapshot.version == version,
+            (ResultSnapshot.retrospective_claimed_at.is_(None))
+            | (ResultSnapshot.retrospective_claimed_at
+               < now - timedelta(seconds=RETROSPECTIVE_CLAIM_SECONDS)),
+        )
+        .values(retrospective_claimed_at=now)
+    )
+    if result.rowcount == 1:
+        await db.commit()
+        return True
+    # Sessions from before snapshots have no row to claim
+    existing = await db.scalar(
+        select(ResultSnapshot.session_id).where(ResultSnapshot.session_id == session_id)
+    )
+    return existing is None
+
+
+def _snapshot_values(results: GameResultsResponse) -> dict:
+    return dict(
+        body=results.model_dump_json().encode(),
+        complete=results.retrospective_status == "ready",
+        updated_at=datetime.utcnow(),
+    )
+
+
+def _retrospective_out(retro: Optional[dict]) -> Optional[RetrospectiveOut]:
+    if retro is None:
+        return None
+    return RetrospectiveOut(
+        summary=retro.get("summary", ""),
+        key_signals=retro.get("key_signals", []),
+        what_player_got_right=retro.get("what_player_got_right", []),
+        what_player_missed=retro.get("what_player_missed", []),
+        lessons=retro.get("lessons", []),
+        overall_grade=retro.get("overall_grade", "C"),
+        encouragement=retro.get("encouragement", ""),
+    )
+
+
+async def _start_retrospective(
+    session: GameSession,
+    round_config: RoundConfig,
+    stock_dicts: list[dict],
+    causal_chains: list[CausalChainMapping],
+    results: Optional[GameResultsResponse] = None,
+    version: Optional[int] = None,
+) -> tuple[str, Optional[dict]]:
+    """
+    Queue retrospective generation for a completed session. The job writes the
+    result to GameSession.retrospective and, given the session's `results`,
+    completes its results snapshot. Both writes are skipped if the snapshot is
+    no longer at `version` (the player resubmitted meanwhile). If the queue is
+    full the retrospective is generated inline. Returns (status, retrospective
+    or None).
+    """
+    session_id = session.id
+    kwargs = dict(
+        stocks=stock_dicts,
+        allocations=session.player_allocations or {},
+        player_return=session.player_return_pct or 0,
+        optimal_return=session.optimal_return_pct or 0,
+        documents_served=[{"id": d} for d in (session.documents_served or [])],
+        causal_chains=[c.model_dump() for c in causal_chains],
+        round_title=round_config.title,
+        round_description=round_config.description,
+        round_id=round_config.id,
+    )
+
+    async def run() -> dict:
+        retro_data = await generate_retrospective(**kwargs)
+        async with async_session() as db:
+            if version is not None:
+                values = {"updated_at": datetime.utcnow()}
+                if results is not None:
+                    values = _snapshot_values(results.model_copy(update={
+                        "retrospective": _retrospective_out(retro_data),
+                        "retrospective_status": "ready",
+                    }))
+                result = await db.execute(
+                    update(ResultSnapshot)
+                    .where(
+                        ResultSnapshot.session_id == session_id,
+                        ResultSnapshot.version == version,
+                    )
+                    .values(**values)
+                )
+                if result.rowcount != 1:
+                    # Superseded by a resubmit; its own job writes the retrospective
+                    return retro_data
+            await db.execute(
+                update(GameSession)
+                .where(GameSession.id == session_id)
+                .values(retrospective=retro_data)
+            )
+            await db.commit()
+        return retro_data
+
+    try:
+        await job_queue.submit(_retrospective_key(session_id, version), run)
+        return "pending", None
+    except asyncio.QueueFull:
+        return "ready", await run()
+
+
+async def _retrospective_state(
+    db: AsyncSession,
+    session: GameSession,
+    results: Optional[GameResultsResponse] = None,
+    version: Optional[int] = None,
+) -> tuple[str, Optional[dict]]:
+    """Current (status, retrospective) for a completed session at snapshot `version`."""
+    if session.retrospective:
+        return "ready", session.retrospective
+
+    job = job_queue.get(_retrospective_key(session.id, version))
+    if job is not None:
+        if job.status == DONE:
+            return "ready", job.result
+        if job.status == FAILED:
+            return "failed", None
+        return "pending", None
+
+    # No job in this process (restart, or submitted to another worker): requeue,
+    # unless a worker has already claimed it
+    if not await _claim_retrospective(db, session.id, version):
+        return "pending", None
+
+    result = await db.execute(
+        select(RoundConfig).where(RoundConfig.id == session.round_id)
+    )
+    round_config = result.scalar_one_or_none()
+    result = await db.execute(
+        select(StockReturn).where(StockReturn.round_id == session.round_id)
     )
+    stocks = list(result.scalars().all())
+    if not round_config or not stocks:
+        return "failed", None
+
+    causal_chains = await causal_chain_cache.for_documents(
+        db, session.round_id, session.documents_served or []
+    )
+    return await _start_retrospective(
+        session, round_config, [_stock_dict(s) for s in stocks], causal_chains, results, version
+    )
+
+
+def _stock_dict(s: StockReturn) -> dict:
+    return {
+        "ticker": s.ticker,
+        "company_name": s.company_name,
+        "sector": s.sector,
+        "emoji": s.emoji,
+        "return_pct": s.return_pct,
+    }
 
 
 # ── GET /api/game/{session_id}/results ────────────────────────────────────────
@@ -215,6 +411,16 @@ async def submit_portfolio(req: GameSubmitRequest, db: AsyncSession = Depends(ge
 @router.get("/game/{session_id}/results", response_model=GameResultsResponse)
 async def get_results(session_id: str, db: AsyncSession = Depends(get_db)):
     """Get results for a completed game session."""
+    # Fast path: the snapshot written on submit, served byte-for-byte
+    result = await db.execute(
+        select(ResultSnapshot.body, ResultSnapshot.complete, ResultSnapshot.version)
+        .where(ResultSnapshot.session_id == session_id)
+    )
+    snapshot = result.first()
+    version = snapshot.version if snapshot else None
+    if snapshot and snapshot.complete:
+        return Response(content=snapshot.body, media_type="application/json")
+
     result = await db.execute(
         select(GameSession).where(GameSession.id == session_id)
     )
@@ -224,7 +430,8 @@ async def get_results(session_id: str, db: AsyncSession = Depends(get_db)):
     if not session.completed_at:
         raise HTTPException(status_code=400, detail="Game session not yet completed")
 
-    # Reconstruct the response from saved data
+    # Retrospective still pending (or a session from before snapshots):
+    # reconstruct from saved data and refresh the snapshot
     result = await db.execute(
         select(RoundConfig).where(RoundConfig.id == session.round_id)
     )
@@ -235,33 +442,16 @@ async def get_results(session_id: str, db: AsyncSession = Depends(get_db)):
     )
     stocks = list(result.scalars().all())
 
-    stock_dicts = [
-        {
-            "ticker": s.ticker,
-            "company_name": s.company_name,
-            "sector": s.sector,
-            "emoji": s.emoji,
-            "return_pct": s.return_pct,
-        }
-        for s in stocks
-    ]
+    stock_dicts = [_stock_dict(s) for s in stocks]
 
     stock_results = compute_stock_results(
         session.player_allocations or {}, stock_dicts
     )
-
-    retro = session.retrospective or {}
-    retrospective = RetrospectiveOut(
-        summary=retro.get("summary", ""),
-        key_signals=retro.get("key_signals", []),
-        what_player_got_right=retro.get("what_player_got_right", []),
-        what_player_missed=retro.get("what_player_missed", []),
-        lessons=retro.get("lessons", []),
-        overall_grade=retro.get("overall_grade", "C"),
-        encouragement=retro.get("encouragement", ""),
+    causal_chains = await causal_chain_cache.for_documents(
+        db, session.round_id, session.documents_served or []
     )
 
-    return GameResultsResponse(
+    results = GameResultsResponse(
         session_id=session.id,
         round_id=session.round_id,
         round_title=round_config.title if round_config else "",
@@ -269,8 +459,99 @@ async def get_results(session_id: str, db: AsyncSession = Depends(get_db)):
         player_return_pct=session.player_return_pct or 0,
         optimal_return_pct=session.optimal_return_pct or 0,
         score=session.score or 0,
-        causal_chains=[],  # Would need to reconstruct from DB
-        retrospective=retrospective,
+        causal_chains=causal_chains,
+        retrospective_status="pending",
+    )
+    retro_status, retro_data = await _retrospective_state(db, session, results, version)
+    results.retrospective = _retrospective_out(retro_data)
+    results.retrospective_status = retro_status
+
+    # Conditional write: a resubmit that committed after `version` was read
+    # (or a job that completed this snapshot) must not be overwritten
+    if snapshot:
+        await db.execute(
+            update(ResultSnapshot)
+            .where(
+                ResultSnapshot.session_id == session.id,
+                ResultSnapshot.version == version,
+                ResultSnapshot.complete.is_not(True),
+            )
+            .values(**_snapshot_values(results))
+        )
+        await db.commit()
+    else:
+        db.add(ResultSnapshot(session_id=session.id, **_snapshot_values(results)))
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()   # a submit created the row meanwhile; it is newer
+
+    return results
+
+
+# ── GET /api/game/{session_id}/retrospective ──────────────────────────────────
+
+RETROSPECTIVE_STREAM_TIMEOUT = 120.0
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+@router.get("/game/{session_id}/retrospective", response_model=RetrospectiveStatusResponse)
+async def get_retrospective(
+    session_id: str,
+    request: Request,
+    stream: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrospective for a completed session. Poll until status is "ready", or
+    pass ?stream=true (or Accept: text/event-stream) to receive it as a
+    Server-Sent Event once generated.
+    """
+    result = await db.execute(
+        select(GameSession).where(GameSession.id == session_id)
+    )
+    session = result.scalar_one_or_none()
+    if not session:
+        raise HTTPException(status_code=404, detail="Game session not found")
+    if not session.completed_at:
+        raise HTTPException(status_code=400, detail="Game session not yet completed")
+
+    version = await _snapshot_version(db, session_id)
+    status, retro_data = await _retrospective_state(db, session, version=version)
+    snapshot = RetrospectiveStatusResponse(
+        session_id=session_id,
+        status=status,
+        retrospective=_retrospective_out(retro_data),
+    )
+
+    wants_stream = stream or "text/event-stream" in request.headers.get("accept", "")
+    if not wants_stream:
+        return snapshot
+
+    async def events():
+        current = snapshot
+        job = job_queue.get(_retrospective_key(session_id, version))
+        if current.status == "pending" and job is not None:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + RETROSPECTIVE_STREAM_TIMEOUT
+            while not await job.wait(SSE_KEEPALIVE_SECONDS):
+                if loop.time() >= deadline or await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+            if job.status == DONE:
+                current = RetrospectiveStatusResponse(
+                    session_id=session_id,
+                    status="ready",
+                    retrospective=_retrospective_out(job.result),
+                )
+            elif job.status == FAILED:
+                current = RetrospectiveStatusResponse(session_id=session_id, status="failed")
+        yield f"event: retrospective\ndata: {current.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
     )
 
 
@@ -291,8 +572,6 @@ async def get_article_count(db: AsyncSession = Depends(get_db)):
 @router.post("/game/{session_id}/graph-data")
 async def get_graph_data(session_id: str, db: AsyncSession = Depends(get_db)):
     """Get historical time series data for portfolio performance graph."""
-    from app.historical_data import get_portfolio_time_series, get_optimal_portfolio_time_series
-
     # Load game session
     result = await db.execute(
         select(GameSession).where(GameSession.id == session_id)
@@ -301,48 +580,32 @@ async def get_graph_data(session_id: str, db: AsyncSession = Depends(get_db)):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Load round config
-    result = await db.execute(
-        select(RoundConfig).where(RoundConfig.id == session.round_id)
-    )
-    round_config = result.scalar_one_or_none()
-    if not round_config:
-        raise HTTPException(status_code=404, detail="Round not found")
+    # Normalized round series are cached; only load the round on first use
+    series = round_series_cache.peek(session.round_id)
+    if series is None:
+        result = await db.execute(
+            select(RoundConfig).where(RoundConfig.id == session.round_id)
+        )
+        round_config = result.scalar_one_or_none()
+        if not round_config:
+            raise HTTPException(status_code=404, detail="Round not found")
 
-    # Load stocks
-    result = await db.execute(
-        select(StockReturn).where(StockReturn.round_id == session.round_id)
-    )
-    stocks = list(result.scalars().all())
+        result = await db.execute(
+            select(StockReturn).where(StockReturn.round_id == session.round_id)
+        )
+        stocks = list(result.scalars().all())
+        series = await run_blocking(round_series_cache.get, round_config, stocks, label="prices")
 
     # Get player allocations
     allocations = session.player_allocations or {}
 
-    # Build returns dict for optimal calculation
-    returns_dict = {stock.ticker: stock.return_pct for stock in stocks}
-
-    # Get time series data
-    player_series = get_portfolio_time_series(
-        allocations,
-        round_config.period_start,
-        round_config.period_end,
-        initial_balance=1000000.0
-    )
-
-    optimal_series = get_optimal_portfolio_time_series(
-        [stock.ticker for stock in stocks],
-        returns_dict,
-        round_config.period_start,
-        round_config.period_end,
-        initial_balance=1000000.0,
-        max_allocation_pct=50.0
-    )
-
     return {
-        "player_series": player_series,
-        "optimal_series": optimal_series,
-        "period_start": round_config.period_start.isoformat(),
-        "period_end": round_config.period_end.isoformat(),
+        "player_series": await run_blocking(
+            round_series_cache.player_series, series, allocations, label="prices"
+        ),
+        "optimal_series": series.optimal,
+        "period_start": series.period_start.isoformat(),
+        "period_end": series.period_end.isoformat(),
     }
 
 
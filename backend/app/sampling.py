@@ -0,0 +1,70 @@
+"""
+Bounded-memory selectors for streaming document candidates.
+
+Both keep O(k) state no matter how many candidates are offered, so the engine
+can consume a query result (or an in-memory pool) row by row.
+"""
+
+import heapq
+import itertools
+import random
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class WeightedReservoir(Generic[T]):
+    """
+    Weighted random sample of up to k items from a stream (Efraimidis–Spirakis
+    A-Res): each item gets key u^(1/w) and the k largest keys are kept.
+    """
+
+    def __init__(self, k: int, rng: random.Random | None = None):
+        self.k = k
+        self._rng = rng or random
+        self._heap: list[tuple[float, int, Any]] = []
+        self._seq = itertools.count()
+
+    def offer(self, item: T, weight: float):
+        if self.k <= 0 or weight <= 0:
+            return
+        key = self._rng.random() ** (1.0 / weight)
+        entry = (key, next(self._seq), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif key > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> list[T]:
+        """Sampled items, highest key first (i.e. in weighted-random order)."""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+
+class VarietyTopK(Generic[T]):
+    """
+    Top-k items by score within each source_type bucket. The union of the
+    buckets always contains the overall top k, plus the best of every type for
+    variety picks. Ties keep the item offered first.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._buckets: dict[str, list[tuple[float, int, Any]]] = {}
+        self._seq = itertools.count()
+
+    def offer(self, item: T, score: float, source_type: str):
+        if self.k <= 0:
+            return
+        bucket = self._buckets.setdefault(source_type, [])
+        # Min-heap on (score, -seq): the root is the weakest, latest-offered entry
+        entry = (score, -next(self._seq), item)
+        if len(bucket) < self.k:
+            heapq.heappush(bucket, entry)
+        elif entry[:2] > bucket[0][:2]:
+            heapq.heapreplace(bucket, entry)
+
+    def ranked(self) -> list[T]:
+        """All kept items, best score first."""
+        entries = [e for bucket in self._buckets.values() for e in bucket]
+        entries.sort(key=lambda e: (e[0], e[1]), reverse=True)
+        return [item for _, _, item in entries]
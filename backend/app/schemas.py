@@ -116,7 +116,14 @@ class GameSubmitResponse(BaseModel):
     optimal_return_pct: float
     score: int
     causal_chains: list[CausalChainMapping]
-    retrospective: RetrospectiveOut
+    retrospective: Optional[RetrospectiveOut] = None
+    retrospective_status: str = "ready"      # pending | ready | failed
+
+
+class RetrospectiveStatusResponse(BaseModel):
+    session_id: str
+    status: str                              # pending | ready | failed
+    retrospective: Optional[RetrospectiveOut] = None
 
 
 # ── Game Results (GET) ─────────────────────────────────────────────────────────
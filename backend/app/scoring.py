@@ -41,6 +41,28 @@ def calculate_optimal_return(
     return round(total_return, 2)
 
 
+def optimal_allocations(
+    stock_returns: dict[str, float],
+    max_per_stock: float = 50.0,
+) -> dict[str, float]:
+    """
+    Allocation percentages behind calculate_optimal_return: max_per_stock% to
+    the highest returners first until 100% is placed.
+    """
+    sorted_stocks = sorted(stock_returns.items(), key=lambda x: x[1], reverse=True)
+    remaining = 100.0
+    allocations = {}
+
+    for ticker, ret in sorted_stocks:
+        alloc = min(max_per_stock, remaining)
+        if alloc <= 0:
+            break
+        allocations[ticker] = alloc
+        remaining -= alloc
+
+    return allocations
+
+
 def calculate_score(
     player_return: float,
     optimal_return: float,
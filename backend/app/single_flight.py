@@ -0,0 +1,92 @@
+"""
+Single-flight TTL cache for expensive upstream lookups.
+
+Concurrent callers asking for the same key share one in-flight computation,
+and the result is then served from memory until it expires. When a round
+starts, 30 players asking for the same ticker cost one upstream call.
+Failures are not cached: every waiter of a failed flight sees the exception
+and the next caller starts a new one. `ttl_for` can shorten the TTL of
+individual results (e.g. a degraded fallback answer).
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlightCache(Generic[T]):
+    def __init__(
+        self,
+        ttl_seconds: float,
+        maxsize: int = 1024,
+        ttl_for: Optional[Callable[[T], Optional[float]]] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self.ttl_for = ttl_for      # value -> TTL override (None: ttl_seconds)
+        self._values: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _fresh(self, key: Hashable):
+        entry = self._values.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._values.move_to_end(key)
+            return entry
+        return None
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        entry = self._fresh(key)
+        if entry:
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._run(key, compute))
+            self._inflight[key] = task
+        # shield: one caller disconnecting must not cancel the shared flight
+        return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, compute: Callable[[], Awaitable[T]]) -> T:
+        try:
+            value = await compute()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.put(key, value, self.ttl_for(value) if self.ttl_for else None)
+        return value
+
+    def put(self, key: Hashable, value: T, ttl_seconds: Optional[float] = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._values[key] = (time.monotonic() + ttl, value)
+        self._values.move_to_end(key)
+        while len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+
+    def invalidate(self, key: Hashable = None):
+        if key is None:
+            self._values.clear()
+        else:
+            self._values.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._values),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
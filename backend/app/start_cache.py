@@ -0,0 +1,82 @@
+"""
+LRU cache of serialized /api/game/start payloads.
+
+Document selection is deterministic per (round, difficulty, seed), and each
+round only draws seeds from a bounded space (SELECTION_SEED_VARIANTS), so the
+response body minus the session id can be serialized once and reused. Keys
+also carry the candidate index version, so a corpus change never serves a
+stale document set.
+
+Only used with ROUND_PACKS_ENABLED=false. With packs on (the default), the
+pack pool already holds pre-selected document sets per (round, difficulty,
+seed, corpus version), and starts the pool can't serve run the engine
+uncached while it refills, so there is a single selection cache either way.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional
+
+from app.config import get_settings
+from app.schemas import GameStartResponse
+
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class CachedStart:
+    document_ids: tuple[str, ...]
+    body: bytes                     # GameStartResponse JSON without session_id
+
+    @classmethod
+    def from_response(cls, response: GameStartResponse) -> "CachedStart":
+        return cls(
+            document_ids=tuple(d.id for d in response.documents),
+            body=response.model_dump_json(exclude={"session_id"}).encode(),
+        )
+
+    def render(self, session_id: str) -> bytes:
+        """Full response body for one session."""
+        # body is a JSON object: splice session_id in as the first key
+        prefix = b'{"session_id":"' + session_id.encode() + b'"'
+        if self.body == b"{}":
+            return prefix + b"}"
+        return prefix + b"," + self.body[1:]
+
+
+class StartResponseCache:
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, CachedStart]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[CachedStart]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, entry: CachedStart):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": not settings.round_packs_enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+start_cache = StartResponseCache(maxsize=settings.start_cache_size)
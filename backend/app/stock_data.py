@@ -1,20 +1,22 @@
 """
-Stock data fetching service using yfinance for real historical returns.
+Stock data service: real historical returns from the local price store.
 """
 
 import uuid
 from datetime import date
-from typing import Dict, List, Optional
-import yfinance as yf
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.models import StockReturn, RoundConfig
+from app.price_store import price_provider
+from app.blocking import run_blocking
+from app.company_metadata import get_company_metadata
 
 
 def fetch_stock_return(ticker: str, start_date: date, end_date: date) -> Optional[float]:
     """
-    Fetch actual stock return percentage using yfinance.
+    Actual stock return percentage from the local price store.
 
     Args:
         ticker: Stock ticker symbol (e.g., 'NVDA', 'AAPL')
@@ -24,74 +26,10 @@ def fetch_stock_return(ticker: str, start_date: date, end_date: date) -> Optiona
     Returns:
         Return percentage (e.g., 190.5 for 190.5%), or None on error
     """
-    try:
-        stock = yf.Ticker(ticker)
-        hist = stock.history(start=start_date, end=end_date)
-
-        if hist.empty or len(hist) < 2:
-            print(f"  Warning: No price data for {ticker}")
-            return None
-
-        # Get first and last closing prices
-        start_price = hist.iloc[0]['Close']
-        end_price = hist.iloc[-1]['Close']
-
-        # Calculate percentage return
-        return_pct = ((end_price - start_price) / start_price) * 100
-
-        return round(return_pct, 2)
-
-    except Exception as e:
-        print(f"  Error fetching {ticker}: {e}")
-        return None
-
-
-def get_company_info(ticker: str) -> Dict[str, str]:
-    """
-    Fetch company metadata from yfinance.
-
-    Args:
-        ticker: Stock ticker symbol
-
-    Returns:
-        Dictionary with company_name, sector, and emoji
-    """
-    try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-
-        company_name = info.get('longName') or info.get('shortName') or ticker
-        sector = info.get('sector', 'Unknown')
-
-        # Simple emoji mapping by sector
-        sector_emojis = {
-            'Technology': '💻',
-            'Healthcare': '💊',
-            'Financial Services': '🏦',
-            'Energy': '⚡',
-            'Consumer Cyclical': '🛒',
-            'Consumer Defensive': '🛍️',
-            'Industrials': '🏭',
-            'Basic Materials': '⚒️',
-            'Real Estate': '🏠',
-            'Communication Services': '📡',
-            'Utilities': '💡',
-        }
-        emoji = sector_emojis.get(sector, '📊')
-
-        return {
-            'company_name': company_name,
-            'sector': sector,
-            'emoji': emoji
-        }
-
-    except Exception as e:
-        print(f"  Error fetching info for {ticker}: {e}")
-        return {
-            'company_name': ticker,
-            'sector': 'Unknown',
-            'emoji': '📊'
-        }
+    return_pct = price_provider.return_pct(ticker, start_date, end_date)
+    if return_pct is None:
+        print(f"  Warning: No price data for {ticker}")
+    return return_pct
 
 
 async def populate_stock_returns_for_round(
@@ -130,18 +68,21 @@ async def populate_stock_returns_for_round(
         print(f"Processing {ticker}...")
 
         # Fetch return
-        return_pct = fetch_stock_return(
+        return_pct = await run_blocking(
+            fetch_stock_return,
             ticker,
             round_config.period_start,
-            round_config.period_end
+            round_config.period_end,
+            label="prices",
         )
 
         if return_pct is None:
             print(f"  Skipping {ticker}: no data available")
             continue
 
-        # Fetch company info
-        info = get_company_info(ticker)
+        # Company info from the company_metadata table; the ticker joins the
+        # corpus with this round, before its StockReturn row is committed
+        info = await get_company_metadata(ticker, in_corpus=True)
 
         # Check if stock already exists for this round
         result = await db.execute(
@@ -215,10 +156,12 @@ async def update_all_stock_returns(db: AsyncSession) -> int:
             continue
 
         # Fetch new return
-        return_pct = fetch_stock_return(
+        return_pct = await run_blocking(
+            fetch_stock_return,
             stock.ticker,
             round_config.period_start,
-            round_config.period_end
+            round_config.period_end,
+            label="prices",
         )
 
         if return_pct is not None:
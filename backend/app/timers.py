@@ -0,0 +1,159 @@
+"""
+Hashed timing wheel for room deadlines (round timers, scoreboard pauses).
+
+One background task ticks every TIMER_TICK_SECONDS and fires the timers in
+the current slot, so thousands of rooms cost one task rather than one sleeping
+task per timer, and every deadline can be cancelled or moved:
+
+    room_timers.schedule((room_code, "round"), 30, lambda: end_round(room_code))
+    room_timers.cancel((room_code, "round"))
+    room_timers.cancel_group(room_code)         # room emptied
+
+Keys are (group, name) tuples; scheduling an existing key replaces it.
+Callbacks are coroutine functions and run as their own tasks. Deadlines are
+rounded to whole ticks, so a timer fires within one tick of its delay.
+"""
+
+import asyncio
+import math
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+TimerKey = Tuple[Hashable, str]
+
+
+@dataclass
+class _Timer:
+    key: TimerKey
+    slot: int
+    rounds: int                                  # full wheel turns left before it fires
+    callback: Callable[[], Awaitable[None]]
+
+
+class TimingWheel:
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._wheel: list[Dict[TimerKey, _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[TimerKey, _Timer] = {}
+        self._groups: Dict[Hashable, Set[TimerKey]] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()     # fired callbacks still running
+        self.fired = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.max_lag_ms = 0.0
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            now = loop.time()
+            self.max_lag_ms = max(self.max_lag_ms, (now - next_tick) * 1000)
+            # Catch up on ticks missed while the loop was busy
+            while next_tick <= now:
+                self._advance()
+                next_tick += self.tick
+
+    def _advance(self):
+        self._cursor = (self._cursor + 1) % self.slots
+        bucket = self._wheel[self._cursor]
+        due = [t for t in bucket.values() if t.rounds == 0]
+        for timer in bucket.values():
+            if timer.rounds:
+                timer.rounds -= 1
+        for timer in due:
+            self._remove(timer)
+            self.fired += 1
+            task = asyncio.create_task(self._fire(timer))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, timer: _Timer):
+        try:
+            await timer.callback()
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Timer {timer.key} failed: {e}")
+
+    def _remove(self, timer: _Timer):
+        self._wheel[timer.slot].pop(timer.key, None)
+        self._timers.pop(timer.key, None)
+        group = self._groups.get(timer.key[0])
+        if group is not None:
+            group.discard(timer.key)
+            if not group:
+                del self._groups[timer.key[0]]
+
+    def schedule(self, key: TimerKey, delay: float, callback: Callable[[], Awaitable[None]]):
+        """Run `callback()` after `delay` seconds, replacing any timer with this key."""
+        self._ensure_started()
+        self.cancel(key, count=False)
+        ticks = max(1, math.ceil(delay / self.tick))
+        slot = (self._cursor + ticks) % self.slots
+        timer = _Timer(key, slot, (ticks - 1) // self.slots, callback)
+        self._wheel[slot][key] = timer
+        self._timers[key] = timer
+        self._groups.setdefault(key[0], set()).add(key)
+
+    def reschedule(self, key: TimerKey, delay: float) -> bool:
+        """Move an existing timer to `delay` seconds from now."""
+        timer = self._timers.get(key)
+        if timer is None:
+            return False
+        self.schedule(key, delay, timer.callback)
+        return True
+
+    def cancel(self, key: TimerKey, count: bool = True) -> bool:
+        timer = self._timers.get(key)
+        if timer is None:
+            return False
+        self._remove(timer)
+        if count:
+            self.cancelled += 1
+        return True
+
+    def cancel_group(self, group: Hashable) -> int:
+        """Cancel every timer whose key starts with `group`."""
+        keys = list(self._groups.get(group, ()))
+        for key in keys:
+            self.cancel(key)
+        return len(keys)
+
+    def pending(self, group: Hashable = None) -> int:
+        if group is None:
+            return len(self._timers)
+        return len(self._groups.get(group, ()))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "tick_seconds": self.tick,
+            "slots": self.slots,
+            "pending": len(self._timers),
+            "pending_by_name": dict(Counter(name for _, name in self._timers)),
+            "groups": len(self._groups),
+            "running_callbacks": len(self._running),
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "max_lag_ms": round(self.max_lag_ms, 2),
+        }
+
+
+room_timers = TimingWheel(tick=settings.timer_tick_seconds, slots=settings.timer_wheel_slots)
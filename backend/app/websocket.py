@@ -1,39 +1,228 @@
 """
 WebSocket connection manager for multiplayer rooms.
+
+Each connection has a bounded outbound queue (WS_SEND_QUEUE_SIZE) drained by
+its own writer task, so broadcast_to_room only enqueues and returns: one slow
+client can't hold up round_start / round_end for the rest of the room or stall
+the round timer. A connection whose queue overflows, or whose send doesn't
+finish within WS_SEND_TIMEOUT_SECONDS, is evicted (closed with 1008). Eviction
+only drops the socket: the player keeps their seat, the client reconnects, and
+the endpoint resyncs it with a room_state message.
+
+Each broadcast is encoded to a JSON text frame once and the same frame is
+queued for every connection, instead of send_json re-encoding the message per
+socket. The encoder is WS_JSON_ENCODER: "json" (stdlib), "orjson", or "auto"
+(orjson when installed).
+
+With several workers a room's sockets can live in different processes, so
+the manager singleton also publishes each frame on the room bus
+(app/room_bus.py) and delivers frames published by other workers.
+
+Fan-out latency (broadcast → frame written) is tracked per room in stats().
 """
 
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Optional
+
 from fastapi import WebSocket
-from typing import Dict, Set
 
+from app.blocking import percentile
+from app.config import get_settings
+from app.room_bus import RoomBus, room_bus
 
-class ConnectionManager:
+settings = get_settings()
+
+TIMING_WINDOW = 500   # recent delivery samples kept per room
+ROOM_STATS_KEPT = 256 # rooms whose stats are kept, most recently active first
+CLOSE_TIMEOUT = 1.0
+
+
+def _encode_json(message: dict) -> str:
+    # Same output as Starlette's send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+def _encode_orjson(message: dict) -> str:
+    import orjson
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+ENCODERS: Dict[str, Callable[[dict], str]] = {
+    "json": _encode_json,
+    "orjson": _encode_orjson,
+}
+
+
+def resolve_encoder(name: str = "auto") -> str:
+    """Encoder name to use; "auto" prefers orjson when it is installed."""
+    if name == "auto":
+        try:
+            import orjson  # noqa: F401
+            return "orjson"
+        except ImportError:
+            return "json"
+    return name
+
+
+class Connection:
+    def __init__(self, manager: "ConnectionManager", websocket: WebSocket, room_code: str):
+        self.manager = manager
+        self.websocket = websocket
+        self.room_code = room_code
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.evicted = False
+
+    def start(self):
+        self.writer = asyncio.create_task(self._write())
+
+    def offer(self, frame: str, sent_at: float) -> bool:
+        """Queue an encoded frame for this connection; False if the queue is full."""
+        try:
+            self.queue.put_nowait((frame, sent_at))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _write(self):
+        while True:
+            frame, sent_at = await self.queue.get()
+            try:
+                # asyncio.timeout, not wait_for: no extra task per send, and a
+                # stop() landing as the send completes isn't swallowed
+                async with asyncio.timeout(settings.ws_send_timeout_seconds):
+                    await self.websocket.send_text(frame)
+            except asyncio.TimeoutError:
+                self.manager.evict(self, "timeout")
+                return
+            except Exception:
+                self.manager.evict(self, "error")
+                return
+            room_stats = self.manager.room_stats.get(self.room_code)
+            if room_stats is not None:
+                room_stats.delivered((time.perf_counter() - sent_at) * 1000)
+
+    def stop(self):
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+
+
+class RoomStats:
     def __init__(self):
-        # room_code -> set of WebSocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self.broadcasts = 0
+        self.frames = 0
+        self.max_queue_depth = 0
+        self.evictions: Dict[str, int] = {}
+        self.delivery_ms: Deque[float] = deque(maxlen=TIMING_WINDOW)
+
+    def delivered(self, ms: float):
+        self.frames += 1
+        self.delivery_ms.append(ms)
+
+    def summary(self) -> dict:
+        return {
+            "broadcasts": self.broadcasts,
+            "frames": self.frames,
+            "max_queue_depth": self.max_queue_depth,
+            "evictions": dict(self.evictions),
+            "delivery_ms_p50": round(percentile(self.delivery_ms, 50), 2),
+            "delivery_ms_p95": round(percentile(self.delivery_ms, 95), 2),
+            "delivery_ms_max": round(max(self.delivery_ms, default=0.0), 2),
+        }
+
+
+class ConnectionManager:
+    def __init__(self, encoder: Optional[str] = None, bus: Optional[RoomBus] = None):
+        self.encoder = resolve_encoder(encoder or settings.ws_json_encoder)
+        self.encode = ENCODERS[self.encoder]
+        self.bus = bus
+        if bus is not None:
+            bus.on_message(self.deliver_local)
+        # room_code -> {websocket: Connection}
+        self.active_connections: Dict[str, Dict[WebSocket, Connection]] = {}
+        # Outlives the room's connections (an emptied room's evictions still
+        # show in /metrics); least recently active rooms are dropped first
+        self.room_stats: "OrderedDict[str, RoomStats]" = OrderedDict()
 
-    async def connect(self, websocket: WebSocket, room_code: str):
+    def stats_for(self, room_code: str) -> RoomStats:
+        room_stats = self.room_stats.get(room_code)
+        if room_stats is None:
+            room_stats = self.room_stats[room_code] = RoomStats()
+            while len(self.room_stats) > ROOM_STATS_KEPT:
+                self.room_stats.popitem(last=False)
+        else:
+            self.room_stats.move_to_end(room_code)
+        return room_stats
+
+    async def connect(self, websocket: WebSocket, room_code: str) -> Connection:
         await websocket.accept()
-        if room_code not in self.active_connections:
-            self.active_connections[room_code] = set()
-        self.active_connections[room_code].add(websocket)
+        connection = Connection(self, websocket, room_code)
+        self.active_connections.setdefault(room_code, {})[websocket] = connection
+        connection.start()
+        return connection
 
     def disconnect(self, websocket: WebSocket, room_code: str):
-        if room_code in self.active_connections:
-            self.active_connections[room_code].discard(websocket)
-            if not self.active_connections[room_code]:
-                del self.active_connections[room_code]
+        connections = self.active_connections.get(room_code)
+        if connections is None:
+            return
+        connection = connections.pop(websocket, None)
+        if connection is not None:
+            connection.stop()
+        if not connections:
+            del self.active_connections[room_code]
+
+    def evict(self, connection: Connection, reason: str):
+        """Drop a slow / dead consumer and close its socket in the background."""
+        if connection.websocket not in self.active_connections.get(connection.room_code, {}):
+            return
+        room_stats = self.stats_for(connection.room_code)
+        room_stats.evictions[reason] = room_stats.evictions.get(reason, 0) + 1
+        connection.evicted = True
+        self.disconnect(connection.websocket, connection.room_code)
+        asyncio.create_task(self._close(connection.websocket))
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=1008), CLOSE_TIMEOUT)
+        except Exception:
+            pass
 
     async def broadcast_to_room(self, room_code: str, message: dict):
-        if room_code not in self.active_connections:
+        """Queue `message` for every connection in the room; doesn't wait for sends."""
+        frame = self.encode(message)
+        self.deliver_local(room_code, frame)
+        if self.bus is not None:
+            self.bus.publish(room_code, frame)
+
+    def send_to(self, connection: Connection, message: dict):
+        """Queue `message` for one connection only."""
+        if not connection.offer(self.encode(message), time.perf_counter()):
+            self.evict(connection, "overflow")
+
+    def deliver_local(self, room_code: str, frame: str):
+        """Queue an encoded frame for this worker's connections in the room."""
+        connections = self.active_connections.get(room_code)
+        if not connections:
             return
-        disconnected = []
-        for ws in self.active_connections[room_code]:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                disconnected.append(ws)
-        for ws in disconnected:
-            self.disconnect(ws, room_code)
+        room_stats = self.stats_for(room_code)
+        room_stats.broadcasts += 1
+        sent_at = time.perf_counter()
+        for connection in list(connections.values()):
+            if not connection.offer(frame, sent_at):
+                self.evict(connection, "overflow")
+                continue
+            room_stats.max_queue_depth = max(room_stats.max_queue_depth, connection.queue.qsize())
+
+    def stats(self) -> dict:
+        return {
+            "encoder": self.encoder,
+            "rooms": len(self.active_connections),
+            "connections": sum(len(c) for c in self.active_connections.values()),
+            "per_room": {code: s.summary() for code, s in self.room_stats.items()},
+        }
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(bus=room_bus)
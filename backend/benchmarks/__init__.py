@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the FinSight backend.
+
+Run from backend/, e.g. `python -m benchmarks.selection_engine --help`.
+"""
@@ -0,0 +1,184 @@
+"""
+Benchmark for historical_data.get_portfolio_time_series.
+
+Compares the vectorized implementation (aligned close matrix, forward-fill,
+normalize, one matvec) with the previous per-date × per-ticker pandas loop,
+on synthetic random-walk prices with gaps. Both read from the same in-memory
+provider, so only the series computation is timed. The two outputs are
+checked for equality before timing.
+
+Usage (from backend/):
+    python -m benchmarks.portfolio_series
+    python -m benchmarks.portfolio_series --shapes 10x250,500x1260 --output series_bench.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app import historical_data
+from app.price_store import PriceProvider
+from benchmarks.selection_engine import latency_summary
+
+
+DEFAULT_SHAPES = [(10, 250), (500, 5 * 252)]
+START = date(2019, 1, 1)
+GAP_RATE = 0.02          # share of missing prints per ticker
+
+
+class SyntheticPriceProvider(PriceProvider):
+    """Random-walk closes on business days, with a few missing prints per ticker."""
+
+    def __init__(self, n_tickers: int, n_days: int, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        days = np.busday_offset(np.datetime64(START, "D"), np.arange(n_days), roll="forward")
+        self.tickers = [f"T{i:04d}" for i in range(n_tickers)]
+        closes = 100 * np.cumprod(1 + rng.normal(0, 0.02, (n_days, n_tickers)), axis=0)
+        closes[rng.random(closes.shape) < GAP_RATE] = np.nan
+        # Some tickers list late, so their series starts mid-range
+        for j in rng.choice(n_tickers, size=max(1, n_tickers // 10), replace=False):
+            closes[: rng.integers(1, max(2, n_days // 4)), j] = np.nan
+        self.end = (days[-1] + 1).astype(date)
+        self._series = {
+            t: [
+                {"date": str(d), "close": float(v)}
+                for d, v in zip(days, closes[:, j]) if not np.isnan(v)
+            ]
+            for j, t in enumerate(self.tickers)
+        }
+
+    def daily_closes(self, ticker: str, start: date, end: date) -> List[Dict]:
+        lo, hi = str(start), str(end)
+        return [p for p in self._series.get(ticker, []) if lo <= p["date"] < hi]
+
+
+def legacy_portfolio_time_series(
+    allocations: Dict[str, float],
+    start_date: date,
+    end_date: date,
+    initial_balance: float = 1000000.0,
+) -> List[Dict]:
+    """The pre-vectorization implementation, kept here as the baseline."""
+    ticker_data = {}
+    for ticker in allocations.keys():
+        prices = historical_data.get_daily_prices(ticker, start_date, end_date)
+        if prices:
+            ticker_data[ticker] = prices
+    if not ticker_data:
+        return []
+
+    dates_sorted = sorted({p['date'] for prices in ticker_data.values() for p in prices})
+    dfs = {}
+    for ticker, prices in ticker_data.items():
+        df = pd.DataFrame(prices)
+        df['date'] = pd.to_datetime(df['date'])
+        dfs[ticker] = df.set_index('date')
+
+    result = []
+    for date_str in dates_sorted:
+        date_dt = pd.to_datetime(date_str)
+        portfolio_value = 0.0
+        valid_data = True
+        for ticker, allocation_pct in allocations.items():
+            if ticker not in dfs:
+                valid_data = False
+                break
+            df = dfs[ticker]
+            if date_dt in df.index:
+                price = df.loc[date_dt, 'close']
+            else:
+                earlier_prices = df[df.index <= date_dt]
+                if earlier_prices.empty:
+                    valid_data = False
+                    break
+                price = earlier_prices.iloc[-1]['close']
+            initial_price = df.loc[df.index[0], 'close']
+            stock_return = (price - initial_price) / initial_price
+            portfolio_value += initial_balance * (allocation_pct / 100.0) * (1 + stock_return)
+        if valid_data:
+            result.append({'date': date_str, 'portfolio_value': round(portfolio_value, 2)})
+    return result
+
+
+def time_calls(fn, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(shapes, iterations: int, legacy_iterations: int) -> dict:
+    results = []
+    for n_tickers, n_days in shapes:
+        provider = SyntheticPriceProvider(n_tickers, n_days)
+        allocations = {t: 100.0 / n_tickers for t in provider.tickers}
+        historical_data.price_provider = provider
+
+        def vectorized():
+            return historical_data.get_portfolio_time_series(allocations, START, provider.end)
+
+        def legacy():
+            return legacy_portfolio_time_series(allocations, START, provider.end)
+
+        new_series, old_series = vectorized(), legacy()
+        matches = len(new_series) == len(old_series) and all(
+            a["date"] == b["date"] and abs(a["portfolio_value"] - b["portfolio_value"]) <= 0.01
+            for a, b in zip(new_series, old_series)
+        )
+
+        new_ms = time_calls(vectorized, iterations)
+        old_ms = time_calls(legacy, legacy_iterations)
+        speedup = statistics.median(old_ms) / statistics.median(new_ms)
+        print(f"{n_tickers:>4} tickers × {n_days:>4} days: "
+              f"legacy p50={statistics.median(old_ms):.1f}ms  "
+              f"vectorized p50={statistics.median(new_ms):.2f}ms  "
+              f"({speedup:.0f}× faster, outputs match={matches})")
+        results.append({
+            "tickers": n_tickers,
+            "days": n_days,
+            "rows": len(new_series),
+            "outputs_match": matches,
+            "legacy_ms": latency_summary(old_ms),
+            "vectorized_ms": latency_summary(new_ms),
+            "speedup_p50": round(speedup, 1),
+        })
+    return {
+        "benchmark": "portfolio_series",
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio time series benchmark")
+    parser.add_argument(
+        "--shapes",
+        type=str,
+        default=",".join(f"{t}x{d}" for t, d in DEFAULT_SHAPES),
+        help="Comma-separated TICKERSxDAYS shapes"
+    )
+    parser.add_argument("--iterations", type=int, default=50, help="Timed vectorized calls per shape")
+    parser.add_argument("--legacy-iterations", type=int, default=3, help="Timed legacy calls per shape")
+    parser.add_argument("--output", type=str, default="portfolio_series_bench.json", help="JSON report path")
+    args = parser.parse_args()
+
+    shapes = [tuple(int(x) for x in s.split("x")) for s in args.shapes.split(",") if s.strip()]
+    report = run(shapes, args.iterations, args.legacy_iterations)
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Scaling benchmark for the document selection engine.
+
+Builds synthetic corpora in a temporary SQLite database and measures
+select_documents_for_round on both selection paths:
+
+- db:    ranked SQL queries per call (CANDIDATE_INDEX_ENABLED=false)
+- index: in-memory candidate index (build cost reported separately)
+
+For each corpus size it records p50/p95/p99 latency, SQL statements per call
+and peak Python memory, and writes a JSON report. Pass --compare with an
+earlier report to print the deltas.
+
+Usage (from backend/):
+    python -m benchmarks.selection_engine --sizes 1000,10000 --output bench.json
+    python -m benchmarks.selection_engine --compare bench.json --output bench2.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import sqlalchemy
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.database import count_queries
+from app.models import RoundConfig, StockReturn
+from app.engine import _select_from_db, select_from_index
+from app.candidate_index import build_round_candidates
+from benchmarks.synthetic_corpus import build_corpus
+
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+MODES = ["db", "index"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def latency_summary(samples_ms: list[float]) -> dict:
+    return {
+        "p50": round(percentile(samples_ms, 50), 3),
+        "p95": round(percentile(samples_ms, 95), 3),
+        "p99": round(percentile(samples_ms, 99), 3),
+        "mean": round(statistics.fmean(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+async def _load_rounds(session_factory) -> list[tuple[RoundConfig, list[StockReturn]]]:
+    async with session_factory() as db:
+        result = await db.execute(select(RoundConfig))
+        rounds = list(result.scalars().all())
+        loaded = []
+        for round_config in rounds:
+            result = await db.execute(
+                select(StockReturn).where(StockReturn.round_id == round_config.id)
+            )
+            loaded.append((round_config, list(result.scalars().all())))
+        return loaded
+
+
+async def bench_db(session_factory, rounds, iterations: int, difficulty: str) -> dict:
+    latencies = []
+    queries = []
+
+    async def one_call(round_config, stocks):
+        async with session_factory() as db:
+            with count_queries() as counter:
+                await _select_from_db(db, round_config, stocks, difficulty=difficulty)
+            return counter.count
+
+    # Warm-up (connection pool, SQLite page cache)
+    for round_config, stocks in rounds:
+        await one_call(round_config, stocks)
+
+    for i in range(iterations):
+        round_config, stocks = rounds[i % len(rounds)]
+        start = time.perf_counter()
+        queries.append(await one_call(round_config, stocks))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    await one_call(*rounds[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "latency_ms": latency_summary(latencies),
+        "queries_per_call": statistics.fmean(queries),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+async def bench_index(session_factory, rounds, iterations: int, difficulty: str) -> dict:
+    tracemalloc.start()
+    build_start = time.perf_counter()
+    indexed = {}
+    async with session_factory() as db:
+        with count_queries() as build_counter:
+            for round_config, _ in rounds:
+                indexed[round_config.id] = await build_round_candidates(db, round_config)
+    build_ms = (time.perf_counter() - build_start) * 1000
+    _, build_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    with count_queries() as counter:
+        for i in range(iterations):
+            round_config, stocks = rounds[i % len(rounds)]
+            start = time.perf_counter()
+            select_from_index(indexed[round_config.id], stocks, difficulty=difficulty)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    select_from_index(indexed[rounds[0][0].id], rounds[0][1], difficulty=difficulty)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "latency_ms": latency_summary(latencies),
+        "queries_per_call": counter.count / max(iterations, 1),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "index_build_ms": round(build_ms, 1),
+        "index_build_queries": build_counter.count,
+        "index_build_peak_memory_kb": round(build_peak / 1024, 1),
+        "indexed_docs": sum(len(c.linked) for c in indexed.values()),
+    }
+
+
+async def run(sizes: list[int], modes: list[str], iterations: int, difficulty: str, workdir: Path) -> dict:
+    results = []
+    for size in sizes:
+        db_path = workdir / f"bench_{size}.db"
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        build_start = time.perf_counter()
+        corpus = await build_corpus(engine, size)
+        print(f"corpus {size:>9,} docs / {corpus.relevance_links:,} links built in "
+              f"{time.perf_counter() - build_start:.1f}s")
+
+        rounds = await _load_rounds(session_factory)
+        for mode in modes:
+            random.seed(0)
+            bench = bench_db if mode == "db" else bench_index
+            stats = await bench(session_factory, rounds, iterations, difficulty)
+            lat = stats["latency_ms"]
+            print(f"  {mode:<5} p50={lat['p50']:.2f}ms p95={lat['p95']:.2f}ms "
+                  f"p99={lat['p99']:.2f}ms queries={stats['queries_per_call']:.1f} "
+                  f"peak={stats['peak_memory_kb']:.0f}KB")
+            results.append({
+                "corpus_docs": size,
+                "relevance_links": corpus.relevance_links,
+                "mode": mode,
+                **stats,
+            })
+
+        await engine.dispose()
+        db_path.unlink(missing_ok=True)
+
+    return {
+        "benchmark": "selection_engine",
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "sqlite": sqlite3.sqlite_version,
+        "iterations": iterations,
+        "difficulty": difficulty,
+        "results": results,
+    }
+
+
+def compare(previous: dict, current: dict):
+    """Print latency / query deltas against an earlier report."""
+    before = {(r["corpus_docs"], r["mode"]): r for r in previous.get("results", [])}
+    print("\nChange vs previous report:")
+    for r in current["results"]:
+        old = before.get((r["corpus_docs"], r["mode"]))
+        if not old:
+            continue
+        parts = []
+        for key in ("p50", "p95", "p99"):
+            prev, cur = old["latency_ms"][key], r["latency_ms"][key]
+            delta = ((cur - prev) / prev * 100) if prev else 0.0
+            parts.append(f"{key} {prev:.2f}→{cur:.2f}ms ({delta:+.0f}%)")
+        parts.append(f"queries {old['queries_per_call']:.1f}→{r['queries_per_call']:.1f}")
+        print(f"  {r['corpus_docs']:>9,} {r['mode']:<5} " + ", ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Selection engine scaling benchmark")
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma-separated corpus sizes (documents)"
+    )
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help="Comma-separated: db,index")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per size and mode")
+    parser.add_argument("--difficulty", type=str, default="medium", choices=["easy", "medium", "hard"])
+    parser.add_argument("--output", type=str, default="selection_engine_bench.json", help="JSON report path")
+    parser.add_argument("--compare", type=str, default="", help="Earlier JSON report to diff against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    modes = [m.strip() for m in args.modes.split(",") if m.strip() in MODES]
+
+    with tempfile.TemporaryDirectory(prefix="finsight_bench_") as tmp:
+        report = asyncio.run(run(sizes, modes, args.iterations, args.difficulty, Path(tmp)))
+
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
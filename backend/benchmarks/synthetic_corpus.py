@@ -0,0 +1,136 @@
+"""
+Synthetic corpus generator for the selection engine benchmarks.
+
+Builds RoundConfig / StockReturn / Document / DocumentStockRelevance rows that
+look like a scraped corpus: publish dates spread over several years (so each
+round's 90-day lookback window holds a small slice), 1-3 relevance links per
+document, a mix of source types, difficulties and signal directions.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import Base
+from app.models import RoundConfig, StockReturn, Document, DocumentStockRelevance
+
+
+CORPUS_START = date(2019, 1, 1)
+CORPUS_DAYS = 6 * 365
+INSERT_BATCH = 5_000
+
+SOURCE_TYPES = ["article", "report", "statistic", "earnings_call", "reddit", "tweet"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+DIRECTIONS = ["bullish", "bearish", "mixed"]
+RELEVANCE_TYPES = ["direct", "direct", "sector", "macro"]
+WORDS = (
+    "revenue guidance margin demand supply rates inflation earnings outlook "
+    "growth downgrade upgrade capex buyback layoffs cloud chips energy credit"
+).split()
+
+
+@dataclass
+class SyntheticCorpus:
+    round_ids: list[str]
+    documents: int
+    relevance_links: int
+
+
+async def build_corpus(
+    engine: AsyncEngine,
+    n_docs: int,
+    n_rounds: int = 6,
+    stocks_per_round: int = 6,
+    seed: int = 0,
+) -> SyntheticCorpus:
+    """Create the schema on `engine` and bulk-insert a synthetic corpus."""
+    rng = random.Random(seed)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    rounds = []
+    stocks = []
+    for r in range(n_rounds):
+        period_start = CORPUS_START + timedelta(days=180 + r * (CORPUS_DAYS - 360) // max(n_rounds, 1))
+        round_id = f"synthetic_round_{r}"
+        rounds.append({
+            "id": round_id,
+            "title": f"Synthetic Round {r}",
+            "period_start": period_start,
+            "period_end": period_start + timedelta(days=180),
+            "description": "Synthetic benchmark round.",
+            "difficulty": DIFFICULTIES[r % len(DIFFICULTIES)],
+            "display_order": r,
+        })
+        for s in range(stocks_per_round):
+            stocks.append({
+                "id": f"{round_id}_s{s}",
+                "ticker": f"S{r}{s:02d}",
+                "company_name": f"Synthetic Co {r}-{s}",
+                "sector": f"Sector {s % 3}",
+                "emoji": "📊",
+                "round_id": round_id,
+                "return_pct": rng.choice([-1, 1]) * rng.uniform(0, 60),
+                "story": "",
+            })
+
+    docs_batch: list[dict] = []
+    links_batch: list[dict] = []
+    link_count = 0
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(RoundConfig.__table__), rounds)
+        await conn.execute(insert(StockReturn.__table__), stocks)
+
+        for i in range(n_docs):
+            doc_id = f"syn_{i:07d}"
+            direction = rng.choices(DIRECTIONS, weights=[4, 4, 2])[0]
+            docs_batch.append({
+                "id": doc_id,
+                "source_type": rng.choice(SOURCE_TYPES),
+                "raw_text": " ".join(rng.choices(WORDS, k=80)),
+                "title": " ".join(rng.choices(WORDS, k=8)).capitalize(),
+                "publish_date": CORPUS_START + timedelta(days=rng.randrange(CORPUS_DAYS)),
+                "source_label": "Synthetic Wire",
+                "url": "",
+                "image_url": "",
+                "tickers_referenced": [],
+                "sectors_referenced": [],
+                "signal_direction": direction,
+                "signal_strength": rng.randint(1, 5),
+                "signal_reasoning": "",
+                "causal_chain": "",
+                "keywords": [],
+                "difficulty": rng.choice(DIFFICULTIES),
+            })
+            for stock in rng.sample(stocks, rng.randint(1, 3)):
+                links_batch.append({
+                    "id": f"{doc_id}_{stock['id']}",
+                    "doc_id": doc_id,
+                    "stock_id": stock["id"],
+                    "relevance_type": rng.choice(RELEVANCE_TYPES),
+                    "signal_direction_for_ticker": direction if rng.random() < 0.8 else rng.choice(DIRECTIONS),
+                    "causal_chain_for_ticker": "synthetic -> chain",
+                })
+
+            if len(docs_batch) >= INSERT_BATCH:
+                await conn.execute(insert(Document.__table__), docs_batch)
+                await conn.execute(insert(DocumentStockRelevance.__table__), links_batch)
+                link_count += len(links_batch)
+                docs_batch, links_batch = [], []
+
+        if docs_batch:
+            await conn.execute(insert(Document.__table__), docs_batch)
+            await conn.execute(insert(DocumentStockRelevance.__table__), links_batch)
+            link_count += len(links_batch)
+
+    return SyntheticCorpus(
+        round_ids=[r["id"] for r in rounds],
+        documents=n_docs,
+        relevance_links=link_count,
+    )
@@ -0,0 +1,182 @@
+"""
+Benchmark for multiplayer WebSocket fan-out (app/websocket.py).
+
+Broadcasts a round_end message to a room of 8 / 100 / 1000 sockets and times
+it until every socket has its frame, comparing:
+
+- legacy: the previous sequential loop, one send_json (one JSON encode) per socket
+- serialize-once: ConnectionManager, one encode per broadcast, with each
+  available encoder (json, orjson if installed)
+
+Sockets mimic Starlette's WebSocket (send_json encodes with json.dumps, then
+sends text) over a no-op transport, so only encoding and fan-out are timed.
+
+Usage (from backend/):
+    python -m benchmarks.ws_fanout
+    python -m benchmarks.ws_fanout --sockets 8,100,1000 --iterations 200 --output ws_bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import time
+from pathlib import Path
+
+from app.websocket import ConnectionManager, ENCODERS
+from benchmarks.selection_engine import latency_summary
+
+
+DEFAULT_SOCKETS = [8, 100, 1000]
+MAX_PLAYERS = 100        # sockets beyond this are spectators
+
+
+class FakeWebSocket:
+    def __init__(self, room: "Delivery"):
+        self.room = room
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send(self, message: dict):
+        self.room.received()
+
+    async def send_text(self, data: str):
+        await self.send({"type": "websocket.send", "text": data})
+
+    async def send_json(self, data: dict):
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        await self.send({"type": "websocket.send", "text": text})
+
+
+class Delivery:
+    """Counts frames and resolves once every socket has one."""
+
+    def __init__(self, sockets: int):
+        self.sockets = sockets
+        self.count = 0
+        self.done: asyncio.Future = None
+
+    def expect(self):
+        self.count = 0
+        self.done = asyncio.get_running_loop().create_future()
+
+    def received(self):
+        self.count += 1
+        if self.count == self.sockets and not self.done.done():
+            self.done.set_result(None)
+
+
+async def legacy_broadcast(sockets: list, message: dict):
+    """The pre-queue broadcast_to_room loop, kept here as the baseline."""
+    for ws in sockets:
+        try:
+            await ws.send_json(message)
+        except Exception:
+            pass
+
+
+def round_end_message(players: int) -> dict:
+    return {
+        "type": "round_end",
+        "payload": {
+            "round": 3,
+            "leaderboard": [
+                {
+                    "player_id": f"00000000-0000-0000-0000-{i:012d}",
+                    "display_name": f"Player {i}",
+                    "round_score": 1000 - i,
+                    "round_return": round(12.5 - i * 0.37, 2),
+                    "total_score": 3000 - 3 * i,
+                    "rank": i + 1,
+                }
+                for i in range(players)
+            ],
+        },
+    }
+
+
+async def time_broadcasts(broadcast, delivery: Delivery, iterations: int) -> tuple[list[float], list[float]]:
+    """(time until broadcast returns, time until every socket has the frame) in ms."""
+    returned, delivered = [], []
+    for _ in range(iterations):
+        delivery.expect()
+        start = time.perf_counter()
+        await broadcast()
+        returned.append((time.perf_counter() - start) * 1000)
+        await delivery.done
+        delivered.append((time.perf_counter() - start) * 1000)
+    return returned, delivered
+
+
+async def run_size(n_sockets: int, iterations: int) -> dict:
+    message = round_end_message(min(n_sockets, MAX_PLAYERS))
+    delivery = Delivery(n_sockets)
+    sockets = [FakeWebSocket(delivery) for _ in range(n_sockets)]
+
+    variants = {}
+    returned, delivered = await time_broadcasts(
+        lambda: legacy_broadcast(sockets, message), delivery, iterations
+    )
+    variants["legacy"] = {"returned_ms": latency_summary(returned), "delivered_ms": latency_summary(delivered)}
+
+    for name in ENCODERS:
+        try:
+            manager = ConnectionManager(encoder=name)
+            manager.encode(message)
+        except ImportError:
+            continue
+        for ws in sockets:
+            await manager.connect(ws, "BENCH")
+        returned, delivered = await time_broadcasts(
+            lambda: manager.broadcast_to_room("BENCH", message), delivery, iterations
+        )
+        writers = [c.writer for c in manager.active_connections["BENCH"].values()]
+        for ws in sockets:
+            manager.disconnect(ws, "BENCH")
+        await asyncio.gather(*writers, return_exceptions=True)
+        variants[f"serialize_once_{name}"] = {
+            "returned_ms": latency_summary(returned),
+            "delivered_ms": latency_summary(delivered),
+        }
+
+    base = variants["legacy"]["delivered_ms"]["p50"]
+    line = "  ".join(
+        f"{name}={v['delivered_ms']['p50']:.2f}ms ({base / v['delivered_ms']['p50']:.1f}×)"
+        for name, v in variants.items()
+    )
+    print(f"{n_sockets:>5} sockets, {len(json.dumps(message))} B frame: {line}")
+    return {"sockets": n_sockets, "frame_bytes": len(json.dumps(message)), "variants": variants}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket fan-out benchmark")
+    parser.add_argument(
+        "--sockets",
+        type=str,
+        default=",".join(str(n) for n in DEFAULT_SOCKETS),
+        help="Comma-separated room sizes"
+    )
+    parser.add_argument("--iterations", type=int, default=200, help="Broadcasts per room size and variant")
+    parser.add_argument("--output", type=str, default="ws_fanout_bench.json", help="JSON report path")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sockets.split(",") if s.strip()]
+
+    async def run_all():
+        return [await run_size(n, args.iterations) for n in sizes]
+
+    report = {
+        "benchmark": "ws_fanout",
+        "python": platform.python_version(),
+        "results": asyncio.run(run_all()),
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
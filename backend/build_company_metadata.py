@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Prefill the company_metadata table (app/company_metadata.py) for every ticker
+in the Gemini STOCK_POOL plus every round ticker in the database, so round
+generation and the stock-info route never wait on yfinance / Gemini.
+
+Tickers already stored and younger than COMPANY_METADATA_TTL_DAYS are skipped
+unless --force is given.
+
+Usage:
+    python build_company_metadata.py
+    python build_company_metadata.py --tickers NVDA,TSLA --force
+    python build_company_metadata.py --chunk 20
+
+Gemini prompts are batched GEMINI_BATCH_SIZE tickers at a time, at most
+GEMINI_CONCURRENCY in flight.
+"""
+
+import asyncio
+import argparse
+
+from app.database import engine, Base
+from app.gemini_stock_service import STOCK_POOL
+from app.company_metadata import is_stale, load_company_metadata, refresh_many_company_metadata
+from build_price_store import round_tickers
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Prefill the company metadata table")
+    parser.add_argument("--tickers", type=str, default="", help="Comma-separated tickers (default: pool + rounds)")
+    parser.add_argument("--force", action="store_true", help="Refetch tickers that are still fresh")
+    parser.add_argument("--chunk", type=int, default=40, help="Tickers fetched and stored per step")
+
+    args = parser.parse_args()
+
+    print("="*80)
+    print("COMPANY METADATA BUILDER")
+    print("="*80)
+    print()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        tickers = sorted(set(STOCK_POOL) | set(await round_tickers()))
+
+    stored = await load_company_metadata(tickers)
+    todo = [t for t in tickers if args.force or t not in stored or is_stale(stored[t])]
+    print(f"{len(tickers)} tickers, {len(tickers) - len(todo)} fresh, {len(todo)} to fetch")
+
+    chunk = max(1, args.chunk)
+    failed = []
+    done = 0
+    for i in range(0, len(todo), chunk):
+        tickers_chunk = todo[i:i + chunk]
+        try:
+            infos = await refresh_many_company_metadata(tickers_chunk)
+        except Exception as e:
+            failed.extend(tickers_chunk)
+            print(f"  ✗ {', '.join(tickers_chunk)}: {e}")
+            continue
+        for ticker, info in infos.items():
+            if not info["validated"]:
+                failed.append(ticker)
+                print(f"  ✗ {ticker}: lookup failed, fallback not stored")
+                continue
+            done += 1
+            print(f"  [{done}/{len(todo)}] {ticker}: {info['company_name']} ({info['sector']})")
+
+    print()
+    print("="*80)
+    print(f"✓ COMPLETE: {len(todo) - len(failed)} fetched, {len(tickers) - len(todo)} already fresh")
+    if failed:
+        print(f"  Failed: {', '.join(failed)}")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Build the local daily-close price store (app/price_store.py) from yfinance.
+Covers every ticker in the Gemini STOCK_POOL plus every round ticker in the
+database, so game requests never have to call Yahoo.
+
+Usage:
+    python build_price_store.py                               # 2018-01-01 → today
+    python build_price_store.py --start 2022-01-01 --tickers NVDA,TSLA
+    python build_price_store.py --rebuild                     # drop existing columns
+"""
+
+import asyncio
+import argparse
+from datetime import date, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app.database import async_session
+from app.models import StockReturn
+from app.gemini_stock_service import STOCK_POOL
+from app.price_store import price_store, write_store, YFinancePriceProvider
+
+
+async def round_tickers() -> list[str]:
+    try:
+        async with async_session() as db:
+            result = await db.execute(select(StockReturn.ticker).distinct())
+            return [t for t in result.scalars().all() if t]
+    except Exception as e:
+        print(f"⚠️ Could not read round tickers from the database: {e}")
+        return []
+
+
+def merge_range(existing: Optional[tuple[date, date]], start: date, end: date) -> tuple[date, date]:
+    """
+    Ingested range after fetching [start, end). Widens an overlapping or
+    adjacent existing range; a disjoint one would claim the gap, so only the
+    new range is recorded (the older closes stay in the matrix).
+    """
+    if existing is None or start > existing[1] or end < existing[0]:
+        return start, end
+    return min(start, existing[0]), max(end, existing[1])
+
+
+def merge_columns(existing: dict, fetched: dict) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """Combine {ticker: {date: close}} maps into a (dates × tickers) matrix."""
+    series = {**existing, **fetched}
+    tickers = sorted(series)
+    all_dates = sorted({d for s in series.values() for d in s})
+    dates = np.array(all_dates, dtype="datetime64[D]")
+    row = {d: i for i, d in enumerate(all_dates)}
+    closes = np.full((len(all_dates), len(tickers)), np.nan)
+    for j, ticker in enumerate(tickers):
+        for d, close in series[ticker].items():
+            closes[row[d], j] = close
+    return dates, tickers, closes
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Build the local daily-close price store")
+    parser.add_argument("--start", type=str, default="2018-01-01", help="First date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--end",
+        type=str,
+        default=(date.today() + timedelta(days=1)).isoformat(),
+        help="End date, exclusive (default: tomorrow)"
+    )
+    parser.add_argument("--tickers", type=str, default="", help="Comma-separated tickers (default: pool + rounds)")
+    parser.add_argument("--rebuild", action="store_true", help="Discard tickers already in the store")
+
+    args = parser.parse_args()
+    start = date.fromisoformat(args.start)
+    end = date.fromisoformat(args.end)
+
+    print("="*80)
+    print("PRICE STORE BUILDER")
+    print("="*80)
+    print()
+
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        tickers = sorted(set(STOCK_POOL) | set(await round_tickers()))
+    print(f"{len(tickers)} tickers, {start} → {end}")
+
+    # Keep what's already stored (other tickers / dates) unless rebuilding
+    existing: dict[str, dict[str, float]] = {}
+    ranges: dict[str, tuple[date, date]] = {}
+    if not args.rebuild and price_store.tickers:
+        for ticker in price_store.tickers:
+            dates, values = price_store.series(ticker, price_store.dates[0], price_store.dates[-1] + 1)
+            existing[ticker] = {str(d): float(v) for d, v in zip(dates, values)}
+            lo, hi = price_store.span(ticker)
+            ranges[ticker] = (lo.astype(date), hi.astype(date))
+        print(f"Merging into existing store ({len(existing)} tickers)")
+
+    source = YFinancePriceProvider()
+    fetched: dict[str, dict[str, float]] = {}
+    missing = []
+    for i, ticker in enumerate(tickers, 1):
+        prices = source.daily_closes(ticker, start, end)
+        if not prices:
+            missing.append(ticker)
+            print(f"  [{i}/{len(tickers)}] {ticker}: no data")
+            continue
+        series = dict(existing.get(ticker, {}))
+        series.update({p["date"]: p["close"] for p in prices})
+        fetched[ticker] = series
+        ranges[ticker] = merge_range(ranges.get(ticker), start, end)
+        print(f"  [{i}/{len(tickers)}] {ticker}: {len(prices)} closes")
+
+    if not fetched:
+        print("\n✗ Nothing fetched (is yfinance installed?)")
+        return
+
+    dates, stored_tickers, closes = merge_columns(existing, fetched)
+    # Coverage is tracked per ticker: a ticker only covers what it was fetched for
+    write_store(dates, stored_tickers, closes, ranges)
+
+    print()
+    print("="*80)
+    print(f"✓ COMPLETE: {len(stored_tickers)} tickers × {len(dates)} trading days "
+          f"→ {price_store.dir}")
+    if missing:
+        print(f"  No data for: {', '.join(missing)}")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
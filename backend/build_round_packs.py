@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Pre-materialize round packs (document sets) for instant game starts.
+Runs the backward-linkage engine ahead of time for each round × difficulty.
+
+Usage:
+    python build_round_packs.py                     # top up every pool
+    python build_round_packs.py --round ai_boom_2023 --difficulty hard --size 50
+    python build_round_packs.py --rebuild           # drop existing packs first
+"""
+
+import asyncio
+import argparse
+
+from sqlalchemy import select, delete
+
+from app.database import async_session, engine, Base
+from app.config import get_settings
+from app.models import RoundConfig, RoundPack
+from app.round_packs import refill_pool, PACK_DIFFICULTIES
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Build pre-materialized round packs")
+    parser.add_argument("--round", type=str, default="all", help="Round ID to process, or 'all' (default)")
+    parser.add_argument(
+        "--difficulty",
+        type=str,
+        default="all",
+        choices=PACK_DIFFICULTIES + ["all"],
+        help="Difficulty to process, or 'all' (default)"
+    )
+    parser.add_argument(
+        "--size",
+        type=int,
+        default=get_settings().round_pack_pool_size,
+        help="Target number of packs per round × difficulty"
+    )
+    parser.add_argument("--rebuild", action="store_true", help="Delete existing packs before building")
+
+    args = parser.parse_args()
+
+    print("="*80)
+    print("ROUND PACK BUILDER")
+    print("="*80)
+    print()
+
+    # Create tables if they don't exist
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    difficulties = PACK_DIFFICULTIES if args.difficulty == "all" else [args.difficulty]
+    total_packs = 0
+
+    async with async_session() as session:
+        query = select(RoundConfig).order_by(RoundConfig.display_order)
+        if args.round != "all":
+            query = query.where(RoundConfig.id == args.round)
+        result = await session.execute(query)
+        rounds = list(result.scalars().all())
+
+        if not rounds:
+            print(f"No rounds found for '{args.round}'")
+            return
+
+        for round_config in rounds:
+            print(f"\n{'='*80}")
+            print(f"ROUND: {round_config.id}")
+            print(f"{'='*80}")
+
+            for difficulty in difficulties:
+                if args.rebuild:
+                    await session.execute(
+                        delete(RoundPack).where(
+                            RoundPack.round_id == round_config.id,
+                            RoundPack.difficulty == difficulty,
+                        )
+                    )
+                    await session.commit()
+
+                created = await refill_pool(session, round_config, difficulty, target=args.size)
+                total_packs += created
+                print(f"  ✓ {difficulty}: {created} packs created")
+
+    print()
+    print("="*80)
+    print(f"✓ COMPLETE: {total_packs} total packs created")
+    print("="*80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,10 @@ import { gameData } from '../data/gameData';
 
 const MultiplayerContext = createContext(null);
 
+// Server closes a socket that can't keep up with 1008; the seat is kept, so reconnect
+const EVICTED_CLOSE_CODE = 1008;
+const RECONNECT_DELAY_MS = 1000;
+
 // API base URL - scrub trailing slash
 const API_BASE = (import.meta.env.VITE_API_URL || '').replace(/\/$/, '');
 
@@ -72,8 +76,11 @@ export function MultiplayerProvider({ children }) {
             console.error('WebSocket error:', err);
         };
 
-        ws.onclose = () => {
+        ws.onclose = (event) => {
             console.log('WebSocket disconnected');
+            if (event.code === EVICTED_CLOSE_CODE && wsRef.current === ws) {
+                reconnectRef.current = setTimeout(() => connectWebSocket(code, pid), RECONNECT_DELAY_MS);
+            }
         };
 
         wsRef.current = ws;
@@ -83,6 +90,20 @@ export function MultiplayerProvider({ children }) {
         const { type, payload } = message;
 
         switch (type) {
+            case 'room_state':
+                // Sent on every (re)connect: catch up on anything missed
+                setPlayers(payload.players);
+                setHostId(payload.host_id);
+                setGameStarted(payload.game_started);
+                setCurrentRound(payload.current_round);
+                setRoundActive(payload.round_active);
+                setTimerDuration(payload.timer_duration);
+                if (payload.round_active) {
+                    setSubmitted(payload.submitted);
+                    setPhase('playing');
+                }
+                break;
+
             case 'player_joined':
                 setPlayers(payload.players);
                 break;
@@ -217,6 +238,7 @@ export function MultiplayerProvider({ children }) {
 
     const resetMultiplayer = useCallback(() => {
         if (wsRef.current) wsRef.current.close();
+        if (reconnectRef.current) clearTimeout(reconnectRef.current);
         setRoomCode(null);
         setPlayerId(null);
         setDisplayName('');
@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 """
-Fetch real historical stock prices from yfinance for all game rounds.
+Export real historical stock prices for all game rounds.
 Outputs frontend/src/data/stockPrices.js with daily closing prices.
+
+Prices come from the backend's local price store (backend/build_price_store.py),
+with yfinance as a backfill for anything the store doesn't cover.
 """
 
 import json
 import os
-from datetime import datetime
+import sys
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
 
-import yfinance as yf
+from app.price_store import price_provider
 
 ROUNDS = [
     {
@@ -53,23 +59,20 @@ def fetch_round_data(round_config):
 
     for ticker in round_config["tickers"]:
         print(f"  Fetching {ticker}...")
-        stock = yf.Ticker(ticker)
-        hist = stock.history(
-            start=round_config["period_start"],
-            end=round_config["period_end"],
-            interval="1d",
+        closes = price_provider.daily_closes(
+            ticker,
+            date.fromisoformat(round_config["period_start"]),
+            date.fromisoformat(round_config["period_end"]),
         )
 
-        if hist.empty:
+        if not closes:
             print(f"    WARNING: No data for {ticker}")
             continue
 
-        prices = []
-        for date, row in hist.iterrows():
-            prices.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "close": round(row["Close"], 2),
-            })
+        prices = [
+            {"date": p["date"], "close": round(p["close"], 2)}
+            for p in closes
+        ]
 
         if len(prices) >= 2:
             first = prices[0]["close"]